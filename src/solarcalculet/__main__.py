@@ -0,0 +1,7 @@
+"""
+Point d'entrée python -m solarcalculet
+"""
+
+from solarcalculet.cli import main
+
+raise SystemExit(main())
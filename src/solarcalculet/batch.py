@@ -0,0 +1,475 @@
+"""
+Module de traitement par lot reprenable d'un répertoire d'extractions ENEDIS
+
+Chaque fichier est traité dans un processus de travail ; l'avancement par
+fichier et par année est consigné dans un journal JSONL append-only : après
+une interruption, le lot reprend là où il s'était arrêté.
+"""
+
+import argparse
+import dataclasses
+import glob
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from solarcalculet.data_cleaner import DataCleaner
+from solarcalculet.data_reader import DataReader
+from solarcalculet.excel_exporter import ExcelExporter
+from solarcalculet.constants import (
+    DEFAULT_TEMPLATE,
+    EXPORT_AGGREGATIONS,
+    TIMESTAMP_CONVENTIONS,
+)
+from solarcalculet.pipeline import (
+    DEFAULT_OPTIONS,
+    PARTIAL_YEAR_POLICIES,
+    ProcessingOptions,
+    neighbour_data,
+    process_year,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - module indisponible sous Windows
+    fcntl = None
+
+LOCK_FILE = ".batch.lock"
+
+
+class BatchJournal:
+    """
+    Journal append-only des traitements d'un lot (une ligne JSON par événement)
+
+    Chaque événement est écrit en un seul appel système sur un fichier ouvert
+    en ajout puis synchronisé sur disque : plusieurs processus peuvent
+    consigner en parallèle, et une ligne tronquée par un arrêt brutal est
+    ignorée à la relecture.
+    """
+
+    FILE_NAME = "journal.jsonl"
+    # Statuts d'année dont la sortie est à jour (non recalculées à la reprise
+    # tant que le fichier consigné existe)
+    DONE_YEAR_STATUSES = ("ok", "skipped", "unchanged")
+
+    def __init__(self, path: str):
+        """
+        Initialise le journal
+
+        Args:
+            path: Fichier du journal (créé au premier événement)
+        """
+        self.path = Path(path)
+
+    def record(self, **event):
+        """
+        Consigne un événement horodaté
+
+        Args:
+            **event: Champs de l'événement (file, signature, status, year...)
+        """
+        line = json.dumps({"time": time.time(), **event}, ensure_ascii=False) + "\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def replay(self) -> dict:
+        """
+        Relit le journal et donne le dernier état connu de chaque fichier
+
+        Returns:
+            Dictionnaire {(fichier, signature): {"status": statut du fichier,
+            "years": {année: {"status": statut, "output": fichier produit}}}}
+        """
+        states = {}
+        if not self.path.exists():
+            return states
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne interrompue par un arrêt brutal
+                    continue
+                state = states.setdefault(
+                    (event["file"], event["signature"]), {"status": None, "years": {}}
+                )
+                if "year" in event:
+                    state["years"][event["year"]] = {
+                        "status": event["status"],
+                        "output": event.get("output"),
+                    }
+                else:
+                    state["status"] = event["status"]
+        return states
+
+    @classmethod
+    def done_years(cls, states: dict, csv_file: str, signature: str) -> set:
+        """
+        Donne les années déjà traitées d'un fichier dans sa version actuelle,
+        dont le fichier produit existe toujours
+
+        Args:
+            states: État relu par replay
+            csv_file: Fichier d'entrée
+            signature: Signature actuelle du fichier
+
+        Returns:
+            Ensemble des années à ne pas recalculer
+        """
+        years = states.get((csv_file, signature), {"years": {}})["years"]
+        return {
+            year
+            for year, state in years.items()
+            if state["status"] in cls.DONE_YEAR_STATUSES
+            and (state["output"] is None or Path(state["output"]).exists())
+        }
+
+
+def collect_inputs(source: str) -> list:
+    """
+    Liste les fichiers CSV d'un lot
+
+    Args:
+        source: Répertoire (fichiers *.csv), motif glob ou fichier unique
+
+    Returns:
+        Liste triée des chemins
+    """
+    path = Path(source)
+    if path.is_dir():
+        return sorted(str(csv_file) for csv_file in path.glob("*.csv"))
+    if path.is_file():
+        return [str(path)]
+    return sorted(glob.glob(source, recursive=True))
+
+
+def file_signature(csv_file: str, options: ProcessingOptions = DEFAULT_OPTIONS) -> str:
+    """
+    Signature d'un fichier d'entrée (taille et date de modification) et des
+    options de traitement : un fichier remplacé, ou relancé avec d'autres
+    options, est traité à nouveau
+
+    Args:
+        csv_file: Chemin du fichier
+        options: Options de traitement des années
+
+    Returns:
+        Signature textuelle
+    """
+    stat = os.stat(csv_file)
+    options_digest = hashlib.sha256(
+        json.dumps(dataclasses.asdict(options), sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{stat.st_size}-{stat.st_mtime_ns}-{options_digest}"
+
+
+@contextmanager
+def batch_lock(output_dir: str):
+    """
+    Verrou exclusif inter-processus sur le répertoire de sortie d'un lot :
+    un second lot lancé sur le même répertoire attend la fin du premier
+
+    Args:
+        output_dir: Répertoire de sortie du lot
+    """
+    path = Path(output_dir) / LOCK_FILE
+    with open(path, "a", encoding="utf-8") as handle:
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print(f"Lot en cours dans {output_dir}, attente de sa fin...")
+                fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def process_file(
+    csv_file: str,
+    output_dir: str,
+    journal_file: str,
+    done_years: set = frozenset(),
+    options: ProcessingOptions = DEFAULT_OPTIONS,
+) -> dict:
+    """
+    Traite un fichier du lot en consignant chaque année, sans lever d'exception
+
+    Args:
+        csv_file: Fichier CSV d'entrée
+        output_dir: Répertoire de sortie du lot (un sous-dossier par fichier)
+        journal_file: Fichier du journal
+        done_years: Années déjà traitées lors d'une exécution précédente
+        options: Options de traitement des années
+
+    Returns:
+        Résumé du traitement du fichier
+    """
+    low_memory = options.low_memory
+    journal = BatchJournal(journal_file)
+    signature = file_signature(csv_file, options)
+    start = time.perf_counter()
+    result = {"file": csv_file, "status": "done", "years": {}, "error": None}
+    try:
+        df = DataReader(csv_file, mode="fast", low_memory=low_memory).load()
+        cleaner = DataCleaner(options.resampler().to_hourly(df), low_memory=low_memory)
+        del df
+        file_path = Path(output_dir) / Path(csv_file).stem
+        file_path.mkdir(parents=True, exist_ok=True)
+        for year in options.years(cleaner.years()):
+            if year in done_years:
+                result["years"][year] = "done"
+                continue
+            summary = process_year(
+                DataCleaner(
+                    neighbour_data(cleaner, year),
+                    profile=cleaner.profile(),
+                    low_memory=low_memory,
+                ),
+                year,
+                file_path,
+                options.engine,
+                verbose=False,
+                partial_years=options.partial_years,
+                template_file=options.template_file,
+                max_interpolation=options.max_interpolation,
+            )
+            journal.record(
+                file=csv_file,
+                signature=signature,
+                year=year,
+                status=summary["status"],
+                output=summary["output"],
+                errors=summary["errors"],
+            )
+            result["years"][year] = summary["status"]
+    except Exception as e:  # pylint: disable=broad-except
+        # Un fichier défaillant ne doit pas interrompre le lot
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    journal.record(
+        file=csv_file,
+        signature=signature,
+        status=result["status"],
+        error=result["error"],
+    )
+    result["duration"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(
+    source: str,
+    output_dir: str,
+    workers: int = None,
+    journal_file: str = None,
+    options: ProcessingOptions = DEFAULT_OPTIONS,
+) -> dict:
+    """
+    Traite un lot de fichiers sur un pool borné de processus, en reprenant
+    après les fichiers et les années déjà consignés comme traités (un seul
+    lot à la fois par répertoire de sortie, voir batch_lock)
+
+    Args:
+        source: Répertoire, motif glob ou fichier CSV
+        output_dir: Répertoire de sortie (fichiers <nom du CSV>/<année>.xlsx)
+        workers: Nombre de processus (nombre de cœurs par défaut, 1 pour un
+            traitement séquentiel dans le processus courant)
+        journal_file: Journal du lot (<output_dir>/journal.jsonl par défaut)
+        options: Options de traitement des années
+
+    Returns:
+        Synthèse du lot (fichiers traités, repris, en échec, résultats)
+    """
+    start = time.perf_counter()
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    journal = BatchJournal(journal_file or Path(output_dir) / BatchJournal.FILE_NAME)
+    with batch_lock(output_dir):
+        states = journal.replay()
+        # Fichiers temporaires d'export laissés par un processus tué (aucun
+        # autre lot n'écrit dans le répertoire tant que le verrou est tenu)
+        for tmp_file in Path(output_dir).glob("*/.*.tmp.xlsx"):
+            tmp_file.unlink(missing_ok=True)
+
+        results = []
+        pending = []
+        csv_files = collect_inputs(source)
+        # Fichiers de même nom dans des répertoires différents : même
+        # sous-dossier de sortie, aucun n'est traité
+        stems = Counter(Path(csv_file).stem for csv_file in csv_files)
+        for csv_file in csv_files:
+            if stems[Path(csv_file).stem] > 1:
+                results.append(
+                    {
+                        "file": csv_file,
+                        "status": "failed",
+                        "years": {},
+                        "error": f"Nom de fichier en double dans le lot : {Path(csv_file).name}",
+                    }
+                )
+                continue
+            signature = file_signature(csv_file, options)
+            state = states.get((csv_file, signature), {"status": None, "years": {}})
+            done_years = journal.done_years(states, csv_file, signature)
+            # Fichier repris si toutes ses années sont à jour (sorties présentes)
+            if state["status"] == "done" and done_years == set(state["years"]):
+                results.append(
+                    {"file": csv_file, "status": "resumed", "years": {}, "error": None}
+                )
+                continue
+            pending.append((csv_file, done_years))
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(pending) <= 1:
+            for csv_file, done_years in pending:
+                results.append(
+                    process_file(
+                        csv_file, output_dir, str(journal.path), done_years, options
+                    )
+                )
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(pending))
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        process_file,
+                        csv_file,
+                        output_dir,
+                        str(journal.path),
+                        done_years,
+                        options,
+                    ): csv_file
+                    for csv_file, done_years in pending
+                }
+                for future in as_completed(futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:  # pylint: disable=broad-except
+                        # Processus interrompu : les années déjà consignées sont
+                        # conservées, le fichier sera repris au prochain lancement
+                        csv_file = futures[future]
+                        error = f"{type(e).__name__}: {e}"
+                        journal.record(
+                            file=csv_file,
+                            signature=file_signature(csv_file, options),
+                            status="failed",
+                            error=error,
+                        )
+                        results.append(
+                            {
+                                "file": csv_file,
+                                "status": "failed",
+                                "years": {},
+                                "error": error,
+                            }
+                        )
+
+    return {
+        "files": len(results),
+        "processed": sum(result["status"] == "done" for result in results),
+        "resumed": sum(result["status"] == "resumed" for result in results),
+        "failed": sum(result["status"] == "failed" for result in results),
+        "duration": time.perf_counter() - start,
+        "journal": str(journal.path),
+        "results": sorted(results, key=lambda result: result["file"]),
+    }
+
+
+def print_batch_summary(summary: dict):
+    """
+    Affiche la synthèse d'un lot
+
+    Args:
+        summary: Synthèse renvoyée par run_batch
+    """
+    print(
+        f"{summary['files']} fichiers : {summary['processed']} traités, "
+        f"{summary['resumed']} déjà traités, {summary['failed']} en échec "
+        f"en {summary['duration']:.1f} s (journal : {summary['journal']})"
+    )
+    for result in summary["results"]:
+        if result["status"] == "failed":
+            print(f"  ❌ {result['file']} : {result['error']}")
+
+
+def main(argv: list = None, prog: str = "python -m solarcalculet.batch") -> int:
+    """
+    Point d'entrée en ligne de commande du traitement par lot
+
+    Args:
+        argv: Arguments de la ligne de commande (sys.argv[1:] par défaut)
+        prog: Nom du programme affiché dans l'aide
+
+    Returns:
+        Code de sortie (1 si un fichier est en échec)
+    """
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Traitement reprenable d'un lot de fichiers ENEDIS"
+    )
+    parser.add_argument("source", help="Répertoire, motif glob ou fichier CSV")
+    parser.add_argument("output_dir", help="Répertoire de sortie")
+    parser.add_argument("--workers", type=int, help="Nombre de processus")
+    parser.add_argument("--journal", help="Fichier du journal du lot")
+    parser.add_argument(
+        "--engine", choices=ExcelExporter.EXPORT_ENGINES, default="pandas"
+    )
+    parser.add_argument(
+        "--template",
+        default=DEFAULT_TEMPLATE,
+        help='Classeur modèle du moteur "template" (filled_template.xlsx du '
+        "paquet par défaut)",
+    )
+    parser.add_argument("--aggregation", choices=EXPORT_AGGREGATIONS, default="mean")
+    parser.add_argument(
+        "--timestamp-at",
+        choices=TIMESTAMP_CONVENTIONS,
+        default="end",
+        help="Position de l'Horodate dans l'intervalle mesuré (fin pour ENEDIS)",
+    )
+    parser.add_argument(
+        "--partial-years", choices=PARTIAL_YEAR_POLICIES, default="as-is"
+    )
+    parser.add_argument("--low-memory", action="store_true")
+    parser.add_argument(
+        "--interpolate",
+        type=int,
+        default=0,
+        metavar="HOURS",
+        help="Interpole linéairement les trous d'au plus HOURS heures",
+    )
+    args = parser.parse_args(argv)
+    if args.engine == "template" and not Path(args.template).is_file():
+        parser.error(f"classeur modèle introuvable : {args.template} (--template)")
+
+    summary = run_batch(
+        args.source,
+        args.output_dir,
+        workers=args.workers,
+        journal_file=args.journal,
+        options=ProcessingOptions(
+            engine=args.engine,
+            aggregation=args.aggregation,
+            timestamp_at=args.timestamp_at,
+            partial_years=args.partial_years,
+            template_file=args.template,
+            low_memory=args.low_memory,
+            max_interpolation=args.interpolate,
+        ),
+    )
+    print_batch_summary(summary)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
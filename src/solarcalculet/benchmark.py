@@ -0,0 +1,382 @@
+"""
+Module de mesure des performances du traitement sur des données ENEDIS synthétiques
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from solarcalculet.constants import DEFAULT_TEMPLATE, ENEDIS_COLUMNS
+from solarcalculet.data_cleaner import DataCleaner
+from solarcalculet.data_reader import DataReader
+from solarcalculet.excel_exporter import ExcelExporter
+from solarcalculet.fleet import process_fleet, split_by_prm
+from solarcalculet.pipeline import ProcessingOptions, process_enedis_data
+from solarcalculet.resampler import Resampler
+
+RESOLUTIONS = ("PT10M", "PT30M", "PT60M")
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_MIN_DELTA = 0.05
+
+
+def generate_enedis_csv(
+    file_path: str,
+    years: int = 1,
+    start_year: int = 2023,
+    resolution: str = "PT30M",
+    prms: int = 1,
+    gap_rate: float = 0.01,
+    gap_hours: tuple = (1, 24),
+    seed: int = 0,
+) -> int:
+    """
+    Génère un fichier CSV ENEDIS réaliste (13 colonnes, séparateur ;)
+
+    Args:
+        file_path: Chemin du fichier à créer
+        years: Nombre d'années civiles couvertes
+        start_year: Première année
+        resolution: Pas de mesure ("PT10M", "PT30M" ou "PT60M")
+        prms: Nombre de compteurs
+        gap_rate: Proportion approximative de mesures manquantes
+        gap_hours: Durées minimale et maximale (heures) des trous
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        Nombre de lignes de données écrites
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Résolution inconnue : {resolution}")
+    rng = np.random.default_rng(seed)
+    step = pd.Timedelta(resolution)
+    start = pd.Timestamp(start_year, 1, 1)
+    end = pd.Timestamp(start_year + years, 1, 1)
+    # Horodate = fin de l'intervalle mesuré, comme dans les extractions ENEDIS
+    horodates = pd.date_range(start + step, end, freq=step)
+    steps_per_hour = int(pd.Timedelta(hours=1) / step)
+
+    # Profil journalier (pointes matin et soir) plus bruit, en W entiers
+    hours = horodates.hour.to_numpy() + horodates.minute.to_numpy() / 60
+    daily = (
+        600
+        + 400 * np.exp(-((hours - 8) ** 2) / 4)
+        + 900 * np.exp(-((hours - 20) ** 2) / 6)
+    )
+    seasonal = 1 + 0.3 * np.cos(2 * np.pi * (horodates.dayofyear.to_numpy() - 15) / 365)
+
+    first = True
+    written = 0
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        for index in range(prms):
+            prm = str(19125759625988 + index)
+            values = np.maximum(
+                daily * seasonal * rng.normal(1, 0.15, len(horodates)), 0
+            ).astype(np.int64)
+            keep = _gap_mask(rng, len(horodates), gap_rate, gap_hours, steps_per_hour)
+            meter = pd.DataFrame(
+                {
+                    "Identifiant PRM": prm,
+                    "Date de début": str(start),
+                    "Date de fin": str(end),
+                    "Grandeur physique": "PA",
+                    "Grandeur métier": "CONS",
+                    "Etape métier": "BRUT",
+                    "Unité": "W",
+                    "Horodate": horodates[keep].strftime("%Y-%m-%d %H:%M:%S"),
+                    "Valeur": values[keep],
+                    "Nature": "B",
+                    "Pas": resolution,
+                    "Indice de vraisemblance": 0,
+                    "Etat complémentaire": 0,
+                },
+                columns=ENEDIS_COLUMNS,
+            )
+            meter.to_csv(f, sep=";", index=False, header=first, lineterminator="\n")
+            first = False
+            written += len(meter)
+    return written
+
+
+def _gap_mask(
+    rng, length: int, gap_rate: float, gap_hours: tuple, steps_per_hour: int
+) -> np.ndarray:
+    """
+    Tire des trous de durées aléatoires
+
+    Returns:
+        Masque des mesures conservées
+    """
+    keep = np.ones(length, dtype=bool)
+    min_steps, max_steps = gap_hours[0] * steps_per_hour, gap_hours[1] * steps_per_hour
+    mean_steps = (min_steps + max_steps) / 2
+    runs = int(round(gap_rate * length / mean_steps)) if mean_steps else 0
+    if runs == 0:
+        return keep
+    starts = rng.integers(0, length, runs)
+    lengths = rng.integers(min_steps, max_steps + 1, runs)
+    # Marque les débuts et fins de trous puis cumule pour obtenir le masque
+    delta = np.zeros(length + 1, dtype=np.int64)
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, np.minimum(starts + lengths, length), -1)
+    keep[np.cumsum(delta[:-1]) > 0] = False
+    return keep
+
+
+@contextlib.contextmanager
+def measure(stages: dict, name: str, rows: int, trace_memory: bool = False):
+    """
+    Mesure la durée, ou le pic mémoire (tracemalloc), d'une étape
+
+    tracemalloc ralentit fortement l'exécution : durée et mémoire sont donc
+    mesurées lors de passes distinctes.
+
+    Args:
+        stages: Dictionnaire recevant les mesures
+        name: Nom de l'étape
+        rows: Nombre de lignes traitées par l'étape
+        trace_memory: Mesure le pic mémoire au lieu de la durée
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            stages[name] = {"peak_bytes": peak}
+        else:
+            stages[name] = {
+                "seconds": seconds,
+                "rows": rows,
+                "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+            }
+
+
+def run_benchmark(
+    csv_file: str, work_dir: str, engine: str = "pandas", template_file: str = None
+) -> dict:
+    """
+    Mesure chaque étape du traitement puis le traitement complet
+
+    Args:
+        csv_file: Fichier CSV ENEDIS à traiter
+        work_dir: Répertoire des fichiers générés
+        engine: Moteur d'export Excel
+        template_file: Classeur modèle du moteur d'export "template"
+
+    Returns:
+        Mesures par étape (durée, lignes, lignes/s, pic mémoire)
+    """
+    stages = _run_stages(
+        csv_file, Path(work_dir) / "timing", (engine, template_file), trace_memory=False
+    )
+    memory = _run_stages(
+        csv_file, Path(work_dir) / "memory", (engine, template_file), trace_memory=True
+    )
+    for name, stage in stages.items():
+        stage.update(memory[name])
+    return stages
+
+
+def _run_stages(
+    csv_file: str, work_path: Path, export_options: tuple, trace_memory: bool
+) -> dict:
+    """
+    Exécute une passe de mesure sur toutes les étapes (étapes annuelles sur
+    le premier compteur, traitement de bout en bout en mode parc s'il y en
+    a plusieurs)
+
+    Returns:
+        Mesures par étape
+    """
+    engine, template_file = export_options
+    work_path.mkdir(parents=True, exist_ok=True)
+    stages = {}
+    reader = DataReader(csv_file, mode="fast")
+
+    with open(csv_file, "rb") as f:
+        line_count = sum(1 for _ in f) - 1
+    with measure(stages, "read", line_count, trace_memory):
+        df = reader.read()
+    with measure(stages, "convert_resample", len(df), trace_memory):
+        # Compteur par compteur : les mesures de compteurs différents ne
+        # doivent pas être moyennées ensemble
+        resampler = Resampler()
+        meters = {
+            prm: resampler.to_hourly(meter_df)
+            for prm, meter_df in split_by_prm(reader.convert_to_kw(df)).items()
+        }
+
+    cleaner = DataCleaner(next(iter(meters.values())))
+    year = str(cleaner.years()[0])
+    year_rows = len(cleaner.get_data_by_year(year))
+    with measure(stages, "detect_missing_hours", year_rows, trace_memory):
+        cleaner.detect_missing_hours(year)
+    with measure(stages, "fill_missing_data", year_rows, trace_memory):
+        cleaner.fill_missing_data(year)
+
+    exporter = ExcelExporter(
+        cleaner.get_data_by_year(year), engine=engine, template_file=template_file
+    )
+    with measure(stages, "prepare_excel_data", len(exporter.data), trace_memory):
+        exporter.prepare_excel_data()
+    output_file = work_path / f"{year}.xlsx"
+    with measure(stages, "export_to_excel", len(exporter.data), trace_memory):
+        exporter.export_to_excel(str(output_file))
+    with measure(stages, "validate_export_format", len(exporter.data), trace_memory):
+        exporter.validate_export_format(str(output_file))
+
+    options = ProcessingOptions(engine=engine, template_file=template_file)
+    with measure(stages, "end_to_end", line_count, trace_memory):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if len(meters) > 1:
+                process_fleet(
+                    csv_file,
+                    str(work_path / "end_to_end"),
+                    workers=1,
+                    options=options,
+                )
+            else:
+                process_enedis_data(
+                    csv_file, str(work_path / "end_to_end"), options=options
+                )
+    return stages
+
+
+def compare_to_baseline(
+    stages: dict,
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta: float = DEFAULT_MIN_DELTA,
+) -> list:
+    """
+    Compare les durées mesurées à une référence enregistrée
+
+    Args:
+        stages: Mesures courantes
+        baseline: Mesures de référence
+        tolerance: Ralentissement relatif toléré (0.2 = 20 %)
+        min_delta: Écart absolu (secondes) en dessous duquel un ralentissement
+            est considéré comme du bruit de mesure
+
+    Returns:
+        Liste des régressions détectées
+    """
+    regressions = []
+    for name, reference in baseline.items():
+        current = stages.get(name)
+        if current is None or reference["seconds"] <= 0:
+            continue
+        ratio = current["seconds"] / reference["seconds"]
+        if (
+            ratio > 1 + tolerance
+            and current["seconds"] - reference["seconds"] > min_delta
+        ):
+            regressions.append(
+                f"{name} : {current['seconds']:.3f} s contre {reference['seconds']:.3f} s (x{ratio:.2f})"
+            )
+    return regressions
+
+
+def main(argv: list = None, prog: str = "python -m solarcalculet.benchmark") -> int:
+    """
+    Point d'entrée en ligne de commande du banc de mesure
+
+    Args:
+        argv: Arguments de la ligne de commande (sys.argv[1:] par défaut)
+        prog: Nom du programme affiché dans l'aide
+
+    Returns:
+        Code de sortie (1 si une régression est détectée)
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="Banc de mesure")
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--start-year", type=int, default=2023)
+    parser.add_argument("--resolution", choices=RESOLUTIONS, default="PT30M")
+    parser.add_argument("--prms", type=int, default=1)
+    parser.add_argument("--gap-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--gap-hours", type=int, nargs=2, default=(1, 24), metavar=("MIN", "MAX")
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--engine", choices=ExcelExporter.EXPORT_ENGINES, default="pandas"
+    )
+    parser.add_argument(
+        "--template",
+        default=DEFAULT_TEMPLATE,
+        help='Classeur modèle du moteur "template" (filled_template.xlsx du '
+        "paquet par défaut)",
+    )
+    parser.add_argument(
+        "--input", help="Fichier CSV existant à mesurer (pas de génération)"
+    )
+    parser.add_argument("--output", help="Fichier JSON des mesures")
+    parser.add_argument("--baseline", help="Fichier JSON de référence")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Enregistre les mesures comme référence",
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+    if args.engine == "template" and not Path(args.template).is_file():
+        parser.error(f"classeur modèle introuvable : {args.template} (--template)")
+
+    with tempfile.TemporaryDirectory(prefix="solarcalculet-bench-") as work_dir:
+        csv_file = args.input
+        if csv_file is None:
+            csv_file = str(Path(work_dir) / "ENEDIS.synthetic.csv")
+            generate_enedis_csv(
+                csv_file,
+                years=args.years,
+                start_year=args.start_year,
+                resolution=args.resolution,
+                prms=args.prms,
+                gap_rate=args.gap_rate,
+                gap_hours=tuple(args.gap_hours),
+                seed=args.seed,
+            )
+        stages = run_benchmark(
+            csv_file, work_dir, engine=args.engine, template_file=args.template
+        )
+
+    for name, stage in stages.items():
+        print(
+            f"{name:<24} {stage['seconds']:8.3f} s {stage['rows_per_second']:12.0f} lignes/s "
+            f"{stage['peak_bytes'] / 1e6:8.1f} Mo"
+        )
+    report = {"parameters": vars(args), "stages": stages}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if args.save_baseline:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            print(f"Référence enregistrée dans {baseline_path}")
+        elif baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+            regressions = compare_to_baseline(
+                stages, baseline["stages"], args.tolerance
+            )
+            for regression in regressions:
+                print(f"⚠️ Régression : {regression}")
+            if regressions:
+                return 1
+            print("✅ Aucune régression par rapport à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+"""
+Interface en ligne de commande : python -m solarcalculet <commande>
+
+Les dépendances lourdes (pandas, openpyxl...) ne sont importées que dans
+les commandes qui en ont besoin : l'aide et la validation des CSV
+démarrent sans elles.
+"""
+
+import argparse
+import calendar
+import importlib
+import json
+import re
+import sys
+from pathlib import Path
+from solarcalculet.csv_validator import validate_csv
+
+PROG = "python -m solarcalculet"
+COMMANDS = ("process", "batch", "validate", "bench", "cache")
+# Commandes dont les options sont analysées par leur module (import différé)
+FORWARDED_COMMANDS = {
+    "process": "solarcalculet.main",
+    "batch": "solarcalculet.batch",
+    "bench": "solarcalculet.benchmark",
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Construit l'analyseur des commandes
+
+    Returns:
+        Analyseur argparse (les options de process et bench sont analysées
+        par leurs modules respectifs)
+    """
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Traitement des données de consommation ENEDIS",
+        epilog=f"Aide d'une commande : {PROG} <commande> --help",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="<commande>")
+
+    # process, batch et bench : options transmises telles quelles à leurs modules
+    commands.add_parser(
+        "process",
+        add_help=False,
+        help="Nettoie les données et génère les fichiers Excel (commande par défaut)",
+    )
+    commands.add_parser(
+        "batch",
+        add_help=False,
+        help="Traite un répertoire de fichiers avec reprise sur journal",
+    )
+
+    validate = commands.add_parser(
+        "validate", help="Valide des fichiers CSV ENEDIS ou Excel exportés"
+    )
+    validate.add_argument("files", nargs="+", help="Fichiers .csv ou .xlsx")
+    validate.add_argument(
+        "--full-year",
+        action="store_true",
+        help="Exige une année civile complète dans les fichiers Excel",
+    )
+    validate.add_argument(
+        "--json", action="store_true", help="Affiche les résumés au format JSON"
+    )
+    validate.add_argument(
+        "--process",
+        metavar="OUTPUT_DIR",
+        help="Poursuit par le traitement des CSV valides dans ce répertoire",
+    )
+
+    commands.add_parser("bench", add_help=False, help="Banc de mesure")
+
+    cache = commands.add_parser("cache", help="Gestion du cache de lecture")
+    cache_commands = cache.add_subparsers(
+        dest="cache_command", metavar="<action>", required=True
+    )
+    clear = cache_commands.add_parser("clear", help="Vide le cache de lecture")
+    clear.add_argument("--cache-dir", help="Répertoire du cache de lecture")
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """
+    Point d'entrée en ligne de commande
+
+    Args:
+        argv: Arguments de la ligne de commande (sys.argv[1:] par défaut)
+
+    Returns:
+        Code de sortie (1 si une validation échoue)
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] not in COMMANDS and not argv[0].startswith("-"):
+        # Forme historique : python -m solarcalculet fichier.csv [options]
+        argv.insert(0, "process")
+
+    if argv and argv[0] in FORWARDED_COMMANDS:
+        module = importlib.import_module(FORWARDED_COMMANDS[argv[0]])
+        return module.main(argv[1:], prog=f"{PROG} {argv[0]}") or 0
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "validate":
+        status = _validate(args.files, args.full_year, args.json)
+        if status == 0 and args.process:
+            _process(args.files, args.process)
+        return status
+    if args.command == "cache":
+        from solarcalculet.parse_cache import (  # pylint: disable=import-outside-toplevel
+            ParseCache,
+        )
+
+        removed = ParseCache(args.cache_dir).clear()
+        print(f"Cache vidé ({removed} entrées supprimées)")
+        return 0
+    parser.print_help()
+    return 0
+
+
+def _validate(files: list, full_year: bool, as_json: bool) -> int:
+    """
+    Valide chaque fichier (CSV ligne à ligne, Excel en lecture seule)
+
+    Args:
+        files: Fichiers à valider
+        full_year: Exige une année civile complète (fichiers Excel)
+        as_json: Affiche les résumés en JSON plutôt qu'en texte
+
+    Returns:
+        Code de sortie (1 si un fichier est invalide)
+    """
+    summaries = []
+    for file_path in files:
+        if file_path.lower().endswith(".xlsx"):
+            # Import différé : openpyxl et pandas ne servent qu'aux classeurs
+            from solarcalculet.excel_exporter import (  # pylint: disable=import-outside-toplevel
+                ExcelExporter,
+            )
+
+            # Année du fichier (<préfixe><année>.xlsx) : 8784 lignes si bissextile
+            year = re.search(r"(\d{4})$", Path(file_path).stem)
+            errors = ExcelExporter.validate_export_format(
+                file_path,
+                full_year=full_year,
+                leap_year=calendar.isleap(int(year[1])) if year else None,
+            )
+            summaries.append({"file": file_path, "errors": errors})
+        else:
+            summaries.append(validate_csv(file_path))
+
+    if as_json:
+        print(json.dumps(summaries, ensure_ascii=False, indent=2))
+    else:
+        for summary in summaries:
+            _print_summary(summary)
+    return 1 if any(summary["errors"] for summary in summaries) else 0
+
+
+def _process(files: list, output_dir: str):
+    """
+    Traite les fichiers CSV validés (pandas n'est importé qu'ici)
+
+    Args:
+        files: Fichiers validés
+        output_dir: Répertoire de sortie (un sous-dossier par fichier s'il y
+            en a plusieurs)
+    """
+    from solarcalculet.pipeline import (  # pylint: disable=import-outside-toplevel
+        process_enedis_data,
+    )
+
+    csv_files = [path for path in files if not path.lower().endswith(".xlsx")]
+    for csv_file in csv_files:
+        file_dir = Path(output_dir)
+        if len(csv_files) > 1:
+            file_dir = file_dir / Path(csv_file).stem
+        process_enedis_data(csv_file, str(file_dir))
+
+
+def _print_summary(summary: dict):
+    """
+    Affiche le résumé de validation d'un fichier
+
+    Args:
+        summary: Résumé (clés "file" et "errors", plus la structure des CSV)
+    """
+    status = "❌" if summary["errors"] else "✅"
+    print(f"{status} {summary['file']}")
+    if "rows" in summary:
+        print(f"  - Nombre de lignes : {summary['rows']}")
+        print(f"  - Colonnes : {summary['columns']}")
+        print(f"  - Période : {summary['start']} à {summary['end']}")
+        for year, counts in summary["years"].items():
+            print(
+                f"  - {year} : {counts['hours']} heures, {counts['missing']} "
+                f"manquantes ({counts['gap_runs']} trous)"
+            )
+    for error in summary["errors"]:
+        print(f"  - {error}")
+    for warning in summary.get("warnings", []):
+        print(f"  ⚠️  {warning}")
@@ -0,0 +1,48 @@
+"""
+Constantes partagées, sans dépendance : l'interface en ligne de commande
+construit ses options à partir de ce module sans charger pandas ni openpyxl
+"""
+
+from importlib.resources import files
+
+# Colonnes d'une extraction de courbe de charge ENEDIS (séparateur ;)
+ENEDIS_COLUMNS = (
+    "Identifiant PRM",
+    "Date de début",
+    "Date de fin",
+    "Grandeur physique",
+    "Grandeur métier",
+    "Etape métier",
+    "Unité",
+    "Horodate",
+    "Valeur",
+    "Nature",
+    "Pas",
+    "Indice de vraisemblance",
+    "Etat complémentaire",
+)
+
+# Moteurs d'export Excel (voir ExcelExporter)
+EXPORT_ENGINES = ("pandas", "streaming", "template")
+
+# Classeur modèle du moteur "template", livré comme donnée du paquet : résolu
+# via importlib.resources pour rester valable une fois le paquet installé
+DEFAULT_TEMPLATE = str(files(__package__) / "filled_template.xlsx")
+
+# Agrégations des mesures infra-horaires (voir Resampler) ; seules les
+# puissances (kW) peuvent être exportées, le modèle Excel n'acceptant pas
+# une énergie (kWh) en cellule B3
+AGGREGATIONS = ("mean", "max", "energy")
+EXPORT_AGGREGATIONS = ("mean", "max")
+
+# Position de l'Horodate dans l'intervalle mesuré : les courbes de charge
+# ENEDIS horodatent la fin de l'intervalle
+TIMESTAMP_CONVENTIONS = ("start", "end")
+
+# Décimales des valeurs en kW (mesures au watt près et leurs moyennes),
+# appliquées à l'agrégation, à la complétion et à l'export
+KW_DECIMALS = 6
+
+# Traitement des années incomplètes : export de la plage disponible,
+# complétion de l'année civile entière ou année ignorée
+PARTIAL_YEAR_POLICIES = ("as-is", "pad", "skip")
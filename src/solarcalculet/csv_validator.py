@@ -0,0 +1,283 @@
+"""
+Module de validation rapide des fichiers CSV ENEDIS, ligne à ligne
+
+Utilise uniquement la bibliothèque standard : la validation seule (mode
+« validation uniquement » du workflow) ne charge ni pandas ni openpyxl. Le
+fichier est lu une seule fois, en mémoire bornée : seuls la ligne précédente,
+les compteurs par année et les premiers trous sont conservés.
+"""
+
+import csv
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from solarcalculet.constants import TIMESTAMP_CONVENTIONS
+
+
+class CsvValidator:
+    """Classe pour vérifier la structure d'un fichier CSV ENEDIS en une lecture"""
+
+    # Mêmes colonnes que DataReader.REQUIRED_COLUMNS (sans importer pandas)
+    REQUIRED_COLUMNS = ("Horodate", "Valeur")
+    DELIMITER = ";"
+    HOUR = timedelta(hours=1)
+    # Durée ISO 8601 de la colonne Pas (PT30M, PT1H, ...)
+    STEP_PATTERN = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+    # Nombre de trous détaillés dans le résumé (les autres sont comptés)
+    MAX_REPORTED_GAPS = 20
+
+    def __init__(self, file_path: str, timestamp_at: str = "end"):
+        """
+        Initialise le validateur
+
+        Args:
+            file_path: Chemin vers le fichier CSV ENEDIS
+            timestamp_at: "end" si l'Horodate marque la fin de l'intervalle
+                mesuré (convention ENEDIS), "start" si elle en marque le début
+
+        Raises:
+            ValueError: Si la convention d'horodatage est inconnue
+        """
+        if timestamp_at not in TIMESTAMP_CONVENTIONS:
+            raise ValueError(f"Convention d'horodatage inconnue : {timestamp_at}")
+        self.file_path = Path(file_path)
+        self.timestamp_at = timestamp_at
+        self._steps = {}
+
+    def validate(self) -> dict:
+        """
+        Parcourt le fichier une fois et relève sa structure et ses erreurs
+
+        Returns:
+            Résumé {"file", "rows", "columns", "start", "end", "errors",
+            "warnings", "duplicates", "years", "gap_runs", "gaps"} où start
+            et end sont la première et la dernière horodate rencontrées,
+            years donne par année les heures présentes, manquantes (sur la
+            plage couverte par l'année) et le nombre de trous, et gaps les
+            premiers trous (début, nombre d'heures). Les heures sont celles
+            de Resampler : une horodate de fin d'intervalle est ramenée au
+            début de sa mesure, d'un pas (colonne Pas, une heure à défaut)
+        """
+        summary = {
+            "file": str(self.file_path),
+            "rows": 0,
+            "columns": [],
+            "start": None,
+            "end": None,
+            "errors": [],
+            "warnings": [],
+            "duplicates": 0,
+            "years": {},
+            "gap_runs": 0,
+            "gaps": [],
+        }
+        try:
+            with open(self.file_path, newline="", encoding="utf-8-sig") as handle:
+                rows = csv.reader(handle, delimiter=self.DELIMITER)
+                header = next(rows, None)
+                if header is None:
+                    summary["errors"].append("Fichier vide")
+                    return summary
+                summary["columns"] = header
+                self._check_rows(rows, header, summary)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            summary["errors"].append(f"Erreur de lecture du fichier : {e}")
+        return summary
+
+    def _check_rows(self, rows, header: list, summary: dict):
+        """
+        Vérifie les colonnes requises puis chaque ligne de données : nombre
+        de champs, horodate lisible et croissante, valeur entière positive
+
+        Args:
+            rows: Lecteur CSV positionné après l'en-tête
+            header: Noms des colonnes
+            summary: Résumé complété sur place
+        """
+        missing = [col for col in self.REQUIRED_COLUMNS if col not in header]
+        if missing:
+            summary["errors"].append(f"Colonnes manquantes : {', '.join(missing)}")
+            summary["rows"] = sum(1 for _ in rows)
+            return
+
+        horodate_col = header.index("Horodate")
+        valeur_col = header.index("Valeur")
+        pas_col = header.index("Pas") if "Pas" in header else None
+        problems = {
+            "bad_lengths": [],
+            "empty_values": [],
+            "bad_horodates": [],
+            "bad_values": [],
+            "unordered": [],
+            "duplicates": [],
+        }
+        start = end = None
+        previous = last_hour = None
+        # Fin de l'heure répétée au passage à l'heure d'hiver
+        repeat_until = None
+        for line, row in enumerate(rows, start=2):
+            summary["rows"] += 1
+            if len(row) != len(header):
+                problems["bad_lengths"].append(line)
+                continue
+            horodate, value = row[horodate_col], row[valeur_col]
+            if not horodate or not value:
+                problems["empty_values"].append(line)
+            elif not value.isdigit():
+                problems["bad_values"].append(line)
+            if not horodate:
+                continue
+            start = start or horodate
+            end = horodate
+            try:
+                timestamp = datetime.fromisoformat(horodate)
+            except ValueError:
+                problems["bad_horodates"].append(line)
+                continue
+            if timestamp.tzinfo is not None:
+                # Heure locale, comme les horodates lues par DataReader
+                timestamp = timestamp.replace(tzinfo=None)
+
+            if previous is not None and timestamp <= previous:
+                if timestamp == previous:
+                    problems["duplicates"].append(line)
+                elif self._is_dst_repeat(previous, timestamp):
+                    # Heure répétée : croissance vérifiée à partir de la
+                    # reprise, heures déjà comptées jusqu'à repeat_until
+                    repeat_until, previous = previous, timestamp
+                else:
+                    problems["unordered"].append(line)
+                continue
+            previous = timestamp
+            if repeat_until is not None and timestamp <= repeat_until:
+                continue
+            repeat_until = None
+            if self.timestamp_at == "end":
+                timestamp -= self._step(None if pas_col is None else row[pas_col])
+            hour = timestamp.replace(minute=0, second=0, microsecond=0)
+            if last_hour is None or hour > last_hour:
+                self._count_hour(summary, last_hour, hour)
+                last_hour = hour
+
+        summary["start"], summary["end"] = start, end
+        summary["duplicates"] = len(problems["duplicates"])
+        self._finish_years(summary)
+        if summary["rows"] == 0:
+            summary["errors"].append("Aucune ligne de données")
+        self._report(summary, problems["bad_lengths"], "Nombre de champs incorrect")
+        self._report(summary, problems["empty_values"], "Horodate ou valeur vide")
+        self._report(summary, problems["bad_horodates"], "Horodate illisible")
+        self._report(summary, problems["unordered"], "Horodates non croissantes")
+        self._report(summary, problems["bad_values"], "Valeur non entière ou négative")
+        self._report(
+            summary, problems["duplicates"], "Horodate en double", key="warnings"
+        )
+
+    def _step(self, pas: str) -> timedelta:
+        """
+        Convertit la durée de la colonne Pas, une seule fois par valeur
+        distincte
+
+        Args:
+            pas: Valeur de la colonne Pas (None sans colonne Pas)
+
+        Returns:
+            Pas de la mesure (une heure si absent ou illisible)
+        """
+        step = self._steps.get(pas)
+        if step is None:
+            match = self.STEP_PATTERN.fullmatch(pas or "")
+            hours, minutes, seconds = (
+                (int(part or 0) for part in match.groups()) if match else (0, 0, 0)
+            )
+            step = timedelta(hours=hours, minutes=minutes, seconds=seconds)
+            if not step:
+                step = self.HOUR
+            self._steps[pas] = step
+        return step
+
+    @staticmethod
+    def _is_dst_repeat(previous: datetime, timestamp: datetime) -> bool:
+        """
+        Reconnaît le retour en arrière de l'heure répétée au passage à
+        l'heure d'hiver (dernier dimanche d'octobre, entre 1 h et 3 h)
+
+        Args:
+            previous: Horodate précédente
+            timestamp: Horodate antérieure qui la suit
+
+        Returns:
+            True si le recul correspond au changement d'heure
+        """
+        return (
+            previous.month == 10
+            and previous.weekday() == 6
+            and previous.day >= 25
+            and previous.date() == timestamp.date()
+            and 1 <= timestamp.hour <= 3
+            and previous - timestamp <= CsvValidator.HOUR
+        )
+
+    def _count_hour(self, summary: dict, last_hour: datetime, hour: datetime):
+        """
+        Compte une nouvelle heure couverte et relève le trou qui la précède
+
+        Args:
+            summary: Résumé complété sur place
+            last_hour: Dernière heure couverte (None au début du fichier)
+            hour: Nouvelle heure couverte
+        """
+        year = summary["years"].setdefault(
+            str(hour.year),
+            {"hours": 0, "missing": 0, "gap_runs": 0, "first": hour, "last": hour},
+        )
+        year["hours"] += 1
+        year["last"] = hour
+        if last_hour is None or hour - last_hour == self.HOUR:
+            return
+        gap_start = last_hour + self.HOUR
+        length = (hour - gap_start) // self.HOUR
+        summary["gap_runs"] += 1
+        if gap_start.year == hour.year:
+            year["gap_runs"] += 1
+        if len(summary["gaps"]) < self.MAX_REPORTED_GAPS:
+            summary["gaps"].append((gap_start.isoformat(sep=" "), length))
+
+    def _finish_years(self, summary: dict):
+        """
+        Calcule les heures manquantes de chaque année sur sa plage couverte
+        et signale les trous
+
+        Args:
+            summary: Résumé complété sur place
+        """
+        for year in summary["years"].values():
+            first, last = year.pop("first"), year.pop("last")
+            year["missing"] = (last - first) // self.HOUR + 1 - year["hours"]
+        missing = sum(year["missing"] for year in summary["years"].values())
+        if missing:
+            summary["warnings"].append(
+                f"{missing} heures manquantes en {summary['gap_runs']} trous"
+            )
+
+    @staticmethod
+    def _report(summary: dict, lines: list, message: str, key: str = "errors"):
+        """Ajoute une erreur (ou un avertissement) groupée avec la première ligne concernée"""
+        if lines:
+            summary[key].append(
+                f"{message} ligne {lines[0]} ({len(lines)} occurrences)"
+            )
+
+
+def validate_csv(file_path: str, timestamp_at: str = "end") -> dict:
+    """
+    Valide un fichier CSV ENEDIS
+
+    Args:
+        file_path: Chemin du fichier
+        timestamp_at: Position de l'Horodate dans l'intervalle mesuré
+
+    Returns:
+        Résumé de la validation (voir CsvValidator.validate)
+    """
+    return CsvValidator(file_path, timestamp_at).validate()
@@ -3,47 +3,251 @@ Module de nettoyage et complétion des données ENEDIS
 """
 
 from datetime import datetime
+import numpy as np
 import pandas as pd
+from solarcalculet.constants import KW_DECIMALS
 
 
 class DataCleaner:
     """Classe pour nettoyer et compléter les données manquantes"""
 
-    def __init__(self, data: pd.DataFrame):
+    FILL_MODES = ("batch", "iterative")
+
+    # Chaîne de remplacement : colonnes de la table d'alignement calendaire
+    # essayées dans l'ordre, puis profil médian (mois, jour de semaine, heure)
+    ALIGNMENTS = (
+        ("next_year", "adjacent-year"),
+        ("previous_year", "adjacent-year"),
+        ("next_year_weekday", "weekday"),
+        ("previous_year_weekday", "weekday"),
+    )
+    PROFILE_KEYS = ["month", "weekday", "hour"]
+    PROFILE_SOURCE = "profile"
+    INTERPOLATION_SOURCE = "interpolation"
+    HOUR = np.timedelta64(1, "h")
+
+    # 52 semaines : même jour de la semaine, même heure, année voisine
+    WEEKDAY_SHIFT = pd.Timedelta(weeks=52)
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        profile: pd.Series = None,
+        low_memory: bool = False,
+        reference: tuple = None,
+    ):
         """
         Initialise le nettoyeur de données
 
         Args:
             data: DataFrame contenant les données ENEDIS
+            profile: Profil médian précalculé du compteur (voir profile()),
+                calculé à la demande sur les données si None
+            low_memory: Mode basse mémoire : les colonnes de data sont reprises
+                sans copie (l'appelant ne doit plus les modifier), Valeur en
+                float32, Source catégorielle et autres colonnes ignorées
+            reference: Tuple (HourlyStore, PRM) : les valeurs des années
+                alignées sont lues par accès indexé dans le stockage plutôt
+                que recherchées dans data (qui n'a alors besoin que de
+                l'année à compléter) ; seules les mesures d'origine y servent
+                de remplacement, pas les heures déjà complétées
+        """
+        self.low_memory = low_memory
+        self.reference = reference
+        if low_memory:
+            self.data = self._compact(data)
+        else:
+            self.data = data.copy()
+            if "Source" not in self.data.columns:
+                self.data["Source"] = "original"
+        self._epochs = np.array([], dtype="datetime64[ns]")
+        self._year_offsets = {}
+        self._profile = profile
+        self._build_index()
+
+    @staticmethod
+    def _compact(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Construit le DataFrame compact du mode basse mémoire, en reprenant
+        les colonnes existantes sans copie lorsque leur type convient
+
+        Args:
+            data: Données avec au moins Horodate et Valeur
+
+        Returns:
+            DataFrame Horodate, Valeur (float32), Source (catégorielle)
         """
-        self.data = data.copy()
-        if "Source" not in self.data.columns:
-            self.data["Source"] = "original"
+        if "Source" in data.columns:
+            source = data["Source"].astype("category")
+        else:
+            source = pd.Series(
+                pd.Categorical.from_codes(
+                    np.zeros(len(data), dtype=np.int8), categories=["original"]
+                ),
+                index=data.index,
+            )
+        return pd.DataFrame(
+            {
+                "Horodate": data["Horodate"],
+                "Valeur": data["Valeur"].astype(np.float32, copy=False),
+                "Source": source,
+            },
+            copy=False,
+        )
 
-    def detect_missing_hours(self, year: str) -> list:
+    def _build_index(self):
+        """
+        Trie les données par Horodate (si nécessaire) et précalcule l'index
+        temporel trié ainsi que les bornes [début, fin) de chaque année
+        """
+        if not self.data["Horodate"].is_monotonic_increasing:
+            self.data = self.data.sort_values("Horodate", kind="mergesort")
+        if not self.data.index.equals(pd.RangeIndex(len(self.data))):
+            # Renumérotation sans copie des colonnes
+            self.data.index = pd.RangeIndex(len(self.data))
+
+        # Les NaT sont triés en fin de tableau : ils sont exclus de l'index
+        epochs = self.data["Horodate"].to_numpy(dtype="datetime64[ns]")
+        self._epochs = epochs[: int((~np.isnat(epochs)).sum())]
+
+        self._year_offsets = {}
+        if len(self._epochs) == 0:
+            return
+        first_year = self._epochs[0].astype("datetime64[Y]").astype(int) + 1970
+        last_year = self._epochs[-1].astype("datetime64[Y]").astype(int) + 1970
+        boundaries = (
+            np.arange(first_year, last_year + 2).astype(str).astype("datetime64[ns]")
+        )
+        offsets = np.searchsorted(self._epochs, boundaries, side="left")
+        for year, start, stop in zip(
+            range(first_year, last_year + 1), offsets[:-1], offsets[1:]
+        ):
+            if stop > start:
+                self._year_offsets[year] = (int(start), int(stop))
+
+    def locate(self, timestamps) -> np.ndarray:
+        """
+        Recherche dichotomique de dates dans l'index trié
+
+        Args:
+            timestamps: Dates à rechercher (liste, DatetimeIndex ou tableau)
+
+        Returns:
+            Positions des premières lignes correspondantes (-1 si absente)
+        """
+        targets = pd.DatetimeIndex(timestamps).to_numpy(dtype="datetime64[ns]")
+        positions = np.searchsorted(self._epochs, targets, side="left")
+        found = positions < len(self._epochs)
+        found[found] = self._epochs[positions[found]] == targets[found]
+        return np.where(found, positions, -1)
+
+    def detect_missing_hours(self, year: str, full_year: bool = False) -> list:
         """
         Détecte les heures manquantes pour une année donnée
 
         Args:
             year: Année à vérifier (str)
+            full_year: Vérifie toute l'année civile au lieu de la plage
+                couverte par les données
 
         Returns:
-            Liste des datetimes manquants
+            Liste des datetimes manquants (voir gap_runs pour l'index compact)
         """
-        # Filtre les données pour l'année
-        year_data = self.get_data_by_year(year)
+        return list(self._expand_runs(self.gap_runs(year, full_year=full_year)))
 
-        if year_data.empty:
-            return []
+    def gap_runs(self, year: str, full_year: bool = False) -> pd.DataFrame:
+        """
+        Index des trous d'une année en plages (début, nombre d'heures),
+        calculé par différence des horodates triées consécutives
+
+        Args:
+            year: Année à vérifier
+            full_year: Inclut les trous de début et de fin de l'année civile
+                au lieu de s'en tenir à la plage couverte par les données
+
+        Returns:
+            DataFrame trié start (première heure manquante), hours (nombre
+            d'heures manquantes consécutives)
+        """
+        start, stop = self._year_offsets.get(int(year), (0, 0))
+        epochs = self._epochs[start:stop]
+        if full_year:
+            # Bornes de l'année encadrées par deux mesures fictives : les
+            # trous de début et de fin deviennent des plages ordinaires
+            first_hour, last_hour = self.year_bounds(year)
+            epochs = np.concatenate(
+                [
+                    [np.datetime64(first_hour, "ns") - self.HOUR],
+                    epochs,
+                    [np.datetime64(last_hour, "ns") + self.HOUR],
+                ]
+            )
+        if len(epochs) == 0:
+            return self._empty_runs()
+        # Heures de la grille horaire strictement comprises entre deux mesures
+        steps = (np.diff(epochs) - np.timedelta64(1, "ns")) // self.HOUR
+        gaps = np.flatnonzero(steps > 0)
+        return pd.DataFrame(
+            {
+                "start": epochs[gaps] + self.HOUR,
+                "hours": steps[gaps].astype(np.int64),
+            }
+        )
+
+    def gap_report(
+        self, max_interpolation: int = 0, full_year: bool = False
+    ) -> pd.DataFrame:
+        """
+        Rapport des trous de toutes les années, d'après l'index des plages
+
+        Args:
+            max_interpolation: Longueur maximale (heures) des trous interpolés
+            full_year: Inclut les trous de début et de fin d'année civile
+
+        Returns:
+            DataFrame year, start, end (dernière heure manquante), hours et
+            fill (stratégie prévue : "interpolation" ou "replacement")
+        """
+        report = pd.concat(
+            [
+                self.gap_runs(year, full_year=full_year).assign(year=str(year))
+                for year in self.years()
+            ]
+            # Sans données : rapport vide aux types de gap_runs
+            or [self._empty_runs().assign(year="")],
+            ignore_index=True,
+        )
+        report["end"] = report["start"] + (report["hours"] - 1) * self.HOUR
+        short, _, _ = self._interpolable(report, max_interpolation)
+        report["fill"] = np.where(short, self.INTERPOLATION_SOURCE, "replacement")
+        return report[["year", "start", "end", "hours", "fill"]]
 
-        # Utilise la plage de dates existante
-        start_date = year_data["Horodate"].min()
-        end_date = year_data["Horodate"].max()
-        expected_dates = pd.date_range(start=start_date, end=end_date, freq="H")
+    @staticmethod
+    def _empty_runs() -> pd.DataFrame:
+        """Index de plages vide"""
+        return pd.DataFrame(
+            {
+                "start": pd.Series(dtype="datetime64[ns]"),
+                "hours": pd.Series(dtype=np.int64),
+            }
+        )
 
-        # Trouve les dates manquantes
-        missing_dates = expected_dates[~expected_dates.isin(year_data["Horodate"])]
-        return list(missing_dates)
+    @classmethod
+    def _expand_runs(cls, runs: pd.DataFrame) -> pd.DatetimeIndex:
+        """
+        Développe des plages (start, hours) en la liste de leurs heures
+
+        Args:
+            runs: Plages de trous (voir gap_runs)
+
+        Returns:
+            Heures manquantes, triées
+        """
+        hours = runs["hours"].to_numpy()
+        offsets = np.arange(hours.sum()) - np.repeat(np.cumsum(hours) - hours, hours)
+        return pd.DatetimeIndex(
+            np.repeat(runs["start"].to_numpy(), hours) + offsets * cls.HOUR
+        )
 
     def find_replacement_data(self, missing_dt: datetime) -> float:
         """
@@ -55,51 +259,371 @@ class DataCleaner:
         Returns:
             Valeur de remplacement ou None si non trouvée
         """
-        # Cherche d'abord dans l'année suivante
-        next_year = missing_dt.year + 1
-        next_year_dt = missing_dt.replace(year=next_year)
-        replacement = self.data[self.data["Horodate"] == next_year_dt]
+        value, _ = self._find_replacement(missing_dt)
+        return value
 
-        if not replacement.empty:
-            return replacement.iloc[0]["Valeur"]
+    def _find_replacement(self, missing_dt: datetime) -> tuple:
+        """
+        Cherche la valeur de remplacement et sa source (stratégie utilisée),
+        stratégie par stratégie pour une seule heure : implémentation de
+        référence du mode "iterative", indépendante de la table d'alignement
+        du mode batch
 
-        # Si non trouvé, cherche dans l'année précédente
-        prev_year = missing_dt.year - 1
-        prev_year_dt = missing_dt.replace(year=prev_year)
-        replacement = self.data[self.data["Horodate"] == prev_year_dt]
+        Args:
+            missing_dt: Date et heure manquante
 
-        if not replacement.empty:
-            return replacement.iloc[0]["Valeur"]
+        Returns:
+            Tuple (valeur, source) ou (None, None) si non trouvée
+        """
+        missing_dt = pd.Timestamp(missing_dt)
+        candidates = []
+        for offset in (1, -1):
+            try:
+                candidates.append(
+                    (missing_dt.replace(year=missing_dt.year + offset), "adjacent-year")
+                )
+            except ValueError:
+                # 29 février absent de l'année voisine
+                pass
+        candidates += [
+            (missing_dt + self.WEEKDAY_SHIFT, "weekday"),
+            (missing_dt - self.WEEKDAY_SHIFT, "weekday"),
+        ]
+        for target, strategy in candidates:
+            values, found = self._lookup(pd.DatetimeIndex([target]))
+            if found[0]:
+                return values[0], f"{strategy}:{target.year}"
 
-        return None
+        value = self.profile().get(
+            (missing_dt.month, missing_dt.weekday(), missing_dt.hour)
+        )
+        if value is None or np.isnan(value):
+            return None, None
+        return value, self.PROFILE_SOURCE
 
-    def fill_missing_data(self, year: str) -> pd.DataFrame:
+    def calendar_alignment(self, timestamps) -> pd.DataFrame:
         """
-        Remplit les données manquantes pour une année
+        Construit la table d'alignement calendaire des dates à compléter
+
+        Les décalages sont calculés en heure locale (celle des horodates
+        ENEDIS) : une date alignée garde l'heure de la journée, y compris
+        les jours de changement d'heure. Une heure qui n'existe pas à la date
+        alignée (29 février, heure sautée au printemps) reste simplement
+        introuvable et passe à la stratégie suivante.
+
+        Args:
+            timestamps: Dates à compléter
+
+        Returns:
+            DataFrame indexé par les dates : même heure l'année suivante et
+            précédente (NaT le 29 février), même jour de la semaine 52
+            semaines après et avant, et clés du profil (mois, jour, heure)
+        """
+        timestamps = pd.DatetimeIndex(timestamps)
+        return pd.DataFrame(
+            {
+                "next_year": self._shift_years(timestamps, 1),
+                "previous_year": self._shift_years(timestamps, -1),
+                "next_year_weekday": timestamps + self.WEEKDAY_SHIFT,
+                "previous_year_weekday": timestamps - self.WEEKDAY_SHIFT,
+                "month": timestamps.month,
+                "weekday": timestamps.weekday,
+                "hour": timestamps.hour,
+            },
+            index=timestamps,
+        )
+
+    def profile(self) -> pd.Series:
+        """
+        Donne le profil médian (mois, jour de la semaine, heure) du compteur,
+        calculé une seule fois sur les mesures d'origine
+
+        Returns:
+            Série des valeurs médianes indexée par (month, weekday, hour)
+        """
+        if self._profile is None:
+            original = self.data
+            is_original = self.data["Source"] == "original"
+            if not is_original.all():
+                original = self.data[is_original]
+
+            # Clé unique (mois, jour, heure) sur un entier court plutôt que
+            # trois colonnes de regroupement
+            horodates = original["Horodate"].dt
+            keys = (
+                (horodates.month.to_numpy(dtype=np.int16) - 1) * 7
+                + horodates.weekday.to_numpy(dtype=np.int16)
+            ) * 24 + horodates.hour.to_numpy(dtype=np.int16)
+            medians = original["Valeur"].groupby(keys).median()
+            month_weekday, hour = np.divmod(medians.index.to_numpy(), 24)
+            month, weekday = np.divmod(month_weekday, 7)
+            medians.index = pd.MultiIndex.from_arrays(
+                [month + 1, weekday, hour], names=self.PROFILE_KEYS
+            )
+            self._profile = medians.round(KW_DECIMALS)
+        return self._profile
+
+    def fill_missing_data(
+        self,
+        year: str,
+        mode: str = "batch",
+        full_year: bool = False,
+        max_interpolation: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Remplit les données manquantes pour une année, plage de trou par plage
 
         Args:
             year: Année à compléter
+            mode: "batch" (résolution de toutes les heures manquantes en une
+                seule jointure) ou "iterative" (recherche heure par heure)
+            full_year: Complète toute l'année civile au lieu de la plage
+                couverte par les données
+            max_interpolation: Les trous d'au plus ce nombre d'heures, encadrés
+                par deux mesures, sont interpolés linéairement (Source
+                "interpolation") ; les autres passent par la chaîne de
+                remplacement (désactivé à 0)
+
+        Returns:
+            DataFrame avec les données complétées (l'index interne est mis à
+            jour, get_data_by_year renvoie ensuite les données complétées) ;
+            en mode basse mémoire, les données du nettoyeur elles-mêmes
+        """
+        if mode not in self.FILL_MODES:
+            raise ValueError(f"Mode de remplissage inconnu : {mode}")
+
+        runs = self.gap_runs(year, full_year=full_year)
+        interpolated = None
+        if max_interpolation > 0:
+            interpolated, runs = self._interpolate_runs(runs, max_interpolation)
+        missing_hours = self._expand_runs(runs)
+        if mode == "batch":
+            new_rows = self._build_batch_rows(missing_hours)
+        else:
+            new_rows = self._build_iterative_rows(missing_hours)
+        if interpolated is not None and not interpolated.empty:
+            new_rows = (
+                pd.concat([interpolated, new_rows], ignore_index=True)
+                if not new_rows.empty
+                else interpolated
+            )
+
+        # Ajoute toutes les lignes complétées en une seule opération
+        if not new_rows.empty:
+            self.data = pd.concat([self.data, new_rows], ignore_index=True)
+            if self.low_memory:
+                self.data = self._compact(self.data)
+            self._build_index()
+
+        return self.data if self.low_memory else self.data.copy()
+
+    def _interpolable(self, runs: pd.DataFrame, max_hours: int) -> tuple:
+        """
+        Repère les plages assez courtes et encadrées par deux mesures
+
+        Args:
+            runs: Plages de trous (voir gap_runs)
+            max_hours: Longueur maximale des plages interpolées
+
+        Returns:
+            Tuple (masque des plages interpolables, positions des mesures
+            précédant et suivant chaque plage, -1 si absentes)
+        """
+        starts = runs["start"].to_numpy()
+        hours = runs["hours"].to_numpy()
+        before = self.locate(starts - self.HOUR)
+        after = self.locate(starts + hours * self.HOUR)
+        return (hours <= max_hours) & (before >= 0) & (after >= 0), before, after
+
+    def _interpolate_runs(self, runs: pd.DataFrame, max_hours: int) -> tuple:
+        """
+        Interpole linéairement, en une opération vectorisée, les plages
+        courtes encadrées par deux mesures connues
+
+        Args:
+            runs: Plages de trous (voir gap_runs)
+            max_hours: Longueur maximale des plages interpolées
 
         Returns:
-            DataFrame avec les données complétées
+            Tuple (lignes interpolées, plages restant à compléter)
         """
-        missing_hours = self.detect_missing_hours(year)
-        df = self.data.copy()
+        starts = runs["start"].to_numpy()
+        short, before, after = self._interpolable(runs, max_hours)
+
+        lengths = runs["hours"].to_numpy()[short]
+        known_values = self.data["Valeur"].to_numpy(dtype=np.float64)
+        left = np.repeat(known_values[before[short]], lengths)
+        right = np.repeat(known_values[after[short]], lengths)
+        # Rang de chaque heure dans sa plage (1 à longueur)
+        ranks = (
+            np.arange(lengths.sum())
+            - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            + 1
+        )
+        weights = ranks / np.repeat(lengths + 1, lengths)
+        rows = pd.DataFrame(
+            {
+                "Horodate": np.repeat(starts[short], lengths) + (ranks - 1) * self.HOUR,
+                "Valeur": np.round(left + (right - left) * weights, KW_DECIMALS),
+                "Source": self.INTERPOLATION_SOURCE,
+            }
+        )
+        return rows, runs[~short].reset_index(drop=True)
 
+    def _build_iterative_rows(self, missing_hours: list) -> pd.DataFrame:
+        """
+        Construit les lignes de remplacement heure par heure (même chaîne
+        de stratégies que le mode batch, appliquée à une heure à la fois)
+
+        Args:
+            missing_hours: Liste des datetimes manquants
+
+        Returns:
+            DataFrame des lignes complétées
+        """
+        rows = {"Horodate": [], "Valeur": [], "Source": []}
         for missing_dt in missing_hours:
-            replacement_value = self.find_replacement_data(missing_dt)
-            if replacement_value is not None:
-                # Ajoute la nouvelle ligne avec la donnée de remplacement
-                new_row = pd.DataFrame(
-                    {
-                        "Horodate": [missing_dt],
-                        "Valeur": [replacement_value],
-                        "Source": [str(missing_dt.year + 1)],  # Source = année utilisée
-                    }
-                )
-                df = pd.concat([df, new_row], ignore_index=True)
+            value, source = self._find_replacement(missing_dt)
+            if value is not None:
+                rows["Horodate"].append(missing_dt)
+                rows["Valeur"].append(value)
+                rows["Source"].append(source)  # Source = stratégie et année utilisées
+
+        return pd.DataFrame(rows)
+
+    def _build_batch_rows(self, missing_hours: list) -> pd.DataFrame:
+        """
+        Construit les lignes de remplacement en parcourant la chaîne de
+        stratégies sur toutes les heures manquantes à la fois : même heure
+        l'année suivante puis précédente, même jour de la semaine et même
+        heure 52 semaines après puis avant, puis profil médian du compteur
+
+        Args:
+            missing_hours: Liste des datetimes manquants
+
+        Returns:
+            DataFrame des lignes complétées (Source = "<stratégie>:<année
+            utilisée>" ou "profile")
+        """
+        missing = pd.DatetimeIndex(missing_hours)
+        if missing.empty:
+            return pd.DataFrame(columns=["Horodate", "Valeur", "Source"])
+
+        alignment = self.calendar_alignment(missing)
+        values = np.full(len(missing), np.nan)
+        sources = np.full(len(missing), None, dtype=object)
+        filled = np.zeros(len(missing), dtype=bool)
+        for column, strategy in self.ALIGNMENTS:
+            pending = np.flatnonzero(~filled)
+            if len(pending) == 0:
+                break
+            targets = pd.DatetimeIndex(alignment[column].to_numpy()[pending])
+            found_values, take = self._lookup(targets)
+            values[pending[take]] = found_values[take]
+            sources[pending[take]] = strategy + ":" + targets[take].year.astype(str)
+            filled[pending[take]] = True
+
+        pending = np.flatnonzero(~filled)
+        if len(pending) > 0 and not self.profile().empty:
+            keys = pd.MultiIndex.from_frame(alignment[self.PROFILE_KEYS].iloc[pending])
+            medians = self.profile().reindex(keys).to_numpy()
+            take = ~np.isnan(medians)
+            values[pending[take]] = medians[take]
+            sources[pending[take]] = self.PROFILE_SOURCE
+            filled[pending[take]] = True
+
+        return pd.DataFrame(
+            {
+                "Horodate": missing[filled],
+                "Valeur": values[filled],
+                "Source": sources[filled],
+            }
+        )
+
+    def _lookup(self, targets: pd.DatetimeIndex) -> tuple:
+        """
+        Lit les valeurs connues à des dates alignées
+
+        Args:
+            targets: Dates recherchées (NaT admis)
+
+        Returns:
+            Tuple (valeurs, booléens « trouvée »)
+        """
+        if self.reference is not None:
+            store, prm = self.reference
+            return store.lookup(prm, targets, original_only=True)
+        found = self.locate(targets)
+        take = found >= 0
+        values = np.full(len(targets), np.nan)
+        values[take] = self.data["Valeur"].to_numpy()[found[take]]
+        return values, take
+
+    @staticmethod
+    def _shift_years(timestamps: pd.DatetimeIndex, offset: int) -> pd.DatetimeIndex:
+        """
+        Décale des dates d'un nombre d'années en conservant mois, jour et heure
+
+        Args:
+            timestamps: Dates à décaler
+            offset: Nombre d'années (positif ou négatif)
+
+        Returns:
+            Dates décalées (NaT si la date n'existe pas, ex. 29 février)
+        """
+        parts = pd.DataFrame(
+            {
+                "year": timestamps.year + offset,
+                "month": timestamps.month,
+                "day": timestamps.day,
+                "hour": timestamps.hour,
+                "minute": timestamps.minute,
+                "second": timestamps.second,
+            }
+        )
+        return pd.DatetimeIndex(pd.to_datetime(parts, errors="coerce"))
+
+    def years(self) -> list:
+        """
+        Liste les années présentes dans les données
 
-        return df.sort_values("Horodate").reset_index(drop=True)
+        Returns:
+            Liste triée des années (int)
+        """
+        return sorted(self._year_offsets)
+
+    @staticmethod
+    def year_bounds(year: str) -> tuple:
+        """
+        Donne la première et la dernière heure d'une année civile
+
+        Args:
+            year: Année
+
+        Returns:
+            Tuple (1er janvier 0:00, 31 décembre 23:00)
+        """
+        return pd.Timestamp(int(year), 1, 1), pd.Timestamp(int(year), 12, 31, 23)
+
+    def covers_full_year(self, year: str) -> bool:
+        """
+        Vérifie que les données couvrent l'année civile entière (les trous
+        intermédiaires sont admis)
+
+        Args:
+            year: Année à vérifier
+
+        Returns:
+            True si la première et la dernière heure de l'année sont présentes
+        """
+        year_data = self.get_data_by_year(year)
+        if year_data.empty:
+            return False
+        first_hour, last_hour = self.year_bounds(year)
+        return (
+            year_data["Horodate"].iloc[0] <= first_hour
+            and year_data["Horodate"].iloc[-1] >= last_hour
+        )
 
     def get_data_by_year(self, year: str) -> pd.DataFrame:
         """
@@ -111,4 +635,20 @@ class DataCleaner:
         Returns:
             DataFrame filtré pour l'année
         """
-        return self.data[self.data["Horodate"].dt.year == int(year)]
+        start, stop = self._year_offsets.get(int(year), (0, 0))
+        return self.data.iloc[start:stop]
+
+    def get_data_by_range(self, start: datetime, end: datetime) -> pd.DataFrame:
+        """
+        Extrait les données d'une plage de dates [start, end)
+
+        Args:
+            start: Date de début (incluse)
+            end: Date de fin (exclue)
+
+        Returns:
+            DataFrame filtré pour la plage
+        """
+        bounds = pd.DatetimeIndex([start, end]).to_numpy(dtype="datetime64[ns]")
+        first, last = np.searchsorted(self._epochs, bounds, side="left")
+        return self.data.iloc[first : max(first, last)]
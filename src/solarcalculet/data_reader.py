@@ -2,23 +2,123 @@
 Module de lecture et validation des données ENEDIS
 """
 
+import io
+from importlib.util import find_spec
 from pathlib import Path
 import pandas as pd
+from solarcalculet.instrumentation import NULL_INSTRUMENTATION, Instrumentation
+from solarcalculet.parse_cache import ParseCache
+from solarcalculet.year_partitions import YearPartitions
 
 
 class DataReader:
     """Classe pour lire et valider les données ENEDIS"""
 
     REQUIRED_COLUMNS = ["Horodate", "Valeur"]
+    PIPELINE_COLUMNS = ["Identifiant PRM", "Horodate", "Valeur", "Pas"]
+    PIPELINE_DTYPES = {
+        "Identifiant PRM": "category",
+        "Valeur": "float64",
+        "Pas": "category",
+    }
+    # Types du mode basse mémoire (remplacent ceux de PIPELINE_DTYPES)
+    LOW_MEMORY_DTYPES = {"Valeur": "float32"}
+    HORODATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    READ_MODES = ("generic", "fast")
+    DEFAULT_CHUNKSIZE = 100_000
 
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        mode: str = "generic",
+        cache: ParseCache = None,
+        low_memory: bool = False,
+    ):
         """
         Initialise le lecteur de données
 
         Args:
             file_path: Chemin vers le fichier CSV ENEDIS
+            mode: Mode de lecture, "generic" (toutes les colonnes, format de
+                date déduit) ou "fast" (colonnes utiles et format fixe)
+            cache: Cache des données lues et converties (désactivé si None)
+            low_memory: Valeurs en float32 et conversion en kW sans copie
         """
+        if mode not in self.READ_MODES:
+            raise ValueError(f"Mode de lecture inconnu : {mode}")
         self.file_path = Path(file_path)
+        self.mode = mode
+        self.cache = cache
+        self.low_memory = low_memory
+
+    @property
+    def pipeline_dtypes(self) -> dict:
+        """Types des colonnes utiles, selon le mode mémoire"""
+        if self.low_memory:
+            return {**self.PIPELINE_DTYPES, **self.LOW_MEMORY_DTYPES}
+        return self.PIPELINE_DTYPES
+
+    def load(self, instrumentation: Instrumentation = None) -> pd.DataFrame:
+        """
+        Lit le fichier, vérifie les colonnes requises et convertit en kW,
+        en passant par le cache s'il est configuré
+
+        Args:
+            instrumentation: Mesure des étapes de lecture et de conversion
+
+        Returns:
+            DataFrame des colonnes utiles, valeurs en kW
+        """
+        instrumentation = instrumentation or NULL_INSTRUMENTATION
+        key = None
+        if self.cache is not None:
+            options = {"mode": self.mode, "columns": self.PIPELINE_COLUMNS}
+            if self.low_memory:
+                options["dtypes"] = self.pipeline_dtypes
+            key = self.cache.make_key(self.file_path, options)
+            with instrumentation.stage("read", source="cache") as stage:
+                cached = self.cache.get(key)
+                stage.rows_out = None if cached is None else len(cached)
+            if cached is not None:
+                return cached
+
+        with instrumentation.stage("read") as stage:
+            df = self.read()
+            stage.rows_out = len(df)
+        df = self.prepare(df, instrumentation)
+
+        if self.cache is not None:
+            self.cache.put(key, df)
+        return df
+
+    def prepare(
+        self, df: pd.DataFrame, instrumentation: Instrumentation = None
+    ) -> pd.DataFrame:
+        """
+        Vérifie les colonnes requises, garde les colonnes utiles et convertit
+        en kW des données déjà lues (fichier ou flux)
+
+        Args:
+            df: Données lues (l'appelant cède le DataFrame en mode basse mémoire)
+            instrumentation: Mesure de l'étape de conversion
+
+        Returns:
+            DataFrame des colonnes utiles, valeurs en kW
+        """
+        instrumentation = instrumentation or NULL_INSTRUMENTATION
+        missing_cols = self.validate_columns(df)
+        if missing_cols:
+            raise ValueError(f"Colonnes manquantes : {', '.join(missing_cols)}")
+        with instrumentation.stage("convert_kw", rows_in=len(df)) as stage:
+            columns = [col for col in df.columns if col in self.PIPELINE_COLUMNS]
+            if columns != list(df.columns):
+                df = df[columns]
+            if self.low_memory:
+                # Repli générique : types non imposés à la lecture
+                df = df.astype(self.LOW_MEMORY_DTYPES, copy=False)
+            df = self.convert_to_kw(df, copy=not self.low_memory)
+            stage.rows_out = len(df)
+        return df
 
     def read(self) -> pd.DataFrame:
         """
@@ -27,11 +127,155 @@ class DataReader:
         Returns:
             DataFrame contenant les données
         """
+        if self.mode == "fast":
+            df = self._read_fast()
+            if df is not None:
+                return df
+
         df = pd.read_csv(self.file_path, sep=";")
         if "Horodate" in df.columns:
             df["Horodate"] = pd.to_datetime(df["Horodate"])
         return df
 
+    def _read_fast(self) -> pd.DataFrame:
+        """
+        Lit uniquement les colonnes utiles avec des types explicites et le
+        format d'horodate connu (moteur pyarrow si disponible)
+
+        Returns:
+            DataFrame contenant les données, ou None si le fichier ne respecte
+            pas le format attendu (repli sur la lecture générique)
+        """
+        header = pd.read_csv(self.file_path, sep=";", nrows=0).columns
+        if any(col not in header for col in self.REQUIRED_COLUMNS):
+            return None
+        usecols = [col for col in header if col in self.PIPELINE_COLUMNS]
+        dtypes = {
+            col: dtype for col, dtype in self.pipeline_dtypes.items() if col in usecols
+        }
+
+        engine = "pyarrow" if find_spec("pyarrow") is not None else "c"
+        try:
+            df = pd.read_csv(
+                self.file_path,
+                sep=";",
+                usecols=usecols,
+                dtype=dtypes,
+                engine=engine,
+            )
+            if not pd.api.types.is_datetime64_any_dtype(df["Horodate"]):
+                df["Horodate"] = pd.to_datetime(
+                    df["Horodate"], format=self.HORODATE_FORMAT
+                )
+        except (ValueError, TypeError):
+            return None
+        return df
+
+    def read_chunks(self, chunksize: int = DEFAULT_CHUNKSIZE):
+        """
+        Lit le fichier CSV ENEDIS par blocs de taille bornée
+
+        Args:
+            chunksize: Nombre de lignes par bloc
+
+        Yields:
+            DataFrame de chaque bloc (colonnes utiles seulement en mode "fast")
+        """
+        usecols, dtypes = self._chunk_options(
+            pd.read_csv(self.file_path, sep=";", nrows=0).columns
+        )
+        with pd.read_csv(
+            self.file_path, sep=";", usecols=usecols, dtype=dtypes, chunksize=chunksize
+        ) as chunks:
+            for chunk in chunks:
+                if "Horodate" in chunk.columns:
+                    chunk["Horodate"] = self._parse_horodate(chunk["Horodate"])
+                yield chunk
+
+    def parse_lines(self, header: str, lines: list) -> pd.DataFrame:
+        """
+        Analyse un bloc de lignes CSV reçues d'un flux (téléchargement), avec
+        les mêmes colonnes et types que read_chunks
+
+        Args:
+            header: Ligne d'en-tête du fichier
+            lines: Lignes de données du bloc (fins de ligne comprises)
+
+        Returns:
+            DataFrame du bloc
+        """
+        usecols, dtypes = self._chunk_options(header.rstrip("\r\n").split(";"))
+        chunk = pd.read_csv(
+            io.StringIO(header + "".join(lines)), sep=";", usecols=usecols, dtype=dtypes
+        )
+        if "Horodate" in chunk.columns:
+            chunk["Horodate"] = self._parse_horodate(chunk["Horodate"])
+        return chunk
+
+    def _chunk_options(self, header: list) -> tuple:
+        """
+        Colonnes et types imposés à la lecture par blocs
+
+        Args:
+            header: Noms des colonnes du fichier
+
+        Returns:
+            Tuple (colonnes lues, types), (None, None) en mode "generic"
+        """
+        if self.mode != "fast":
+            return None, None
+        usecols = [col for col in header if col in self.PIPELINE_COLUMNS]
+        dtypes = {
+            col: dtype for col, dtype in self.pipeline_dtypes.items() if col in usecols
+        }
+        return usecols, dtypes
+
+    def partition_by_year(
+        self,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        spill_dir: str = None,
+        max_memory: int = None,
+    ) -> YearPartitions:
+        """
+        Lit le fichier par blocs et répartit les lignes par année au fil de l'eau
+
+        Args:
+            chunksize: Nombre de lignes par bloc
+            spill_dir: Répertoire de déversement des partitions sur disque
+            max_memory: Taille maximale en octets des partitions en mémoire
+
+        Returns:
+            Partitions annuelles des données
+        """
+        partitions = YearPartitions(
+            spill_dir=spill_dir, max_memory=max_memory, dtypes=self.pipeline_dtypes
+        )
+        for chunk in self.read_chunks(chunksize):
+            missing = self.validate_columns(chunk)
+            if missing:
+                partitions.close()
+                raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+            partitions.add(chunk)
+        return partitions
+
+    def _parse_horodate(self, horodates: pd.Series) -> pd.Series:
+        """
+        Convertit les horodates, avec le format fixe en mode "fast" et repli
+        sur la détection automatique du format
+
+        Args:
+            horodates: Série des horodates brutes
+
+        Returns:
+            Série au format datetime
+        """
+        if self.mode == "fast":
+            try:
+                return pd.to_datetime(horodates, format=self.HORODATE_FORMAT)
+            except ValueError:
+                pass
+        return pd.to_datetime(horodates)
+
     def validate_columns(self, df: pd.DataFrame) -> list:
         """
         Vérifie la présence des colonnes requises
@@ -48,16 +292,19 @@ class DataReader:
                 missing.append(col)
         return missing
 
-    def convert_to_kw(self, df: pd.DataFrame) -> pd.DataFrame:
+    def convert_to_kw(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
         """
         Convertit les valeurs de W en kW
 
         Args:
             df: DataFrame avec les valeurs en W
+            copy: Travaille sur une copie ; si False, la colonne Valeur de df
+                est remplacée (l'appelant cède le DataFrame)
 
         Returns:
-            DataFrame avec les valeurs en kW
+            DataFrame avec les valeurs en kW (type de Valeur conservé)
         """
-        df = df.copy()
+        if copy:
+            df = df.copy()
         df["Valeur"] = df["Valeur"] / 1000
         return df
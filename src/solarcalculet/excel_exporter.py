@@ -2,7 +2,21 @@
 Module d'export des données au format Excel
 """
 
+import calendar
+import math
+import numbers
+import os
+from functools import lru_cache
+from pathlib import Path
+from zipfile import BadZipFile
+import numpy as np
 import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils.exceptions import InvalidFileException
+from solarcalculet.constants import EXPORT_ENGINES, KW_DECIMALS
+from solarcalculet.template_writer import TemplateWriter
 
 
 class ExcelExporter:
@@ -19,14 +33,114 @@ class ExcelExporter:
     6. Each value must be greater than or equal to 0 (max 6 decimals for kW, 2 for W).
     """
 
-    def __init__(self, data: pd.DataFrame):
+    HEADER_ROWS = [
+        ("Note", EXCEL_TEMPLATE),
+        ("Time Interval", "60"),
+        ("Unit", "kW"),
+        ("Month/Day Hour:Minute", "Load Power"),
+    ]
+
+    SHEET_NAME = "Sheet1"
+    COLUMN_WIDTHS = {"A": 25, "B": 15}
+    EXPORT_ENGINES = EXPORT_ENGINES
+    UNIT_DECIMALS = {"kW": KW_DECIMALS, "W": 2}
+
+    # Rangs horaires [début, fin) du 29 février dans la table des libellés
+    LEAP_DAY_SLOTS = (59 * 24, 60 * 24)
+
+    # Style appliqué par pandas aux libellés de la colonne A
+    _THIN_SIDE = Side(style="thin")
+    LABEL_FONT = Font(bold=True)
+    LABEL_BORDER = Border(
+        left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE
+    )
+    LABEL_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        engine: str = "pandas",
+        template_file: str = None,
+        low_memory: bool = False,
+    ):
         """
         Initialise l'exporteur Excel
 
         Args:
             data: DataFrame contenant les données à exporter
+            engine: Moteur d'export par défaut ("pandas", "streaming" ou
+                "template")
+            template_file: Classeur modèle (filled_template.xlsx) dans lequel
+                le moteur "template" injecte les données
+            low_memory: Utilise data sans copie (l'exporteur ne le modifie pas)
+        """
+        self.data = data if low_memory else data.copy()
+        self.engine = self._check_engine(engine)
+        self.template_file = template_file
+
+    @classmethod
+    def from_hourly_store(
+        cls, store, prm: str, year, engine: str = "pandas", template_file: str = None
+    ) -> "ExcelExporter":
+        """
+        Crée un exporteur sur une année d'un stockage à emplacements fixes,
+        lue sans copie (tranche contiguë du fichier si l'année est complète)
+
+        Args:
+            store: Stockage HourlyStore
+            prm: Identifiant du compteur
+            year: Année à exporter
+            engine: Moteur d'export par défaut
+            template_file: Classeur modèle du moteur "template"
+
+        Returns:
+            Exporteur de l'année
+        """
+        return cls(
+            store.read_year(prm, year, low_memory=True),
+            engine=engine,
+            template_file=template_file,
+            low_memory=True,
+        )
+
+    @classmethod
+    def _check_engine(cls, engine: str) -> str:
+        """
+        Vérifie que le moteur d'export est supporté
+
+        Args:
+            engine: Nom du moteur
+
+        Returns:
+            Nom du moteur validé
+        """
+        if engine not in cls.EXPORT_ENGINES:
+            raise ValueError(f"Moteur d'export inconnu : {engine}")
+        return engine
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _label_table() -> tuple:
         """
-        self.data = data.copy()
+        Construit une seule fois la table des libellés "M/D H:00" d'une année
+        bissextile complète (366 jours x 24 heures)
+
+        Returns:
+            Tuple (libellés, jours cumulés avant chaque mois)
+        """
+        hours = pd.date_range(
+            "2000-01-01", periods=366 * 24, freq=pd.Timedelta(hours=1)
+        )
+        labels = (
+            hours.month.astype(str)
+            + "/"
+            + hours.day.astype(str)
+            + " "
+            + hours.hour.astype(str)
+            + ":00"
+        )
+        month_starts = np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+        return np.asarray(labels, dtype=object), month_starts
 
     def format_date_hour(self) -> pd.DataFrame:
         """
@@ -36,11 +150,23 @@ class ExcelExporter:
             DataFrame avec les dates formatées
         """
         df = self.data.copy()
-        df["Month/Day Hour:Minute"] = df["Horodate"].apply(
-            lambda x: f"{x.month}/{x.day} {x.hour}:00"
-        )
+        df["Month/Day Hour:Minute"] = self._labels()
         return df
 
+    def _labels(self) -> np.ndarray:
+        """
+        Calcule les libellés "M/D H:00" des horodates sans copier les données
+
+        Returns:
+            Tableau des libellés aligné sur self.data
+        """
+        labels, month_starts = self._label_table()
+        horodates = self.data["Horodate"].dt
+        slots = (
+            month_starts[horodates.month.to_numpy() - 1] + horodates.day.to_numpy() - 1
+        ) * 24 + horodates.hour.to_numpy()
+        return labels[slots]
+
     def prepare_excel_data(self) -> pd.DataFrame:
         """
         Prépare les données pour l'export Excel
@@ -48,78 +174,328 @@ class ExcelExporter:
         Returns:
             DataFrame formaté selon le template
         """
-        # Formate les données
-        formatted_df = self.format_date_hour()
+        # Formate les libellés (sans copie des données)
+        labels = self._labels()
+        values = self.data["Valeur"].to_numpy()
+        if values.dtype == np.float32:
+            # Mode basse mémoire : arrondi du float32 élargi au nombre de
+            # décimales du template (0.6f devient 0.6 et non 0.6000000238)
+            values = np.round(values.astype(np.float64), self.UNIT_DECIMALS["kW"])
+        values = pd.Series(values, index=labels)
 
-        # Crée le DataFrame pour Excel
-        excel_data = pd.DataFrame(columns=["Value"])
+        # Un libellé répété garde sa première position et sa dernière valeur
+        first_labels = pd.unique(labels)
+        last_values = values[~values.index.duplicated(keep="last")].reindex(
+            first_labels
+        )
 
-        # Ajoute l'en-tête
-        excel_data.loc["Note", "Value"] = self.EXCEL_TEMPLATE
-        excel_data.loc["Time Interval", "Value"] = "60"
-        excel_data.loc["Unit", "Value"] = "kW"
-        excel_data.loc["Month/Day Hour:Minute", "Value"] = "Load Power"
+        # Crée le DataFrame pour Excel : en-tête puis données
+        header = pd.DataFrame(
+            {"Value": [value for _, value in self.HEADER_ROWS]},
+            index=[label for label, _ in self.HEADER_ROWS],
+            dtype=object,
+        )
+        body = pd.DataFrame(
+            {"Value": last_values.to_numpy(dtype=object)}, index=first_labels
+        )
+        return pd.concat([header, body])
 
-        # Ajoute les données
-        for _, row in formatted_df.iterrows():
-            excel_data.loc[row["Month/Day Hour:Minute"], "Value"] = row["Valeur"]
+    def export_to_excel(self, output_file: str, engine: str = None):
+        """
+        Exporte les données vers un fichier Excel
 
-        return excel_data
+        Args:
+            output_file: Chemin du fichier de sortie
+            engine: Moteur d'export pour cet appel (par défaut celui de l'instance)
+        """
+        self.write_excel(self.prepare_excel_data(), output_file, engine)
 
-    def export_to_excel(self, output_file: str):
+    def write_excel(
+        self, excel_data: pd.DataFrame, output_file: str, engine: str = None
+    ):
         """
-        Exporte les données vers un fichier Excel
+        Écrit des données déjà préparées selon le template
+
+        Le classeur est écrit dans un fichier temporaire du même répertoire
+        puis renommé : un traitement interrompu ne laisse jamais de fichier
+        de sortie à moitié écrit.
 
         Args:
+            excel_data: Données renvoyées par prepare_excel_data
             output_file: Chemin du fichier de sortie
+            engine: Moteur d'export pour cet appel (par défaut celui de l'instance)
         """
-        excel_data = self.prepare_excel_data()
+        engine = self._check_engine(engine or self.engine)
+        output_file = Path(output_file)
+        # Extension conservée : le moteur pandas choisit le format d'après elle
+        tmp_file = output_file.with_name(
+            f".{output_file.stem}.{os.getpid()}.tmp{output_file.suffix}"
+        )
+        try:
+            if engine == "template":
+                self._write_template(excel_data, str(tmp_file))
+            elif engine == "streaming":
+                self._write_streaming(excel_data, str(tmp_file))
+            else:
+                self._write_pandas(excel_data, str(tmp_file))
+            os.replace(tmp_file, output_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
 
+    def _write_pandas(self, excel_data: pd.DataFrame, output_file: str):
+        """
+        Écrit le classeur via pandas (modèle de cellules complet en mémoire)
+
+        Args:
+            excel_data: Données préparées selon le template
+            output_file: Chemin du fichier de sortie
+        """
         # Configure le writer Excel
         writer = pd.ExcelWriter(output_file, engine="openpyxl")
 
         # Écrit les données
-        excel_data.to_excel(writer, sheet_name="Sheet1", header=False)
+        excel_data.to_excel(writer, sheet_name=self.SHEET_NAME, header=False)
 
         # Ajuste la largeur des colonnes
-        worksheet = writer.sheets["Sheet1"]
-        worksheet.column_dimensions["A"].width = 25
-        worksheet.column_dimensions["B"].width = 15
+        worksheet = writer.sheets[self.SHEET_NAME]
+        for column, width in self.COLUMN_WIDTHS.items():
+            worksheet.column_dimensions[column].width = width
 
         # Sauvegarde le fichier
         writer.close()
 
-    def validate_export_format(self, excel_file: str) -> list:
+    def _write_template(self, excel_data: pd.DataFrame, output_file: str):
+        """
+        Injecte les données dans la feuille du classeur modèle (les autres
+        parties du modèle sont recopiées à l'identique)
+
+        Args:
+            excel_data: Données préparées selon le template
+            output_file: Chemin du fichier de sortie
+        """
+        if self.template_file is None:
+            raise ValueError("Le moteur template nécessite un classeur modèle")
+        TemplateWriter.load(str(self.template_file)).write(excel_data, output_file)
+
+    def _write_streaming(self, excel_data: pd.DataFrame, output_file: str):
+        """
+        Écrit le classeur ligne par ligne en mode write-only d'openpyxl
+        (mémoire constante, même mise en page que le moteur pandas)
+
+        Args:
+            excel_data: Données préparées selon le template
+            output_file: Chemin du fichier de sortie
+        """
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(self.SHEET_NAME)
+
+        # Les largeurs doivent être définies avant la première ligne
+        for column, width in self.COLUMN_WIDTHS.items():
+            worksheet.column_dimensions[column].width = width
+
+        # Une seule cellule stylée réutilisée : chaque ligne est sérialisée dès l'ajout
+        label_cell = WriteOnlyCell(worksheet)
+        label_cell.font = self.LABEL_FONT
+        label_cell.border = self.LABEL_BORDER
+        label_cell.alignment = self.LABEL_ALIGNMENT
+
+        values = excel_data["Value"]
+        for label, value in zip(excel_data.index, values.where(values.notna(), None)):
+            label_cell.value = label
+            worksheet.append([label_cell, value])
+
+        workbook.save(output_file)
+
+    @classmethod
+    def validate_export_format(
+        cls, excel_file: str, full_year: bool = False, leap_year: bool = None
+    ) -> list:
         """
-        Valide le format du fichier exporté
+        Valide le fichier exporté en une seule lecture en continu (mode
+        read-only d'openpyxl, sans charger le classeur en mémoire)
 
         Args:
             excel_file: Chemin du fichier à valider
+            full_year: Exige une année civile complète (voir check_template_rows)
+            leap_year: Année exportée bissextile (déduite des libellés si None)
 
         Returns:
             Liste des erreurs de validation
         """
-        errors = []
         try:
-            df = pd.read_excel(excel_file, engine="openpyxl")
+            workbook = load_workbook(excel_file, read_only=True, data_only=True)
+        except (OSError, KeyError, BadZipFile, InvalidFileException) as e:
+            return [f"Error reading Excel file: {str(e)}"]
+        try:
+            worksheet = workbook.worksheets[0]
+            return cls.check_template_rows(
+                worksheet.iter_rows(max_col=2, values_only=True), full_year, leap_year
+            )
+        finally:
+            workbook.close()
 
-            # Vérifie les éléments requis
-            required_elements = ["Time Interval", "Unit", "Month/Day Hour:Minute"]
-            for element in required_elements:
-                if not any(df.iloc[:, 0].astype(str).str.contains(element)):
-                    errors.append(f"Missing required element: {element}")
+    def validate_excel_data(
+        self, excel_data: pd.DataFrame = None, full_year: bool = False
+    ) -> list:
+        """
+        Valide les données préparées avant écriture (aucune relecture du fichier)
 
-            # Vérifie l'intervalle de temps
-            if "60" not in df.iloc[:, 1].astype(str).values:
-                errors.append("Time Interval should be 60")
+        Args:
+            excel_data: Données renvoyées par prepare_excel_data (préparées
+                si None)
+            full_year: Exige une année civile complète (voir check_template_rows),
+                de 8784 lignes si l'année des données est bissextile
 
-            # Vérifie l'unité
-            if "kW" not in df.iloc[:, 1].astype(str).values:
-                errors.append("Unit should be kW")
+        Returns:
+            Liste des erreurs de validation
+        """
+        if excel_data is None:
+            excel_data = self.prepare_excel_data()
+        leap_year = None
+        if not self.data.empty:
+            leap_year = calendar.isleap(self.data["Horodate"].iloc[0].year)
+        values = excel_data["Value"]
+        return self.check_template_rows(
+            zip(excel_data.index, values.where(values.notna(), None)),
+            full_year,
+            leap_year,
+        )
+
+    @classmethod
+    def check_template_rows(
+        cls, rows, full_year: bool = False, leap_year: bool = None
+    ) -> list:
+        """
+        Vérifie les règles de EXCEL_TEMPLATE sur les lignes (colonnes A et B)
+        d'une feuille, en un seul passage :
+
+        - cellules d'en-tête (note en A1, titres des lignes 2 à 4),
+          intervalle 60, unité kW ou W en B3
+        - libellés "M/D H:00" valides, croissants, sans doublon
+        - aucune cellule vide, valeurs numériques >= 0 avec au plus 6
+          décimales en kW (2 en W)
+        - si full_year : libellés contigus à partir du 1er janvier 0:00 en
+          B5, et exactement 8760 lignes de données (8784, 29 février compris,
+          pour une année bissextile)
+        - pas de 29 février dans une année non bissextile
+
+        Args:
+            rows: Itérable de couples (colonne A, colonne B)
+            full_year: Exige une année civile complète
+            leap_year: Année bissextile ; si None, l'année est supposée
+                bissextile dès qu'un libellé du 29 février apparaît
+
+        Returns:
+            Liste des erreurs (une par règle enfreinte, avec la première
+            cellule concernée et le nombre d'occurrences)
+        """
+        violations = {}
+
+        def report(rule: str, message: str):
+            first, count = violations.get(rule, (message, 0))
+            violations[rule] = (first, count + 1)
+
+        rows = iter(rows)
+        unit = None
+        for row_number, (expected_label, expected_value) in enumerate(
+            cls.HEADER_ROWS, start=1
+        ):
+            label, value = (tuple(next(rows, ())) + (None, None))[:2]
+            if expected_label == "Note":
+                # Texte de la note libre : A1 ("Note" ou "Note: ..." dans le
+                # classeur modèle) doit seulement commencer par "Note"
+                if not str(label).startswith(expected_label):
+                    report(
+                        f"header-{row_number}",
+                        f"Missing required element: {expected_label} (A{row_number})",
+                    )
+                continue
+            if label != expected_label:
+                report(
+                    f"header-{row_number}",
+                    f"Missing required element: {expected_label} (A{row_number})",
+                )
+            if expected_label == "Unit":
+                unit = value
+                if value not in cls.UNIT_DECIMALS:
+                    report("unit", f"Unit should be kW or W (B{row_number})")
+            elif expected_label == "Time Interval":
+                if str(value) != expected_value:
+                    report("interval", f"Time Interval should be 60 (B{row_number})")
+            elif value != expected_value:
+                report(
+                    f"header-value-{row_number}",
+                    f"Unexpected header value in B{row_number}",
+                )
+
+        slots = cls._label_slots()
+        decimals = cls.UNIT_DECIMALS.get(unit, cls.UNIT_DECIMALS["kW"])
+        count = 0
+        previous = None
+        leap_day = bool(leap_year)
+        for count, row in enumerate(rows, start=1):
+            label, value = (tuple(row) + (None, None))[:2]
+            cell_row = count + len(cls.HEADER_ROWS)
 
-        except (pd.errors.EmptyDataError, pd.errors.ParserError) as e:
-            errors.append(f"Error reading Excel file: {str(e)}")
-        except (KeyError, IndexError) as e:
-            errors.append(f"Error accessing Excel data: {str(e)}")
+            slot = slots.get(label)
+            if slot is None:
+                report("label", f"Invalid date/hour label in A{cell_row}: {label!r}")
+            else:
+                in_leap_day = cls.LEAP_DAY_SLOTS[0] <= slot < cls.LEAP_DAY_SLOTS[1]
+                if in_leap_day and leap_year is False:
+                    report("leap", f"2/29 label in a non-leap year in A{cell_row}")
+                leap_day = leap_day or in_leap_day
+                if full_year and previous is None and slot != 0:
+                    report("start", f"Data should start at 1/1 0:00 in A{cell_row}")
+                if previous is not None:
+                    if slot <= previous:
+                        report("order", f"Labels out of order in A{cell_row}")
+                    elif full_year and not cls._follows(previous, slot, leap_day):
+                        report("gap", f"Missing hours before A{cell_row}")
+                previous = slot
 
-        return errors
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                report("empty", f"Empty cell B{cell_row}")
+            elif isinstance(value, bool) or not isinstance(value, numbers.Real):
+                report("number", f"Non-numeric value in B{cell_row}")
+            elif value < 0:
+                report("negative", f"Negative value in B{cell_row}")
+            elif not math.isclose(
+                value, round(value, decimals), rel_tol=0, abs_tol=1e-9
+            ):
+                report("decimals", f"More than {decimals} decimals in B{cell_row}")
+
+        if full_year:
+            expected_rows = 8784 if leap_day else 8760
+            if count != expected_rows:
+                report("rows", f"Expected {expected_rows} data rows, found {count}")
+
+        return [
+            message if occurrences == 1 else f"{message} ({occurrences} occurrences)"
+            for message, occurrences in violations.values()
+        ]
+
+    @classmethod
+    def _follows(cls, previous: int, slot: int, leap_day: bool) -> bool:
+        """
+        Vérifie que deux libellés se suivent à une heure d'écart (le 28
+        février 23:00 est suivi du 1er mars 0:00 les années non bissextiles)
+        """
+        if slot == previous + 1:
+            return True
+        return not leap_day and (previous, slot) == (
+            cls.LEAP_DAY_SLOTS[0] - 1,
+            cls.LEAP_DAY_SLOTS[1],
+        )
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _label_slots(cls) -> dict:
+        """
+        Associe chaque libellé "M/D H:00" à son rang dans une année bissextile
+
+        Returns:
+            Dictionnaire {libellé: rang horaire}
+        """
+        labels, _ = cls._label_table()
+        return {label: slot for slot, label in enumerate(labels)}
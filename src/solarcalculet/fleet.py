@@ -0,0 +1,257 @@
+"""
+Module de traitement en parallèle d'un parc de compteurs (PRM)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import pandas as pd
+from solarcalculet.data_cleaner import DataCleaner
+from solarcalculet.data_reader import DataReader
+from solarcalculet.http_fetcher import fetch_csvs, is_url
+from solarcalculet.pipeline import (
+    DEFAULT_OPTIONS,
+    DEFAULT_PRM,
+    PRM_COLUMN,
+    ProcessingOptions,
+    neighbour_data,
+    process_year,
+    store_reference,
+)
+from solarcalculet.parse_cache import ParseCache
+
+
+def split_by_prm(df: pd.DataFrame) -> dict:
+    """
+    Sépare les données par compteur
+
+    Args:
+        df: DataFrame contenant éventuellement la colonne Identifiant PRM
+
+    Returns:
+        Dictionnaire {PRM: DataFrame du compteur}
+    """
+    if PRM_COLUMN not in df.columns:
+        return {DEFAULT_PRM: df}
+    return {
+        str(prm): meter_df.drop(columns=[PRM_COLUMN])
+        for prm, meter_df in df.groupby(PRM_COLUMN, sort=True, observed=True)
+    }
+
+
+def load_sources(sources, cache: ParseCache = None, low_memory: bool = False) -> tuple:
+    """
+    Charge un ou plusieurs extraits ENEDIS, les URLs étant téléchargées en
+    parallèle (au plus max_connections à la fois) ; un extrait illisible
+    n'empêche pas le chargement des autres
+
+    Args:
+        sources: Chemin ou URL, ou liste de chemins et d'URLs
+        cache: Cache des données lues et converties (fichiers locaux)
+        low_memory: Mode basse mémoire (voir ProcessingOptions)
+
+    Returns:
+        Tuple (DataFrame des extraits réunis, colonnes utiles et valeurs en
+        kW, ou None si aucun n'a pu être chargé ; {source: message
+        d'erreur} des extraits en échec)
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    urls = [source for source in sources if is_url(source)]
+    downloaded, failures = fetch_csvs(urls, low_memory=low_memory) if urls else ({}, {})
+    errors = {url: f"{type(e).__name__}: {e}" for url, e in failures.items()}
+    frames = []
+    for source in sources:
+        if is_url(source):
+            if source in downloaded:
+                frames.append(downloaded[source])
+            continue
+        try:
+            frames.append(
+                DataReader(
+                    source, mode="fast", cache=cache, low_memory=low_memory
+                ).load()
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            errors[str(source)] = f"{type(e).__name__}: {e}"
+    if not frames:
+        return None, errors
+    if len(frames) == 1:
+        return frames[0], errors
+    return pd.concat(frames, ignore_index=True), errors
+
+
+def process_meter(
+    prm: str,
+    df: pd.DataFrame,
+    output_dir: str,
+    options: ProcessingOptions = DEFAULT_OPTIONS,
+    store=None,
+) -> dict:
+    """
+    Nettoie et exporte les données d'un compteur, sans lever d'exception
+
+    Args:
+        prm: Identifiant du compteur
+        df: Données du compteur (valeurs en kW)
+        output_dir: Répertoire de sortie du parc (un sous-dossier par PRM)
+        options: Options de traitement des années
+        store: Stockage des séries complétées (désactivé si None)
+
+    Returns:
+        Résumé du traitement du compteur
+    """
+    start = time.perf_counter()
+    result = {"prm": prm, "rows": len(df), "status": "ok", "missing": {}, "error": None}
+    try:
+        cleaner = DataCleaner(
+            options.resampler().to_hourly(df), low_memory=options.low_memory
+        )
+        reference = store_reference(store, cleaner, prm)
+        meter_path = Path(output_dir) / prm
+        meter_path.mkdir(parents=True, exist_ok=True)
+        for year in options.years(cleaner.years()):
+            summary = process_year(
+                DataCleaner(
+                    neighbour_data(cleaner, year),
+                    profile=cleaner.profile(),
+                    low_memory=options.low_memory,
+                    reference=reference,
+                ),
+                year,
+                meter_path,
+                options.engine,
+                verbose=False,
+                partial_years=options.partial_years,
+                template_file=options.template_file,
+                store=store,
+                prm=prm,
+                max_interpolation=options.max_interpolation,
+            )
+            result["missing"][year] = summary["missing"]
+            if summary["errors"]:
+                result["status"] = "invalid"
+                result["error"] = f"{year}.xlsx : {'; '.join(summary['errors'])}"
+    except Exception as e:  # pylint: disable=broad-except
+        # Un compteur défaillant ne doit pas interrompre le lot
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["duration"] = time.perf_counter() - start
+    return result
+
+
+def process_fleet(
+    input_file,
+    output_dir: str,
+    workers: int = None,
+    options: ProcessingOptions = DEFAULT_OPTIONS,
+    cache: ParseCache = None,
+    store=None,
+) -> dict:
+    """
+    Traite un fichier ENEDIS multi-compteurs, un compteur par processus
+
+    Args:
+        input_file: Chemin ou URL du fichier CSV d'entrée, ou liste de
+            chemins et d'URLs (extraits réunis avant séparation par PRM)
+        output_dir: Répertoire de sortie (fichiers <PRM>/<année>.xlsx)
+        workers: Nombre de processus (nombre de cœurs par défaut, 1 pour un
+            traitement séquentiel dans le processus courant)
+        options: Options de traitement des années
+        cache: Cache des données lues et converties (désactivé si None)
+        store: Stockage des séries complétées (transmis sans son client aux
+            processus de travail, désactivé si None)
+
+    Returns:
+        Synthèse du lot (débit, échecs, résultats par compteur, ou par
+        source pour un extrait qui n'a pas pu être chargé)
+    """
+    start = time.perf_counter()
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    df, errors = load_sources(input_file, cache, options.low_memory)
+    meters = {} if df is None else split_by_prm(df)
+    del df
+    workers = workers or os.cpu_count() or 1
+    if not meters:
+        workers = 1
+
+    # Extrait en échec : ses compteurs sont inconnus, il est signalé sous
+    # le nom de la source
+    results = [
+        {
+            "prm": source,
+            "rows": 0,
+            "status": "failed",
+            "missing": {},
+            "error": error,
+            "duration": 0.0,
+        }
+        for source, error in errors.items()
+    ]
+    if workers == 1:
+        for prm, meter_df in meters.items():
+            results.append(process_meter(prm, meter_df, output_dir, options, store))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(meters))) as executor:
+            futures = {
+                executor.submit(
+                    process_meter,
+                    prm,
+                    meter_df,
+                    output_dir,
+                    options,
+                    store,
+                ): prm
+                for prm, meter_df in meters.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:  # pylint: disable=broad-except
+                    # Processus interrompu (mémoire, signal...) : le compteur est marqué en échec
+                    prm = futures[future]
+                    results.append(
+                        {
+                            "prm": prm,
+                            "rows": len(meters[prm]),
+                            "status": "failed",
+                            "missing": {},
+                            "error": f"{type(e).__name__}: {e}",
+                            "duration": 0.0,
+                        }
+                    )
+
+    duration = time.perf_counter() - start
+    rows = sum(result["rows"] for result in results)
+    return {
+        "meters": len(results),
+        "failed": sum(result["status"] != "ok" for result in results),
+        "rows": rows,
+        "duration": duration,
+        "rows_per_second": rows / duration if duration > 0 else 0.0,
+        "results": sorted(results, key=lambda result: result["prm"]),
+    }
+
+
+def print_fleet_summary(summary: dict):
+    """
+    Affiche la synthèse d'un traitement de parc
+
+    Args:
+        summary: Synthèse renvoyée par process_fleet
+    """
+    print(f"\nCompteurs traités : {summary['meters']} ({summary['failed']} en échec)")
+    print(
+        f"Lignes : {summary['rows']} en {summary['duration']:.1f} s "
+        f"({summary['rows_per_second']:.0f} lignes/s)"
+    )
+    for result in summary["results"]:
+        missing = ", ".join(
+            f"{year}: {count}" for year, count in result["missing"].items()
+        )
+        status = "✅" if result["status"] == "ok" else "❌"
+        line = f"{status} {result['prm']} - heures manquantes [{missing}] - {result['duration']:.1f} s"
+        if result["error"]:
+            line += f" - {result['error']}"
+        print(line)
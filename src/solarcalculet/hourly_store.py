@@ -0,0 +1,416 @@
+"""
+Module de stockage binaire à emplacements fixes des séries horaires
+
+Chaque (compteur, année) occupe un fichier de taille fixe : 8760 ou 8784
+valeurs float64 (une par heure de l'année), le code de source de chaque heure
+et un bitmap de validité. Les fichiers sont ouverts par np.memmap : la valeur
+de l'heure h de l'année y est un simple accès indexé.
+"""
+
+import json
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - module indisponible sous Windows
+    fcntl = None
+
+
+class HourlyStore:
+    """Classe pour enregistrer et relire des séries horaires dans des fichiers à emplacements fixes"""
+
+    SUFFIX = ".hourly"
+    SOURCES_FILE = "sources.json"
+    LOCK_FILE = "sources.lock"
+    ORIGINAL_SOURCE = "original"
+    # Codes de source sur un octet (0 = "original")
+    MAX_SOURCES = 256
+    HOUR = pd.Timedelta(hours=1)
+    # Valeurs en float64 : l'aller-retour par le stockage est exact
+    VALUE_DTYPE = np.dtype(np.float64)
+
+    def __init__(self, directory: str):
+        """
+        Initialise le stockage
+
+        Args:
+            directory: Répertoire du stockage (un sous-dossier par compteur)
+        """
+        self.directory = Path(directory)
+        self._maps = {}
+
+    def __getstate__(self) -> dict:
+        """Les projections mémoire ne sont pas transmises aux processus de travail"""
+        state = self.__dict__.copy()
+        state["_maps"] = {}
+        return state
+
+    @staticmethod
+    def slots(year) -> int:
+        """
+        Donne le nombre d'heures d'une année civile
+
+        Args:
+            year: Année
+
+        Returns:
+            8784 pour une année bissextile, 8760 sinon
+        """
+        return 8784 if pd.Timestamp(int(year), 1, 1).is_leap_year else 8760
+
+    @classmethod
+    def layout(cls, year) -> tuple:
+        """
+        Donne la disposition du fichier d'une année : valeurs float64, codes
+        de source uint8 puis bitmap de validité (un bit par heure)
+
+        Args:
+            year: Année
+
+        Returns:
+            Tuple (nombre d'heures, position des codes, position du bitmap,
+            taille du fichier) en octets
+        """
+        slots = cls.slots(year)
+        sources_offset = slots * cls.VALUE_DTYPE.itemsize
+        bitmap_offset = sources_offset + slots
+        return slots, sources_offset, bitmap_offset, bitmap_offset + (slots + 7) // 8
+
+    @classmethod
+    def hour_of_year(cls, timestamps, year) -> np.ndarray:
+        """
+        Calcule le rang horaire de dates dans leur année (0 = 1er janvier 0:00)
+
+        Args:
+            timestamps: Dates de l'année
+            year: Année
+
+        Returns:
+            Rangs horaires (int64)
+        """
+        offsets = pd.DatetimeIndex(timestamps) - pd.Timestamp(int(year), 1, 1)
+        return np.asarray(offsets // cls.HOUR, dtype=np.int64)
+
+    def path(self, prm: str, year) -> Path:
+        """
+        Donne le fichier d'une année d'un compteur
+
+        Args:
+            prm: Identifiant du compteur
+            year: Année
+
+        Returns:
+            Chemin du fichier
+        """
+        return self.directory / str(prm) / f"{int(year)}{self.SUFFIX}"
+
+    def write_series(self, df: pd.DataFrame, prm: str) -> dict:
+        """
+        Enregistre une série horaire : les heures présentes remplacent celles
+        déjà stockées, les autres sont conservées
+
+        Args:
+            df: Série avec les colonnes Horodate, Valeur et éventuellement Source
+            prm: Identifiant du compteur
+
+        Returns:
+            Nombre d'heures écrites par année {année: heures}
+        """
+        horodates = pd.DatetimeIndex(df["Horodate"])
+        if horodates.isna().any():
+            raise ValueError("Horodates manquantes : la série n'est pas stockable")
+        if (horodates != horodates.floor(self.HOUR)).any():
+            raise ValueError("Horodates hors de l'heure pleine : série non horaire")
+        values = df["Valeur"].to_numpy(dtype=self.VALUE_DTYPE)
+        if "Source" in df.columns:
+            sources = df["Source"].astype(str).to_numpy()
+        else:
+            sources = np.full(len(df), self.ORIGINAL_SOURCE, dtype=object)
+        codes = self._source_codes(prm, sources)
+
+        written = {}
+        years = horodates.year.to_numpy()
+        for year in np.unique(years):
+            rows = np.flatnonzero(years == year)
+            slots = self.hour_of_year(horodates[rows], year)
+            year_values, year_codes, bitmap = self._open(prm, year, create=True)
+            year_values[slots] = values[rows]
+            year_codes[slots] = codes[rows]
+            valid = np.unpackbits(bitmap, count=len(year_values), bitorder="little")
+            valid[slots] = 1
+            bitmap[:] = np.packbits(valid, bitorder="little")
+            year_values.flush()
+            written[str(year)] = len(rows)
+        return written
+
+    def values(self, prm: str, year) -> np.ndarray:
+        """
+        Donne les valeurs d'une année sans copie (NaN aux heures absentes)
+
+        Args:
+            prm: Identifiant du compteur
+            year: Année
+
+        Returns:
+            Vue float64 en lecture seule sur le fichier, indexée par rang horaire
+        """
+        year_values, _, _ = self._open(prm, year)
+        view = year_values.view()
+        view.flags.writeable = False
+        return view
+
+    def valid(self, prm: str, year) -> np.ndarray:
+        """
+        Donne le bitmap de validité d'une année sous forme de booléens
+
+        Args:
+            prm: Identifiant du compteur
+            year: Année
+
+        Returns:
+            Tableau booléen indexé par rang horaire
+        """
+        year_values, _, bitmap = self._open(prm, year)
+        return np.unpackbits(bitmap, count=len(year_values), bitorder="little").astype(
+            bool
+        )
+
+    def lookup(self, prm: str, timestamps, original_only: bool = False) -> tuple:
+        """
+        Lit les valeurs de dates quelconques par accès indexé, année par année
+
+        Args:
+            prm: Identifiant du compteur
+            timestamps: Dates recherchées (NaT admis)
+            original_only: Ne trouve que les heures de source "original"
+                (mesures, à l'exclusion des heures complétées)
+
+        Returns:
+            Tuple (valeurs float64, booléens « trouvée »)
+        """
+        timestamps = pd.DatetimeIndex(timestamps)
+        values = np.full(len(timestamps), np.nan)
+        found = np.zeros(len(timestamps), dtype=bool)
+        on_hour = ~timestamps.isna() & (timestamps == timestamps.floor(self.HOUR))
+        years = timestamps.year.to_numpy()
+        stored = set(self.years(prm))
+        for year in np.unique(years[on_hour]):
+            if str(int(year)) not in stored:
+                continue
+            rows = np.flatnonzero(on_hour & (years == year))
+            slots = self.hour_of_year(timestamps[rows], year)
+            take = self.valid(prm, year)[slots]
+            if original_only:
+                _, year_codes, _ = self._open(prm, year)
+                take &= year_codes[slots] == 0
+            values[rows[take]] = self.values(prm, year)[slots[take]]
+            found[rows[take]] = True
+        return values, found
+
+    def read_year(self, prm: str, year, low_memory: bool = False) -> pd.DataFrame:
+        """
+        Relit une année d'un compteur au format des données du pipeline
+
+        Args:
+            prm: Identifiant du compteur
+            year: Année
+            low_memory: Source catégorielle, comme DataCleaner en basse
+                mémoire (Valeur est lue sans copie si l'année est complète)
+
+        Returns:
+            DataFrame trié Horodate, Valeur, Source des heures valides
+        """
+        if str(int(year)) not in self.years(prm):
+            return self._empty_frame(low_memory)
+        year_values, year_codes, _ = self._open(prm, year)
+        valid = self.valid(prm, year)
+        slots = np.flatnonzero(valid)
+        if valid.all():
+            # Année complète : tranche contiguë du fichier, sans copie
+            values, codes = self.values(prm, year), year_codes
+        else:
+            values, codes = year_values[slots], year_codes[slots]
+        source = pd.Categorical.from_codes(
+            np.asarray(codes, dtype=np.int16), categories=self._sources(prm)
+        )
+        return pd.DataFrame(
+            {
+                "Horodate": pd.Timestamp(int(year), 1, 1)
+                + pd.to_timedelta(slots, unit="h"),
+                "Valeur": values,
+                "Source": source if low_memory else np.asarray(source, dtype=object),
+            },
+            copy=False,
+        )
+
+    def read_range(self, prm: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Relit la série d'un compteur sur une plage [start, end)
+
+        Args:
+            prm: Identifiant du compteur
+            start: Date de début incluse (sans limite si None)
+            end: Date de fin exclue (sans limite si None)
+
+        Returns:
+            DataFrame trié Horodate, Valeur, Source
+        """
+        years = [
+            year
+            for year in self.years(prm)
+            if (start is None or int(year) >= pd.Timestamp(start).year)
+            and (end is None or int(year) <= pd.Timestamp(end).year)
+        ]
+        if not years:
+            return self._empty_frame()
+        df = pd.concat([self.read_year(prm, year) for year in years], ignore_index=True)
+        if start is not None:
+            df = df[df["Horodate"] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df["Horodate"] < pd.Timestamp(end)]
+        return df.reset_index(drop=True)
+
+    def years(self, prm: str) -> list:
+        """
+        Liste les années stockées d'un compteur
+
+        Args:
+            prm: Identifiant du compteur
+
+        Returns:
+            Liste triée des années (str)
+        """
+        return sorted(
+            path.stem
+            for path in (self.directory / str(prm)).glob(f"*{self.SUFFIX}")
+            if re.fullmatch(r"\d{4}", path.stem)
+        )
+
+    def prms(self) -> list:
+        """
+        Liste les compteurs stockés
+
+        Returns:
+            Liste triée des identifiants PRM
+        """
+        if not self.directory.is_dir():
+            return []
+        return sorted(path.name for path in self.directory.iterdir() if path.is_dir())
+
+    @staticmethod
+    def _empty_frame(low_memory: bool = False) -> pd.DataFrame:
+        """Série vide aux types de read_year"""
+        return pd.DataFrame(
+            {
+                "Horodate": pd.Series(dtype="datetime64[ns]"),
+                "Valeur": pd.Series(dtype="float64"),
+                "Source": pd.Series(dtype="category" if low_memory else object),
+            }
+        )
+
+    def _open(self, prm: str, year, create: bool = False) -> tuple:
+        """
+        Ouvre (une seule fois) le fichier d'une année par np.memmap
+
+        Args:
+            prm: Identifiant du compteur
+            year: Année
+            create: Crée un fichier vide (aucune heure valide) s'il n'existe pas
+
+        Returns:
+            Tuple (valeurs float64, codes de source uint8, bitmap uint8), vues
+            sur le même fichier
+        """
+        key = (str(prm), int(year))
+        if key not in self._maps:
+            path = self.path(prm, year)
+            _, sources_offset, bitmap_offset, size = self.layout(year)
+            if not path.exists():
+                if not create:
+                    raise FileNotFoundError(f"Année {year} absente pour {prm}")
+                path.parent.mkdir(parents=True, exist_ok=True)
+                empty = np.zeros(size, dtype=np.uint8)
+                empty[:sources_offset].view(self.VALUE_DTYPE)[:] = np.nan
+                empty.tofile(path)
+            raw = np.memmap(path, dtype=np.uint8, mode="r+", shape=(size,))
+            self._maps[key] = (
+                raw[:sources_offset].view(self.VALUE_DTYPE),
+                raw[sources_offset:bitmap_offset],
+                raw[bitmap_offset:],
+            )
+        return self._maps[key]
+
+    def _sources(self, prm: str) -> list:
+        """
+        Lit la table des sources d'un compteur (le code d'une source est son rang)
+
+        Args:
+            prm: Identifiant du compteur
+
+        Returns:
+            Liste des sources, "original" en premier
+        """
+        path = self.directory / str(prm) / self.SOURCES_FILE
+        if not path.exists():
+            return [self.ORIGINAL_SOURCE]
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _source_codes(self, prm: str, sources: np.ndarray) -> np.ndarray:
+        """
+        Code les sources sur un octet, en complétant la table du compteur
+
+        La table est relue et réécrite sous verrou exclusif, puis remplacée
+        atomiquement : des processus écrivant le même compteur s'accordent
+        sur les codes.
+
+        Args:
+            prm: Identifiant du compteur
+            sources: Sources des lignes
+
+        Returns:
+            Codes uint8 des lignes
+        """
+        labels, inverse = np.unique(sources.astype(str), return_inverse=True)
+        table = self._sources(prm)
+        if any(label not in table for label in labels):
+            with self._locked(prm):
+                table = self._sources(prm)
+                added = [label for label in labels if label not in table]
+                table = table + added
+                if len(table) > self.MAX_SOURCES:
+                    raise ValueError(
+                        f"Trop de sources distinctes pour {prm} ({len(table)})"
+                    )
+                # Écriture atomique : fichier temporaire puis renommage
+                path = self.directory / str(prm) / self.SOURCES_FILE
+                tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+                tmp_path.write_text(
+                    json.dumps(table, ensure_ascii=False), encoding="utf-8"
+                )
+                os.replace(tmp_path, path)
+        positions = {label: code for code, label in enumerate(table)}
+        return np.array([positions[label] for label in labels], dtype=np.uint8)[inverse]
+
+    @contextmanager
+    def _locked(self, prm: str):
+        """
+        Verrou exclusif inter-processus sur la table des sources d'un compteur
+
+        Args:
+            prm: Identifiant du compteur
+        """
+        path = self.directory / str(prm) / self.LOCK_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
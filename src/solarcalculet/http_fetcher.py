@@ -0,0 +1,340 @@
+"""
+Module de téléchargement concurrent des fichiers CSV ENEDIS
+
+Les téléchargements passent par http.client sur un pool de threads borné :
+chaque thread garde une connexion persistante (keep-alive) par hôte, réutilisée
+d'un fichier à l'autre. Les redirections, les proxys de l'environnement et
+HTTPS sont pris en charge. Les corps de réponse sont analysés au fil de la
+réception par blocs de lignes (DataReader.parse_lines), sans fichier temporaire.
+"""
+
+import gzip
+import http.client
+import io
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+import pandas as pd
+from solarcalculet.data_reader import DataReader
+
+
+class HttpError(Exception):
+    """Réponse HTTP en erreur (statut non réessayé ou tentatives épuisées)"""
+
+    def __init__(self, url: str, status: int, reason: str = ""):
+        super().__init__(f"HTTP {status} {reason}".rstrip() + f" : {url}")
+        self.url = url
+        self.status = status
+
+
+def is_url(source) -> bool:
+    """
+    Indique si une source est une URL HTTP(S)
+
+    Args:
+        source: Chemin ou URL
+
+    Returns:
+        True pour une URL http:// ou https://
+    """
+    return isinstance(source, str) and source.startswith(("http://", "https://"))
+
+
+class HttpFetcher:  # pylint: disable=too-many-instance-attributes
+    """
+    Classe pour télécharger en parallèle des fichiers CSV ENEDIS et les
+    convertir au fil de l'eau en DataFrame prêts pour le nettoyage
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+    MAX_REDIRECTS = 5
+    HEADERS = {"Accept": "text/csv, */*", "Accept-Encoding": "gzip"}
+
+    def __init__(
+        self,
+        max_connections: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+        chunksize: int = DataReader.DEFAULT_CHUNKSIZE,
+        low_memory: bool = False,
+    ):
+        """
+        Initialise le téléchargeur
+
+        Args:
+            max_connections: Nombre maximal de téléchargements simultanés
+            retries: Nombre de nouvelles tentatives après une erreur réseau ou
+                un statut 429/5xx
+            backoff: Délai initial entre deux tentatives (doublé à chaque fois)
+            timeout: Délai maximal sans réception de données (secondes)
+            chunksize: Nombre de lignes analysées par bloc
+            low_memory: Valeurs en float32 (voir DataReader)
+        """
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.chunksize = chunksize
+        self.low_memory = low_memory
+        # Connexions persistantes de chaque thread, par (schéma, hôte, port)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info):
+        self.close()
+
+    def close(self):
+        """Ferme les connexions persistantes de tous les threads"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+    def fetch_all(self, urls: list) -> tuple:
+        """
+        Télécharge et analyse plusieurs fichiers, au plus max_connections à la
+        fois ; l'échec d'un fichier n'interrompt pas les autres
+
+        Args:
+            urls: URLs des fichiers CSV
+
+        Returns:
+            Tuple ({URL: DataFrame des colonnes utiles, valeurs en kW},
+            {URL: exception des fichiers en échec})
+        """
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            futures = [executor.submit(self.fetch, url) for url in urls]
+            wait(futures)
+        frames, errors = {}, {}
+        for url, future in zip(urls, futures):
+            if future.exception() is not None:
+                errors[url] = future.exception()
+            else:
+                frames[url] = future.result()
+        return frames, errors
+
+    def fetch(self, url: str) -> pd.DataFrame:
+        """
+        Télécharge et analyse un fichier, avec nouvelles tentatives espacées
+
+        Args:
+            url: URL du fichier CSV
+
+        Returns:
+            DataFrame des colonnes utiles, valeurs en kW
+        """
+        reader = DataReader(url, mode="fast", low_memory=self.low_memory)
+        chunks = []
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                chunks = self._download(url, reader)
+                break
+            except HttpError as e:
+                if e.status not in self.RETRY_STATUSES or attempt == self.retries:
+                    raise
+            except OSError:
+                if attempt == self.retries:
+                    raise
+
+        if not chunks:
+            raise ValueError(f"Fichier vide : {url}")
+        df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+        return reader.prepare(df)
+
+    def _download(self, url: str, reader: DataReader) -> list:
+        """
+        Effectue une tentative de téléchargement (redirections suivies)
+
+        Args:
+            url: URL du fichier
+            reader: Lecteur utilisé pour analyser les blocs de lignes
+
+        Returns:
+            Liste des DataFrame des blocs analysés
+        """
+        target = url
+        for _ in range(self.MAX_REDIRECTS + 1):
+            response = self._request(target)
+            if response.status in self.REDIRECT_STATUSES:
+                # Corps lu en entier : la connexion reste réutilisable
+                response.read()
+                target = urllib.parse.urljoin(target, response.headers["Location"])
+                continue
+            if response.status >= 400:
+                response.read()
+                raise HttpError(url, response.status, response.reason)
+            body = response
+            if response.headers.get("Content-Encoding", "").lower() == "gzip":
+                body = gzip.GzipFile(fileobj=response)
+            try:
+                return self._parse_body(body, reader)
+            except Exception:
+                # Corps lu en partie : la connexion n'est plus réutilisable
+                self._drop(urllib.parse.urlsplit(target))
+                raise
+        raise HttpError(url, response.status, "trop de redirections")
+
+    def _request(self, url: str) -> http.client.HTTPResponse:
+        """
+        Envoie la requête GET sur la connexion persistante du thread courant
+        vers l'hôte de l'URL (renouvelée une fois si le serveur l'a fermée)
+
+        Args:
+            url: URL demandée
+
+        Returns:
+            Réponse dont les en-têtes sont lus
+        """
+        parts = urllib.parse.urlsplit(url)
+        while True:
+            connection, reused, path = self._connection(parts)
+            try:
+                connection.request("GET", path, headers=self.HEADERS)
+                return connection.getresponse()
+            except (http.client.HTTPException, OSError):
+                self._drop(parts)
+                # Connexion persistante fermée par le serveur entre deux
+                # requêtes : renouvelée sans compter de tentative
+                if not reused:
+                    raise
+
+    def _connection(self, parts: urllib.parse.SplitResult) -> tuple:
+        """
+        Donne la connexion du thread courant vers l'hôte, en la créant au
+        besoin (à travers le proxy de l'environnement s'il y en a un)
+
+        Args:
+            parts: URL décomposée
+
+        Returns:
+            Tuple (connexion, réutilisée, cible de la requête)
+        """
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        proxy = urllib.request.getproxies().get(parts.scheme)
+        if proxy and urllib.request.proxy_bypass(parts.hostname):
+            proxy = None
+        if proxy and parts.scheme == "http":
+            # Proxy HTTP : URL complète dans la ligne de requête
+            path = urllib.parse.urlunsplit(parts._replace(fragment=""))
+
+        connection = connections.get(key)
+        if connection is not None:
+            return connection, True, path
+        connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        if proxy:
+            proxy_parts = urllib.parse.urlsplit(proxy)
+            connection = connection_class(
+                proxy_parts.hostname, proxy_parts.port, timeout=self.timeout
+            )
+            if parts.scheme == "https":
+                connection.set_tunnel(parts.hostname, parts.port)
+        else:
+            connection = connection_class(
+                parts.hostname, parts.port, timeout=self.timeout
+            )
+        connections[key] = connection
+        with self._lock:
+            self._connections.append(connection)
+        return connection, False, path
+
+    def _drop(self, parts: urllib.parse.SplitResult):
+        """
+        Ferme et retire la connexion du thread courant vers l'hôte (après
+        une erreur)
+
+        Args:
+            parts: URL décomposée
+        """
+        connection = self._local.connections.pop(
+            (parts.scheme, parts.hostname, parts.port)
+        )
+        connection.close()
+        with self._lock:
+            self._connections.remove(connection)
+
+    def _parse_body(self, body, reader: DataReader) -> list:
+        """
+        Découpe le corps en lignes et analyse chaque bloc de chunksize lignes
+        dès sa réception
+
+        Args:
+            body: Corps de la réponse (flux binaire)
+            reader: Lecteur utilisé pour analyser les blocs
+
+        Returns:
+            Liste des DataFrame des blocs
+        """
+        text = io.TextIOWrapper(body, encoding="utf-8-sig", newline="")
+        header = text.readline()
+        if not header.strip():
+            return []
+        if not header.endswith("\n"):
+            header += "\n"
+        chunks = []
+        lines = []
+        for line in text:
+            if line.strip():
+                lines.append(line if line.endswith("\n") else line + "\n")
+            if len(lines) >= self.chunksize:
+                chunks.append(reader.parse_lines(header, lines))
+                lines = []
+        if lines or not chunks:
+            chunks.append(reader.parse_lines(header, lines))
+        return chunks
+
+
+def fetch_csvs(urls: list, **options) -> tuple:
+    """
+    Télécharge plusieurs fichiers CSV ENEDIS en parallèle
+
+    Args:
+        urls: URLs des fichiers
+        **options: Paramètres de HttpFetcher
+
+    Returns:
+        Tuple ({URL: DataFrame des colonnes utiles, valeurs en kW},
+        {URL: exception des fichiers en échec})
+    """
+    with HttpFetcher(**options) as fetcher:
+        return fetcher.fetch_all(list(urls))
+
+
+def fetch_csv(url: str, **options) -> pd.DataFrame:
+    """
+    Télécharge un fichier CSV ENEDIS
+
+    Args:
+        url: URL du fichier
+        **options: Paramètres de HttpFetcher
+
+    Returns:
+        DataFrame des colonnes utiles, valeurs en kW
+
+    Raises:
+        HttpError, OSError, ValueError: Échec du téléchargement
+    """
+    frames, errors = fetch_csvs([url], **options)
+    if url in errors:
+        raise errors[url]
+    return frames[url]
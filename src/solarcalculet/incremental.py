@@ -0,0 +1,311 @@
+"""
+Module de traitement incrémental des extractions ENEDIS successives
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from solarcalculet.data_cleaner import DataCleaner
+from solarcalculet.data_reader import DataReader
+from solarcalculet.pipeline import (
+    DEFAULT_OPTIONS,
+    ProcessingOptions,
+    meter_id,
+    neighbour_data,
+    process_year,
+    store_reference,
+    write_gap_report,
+)
+from solarcalculet.parse_cache import ParseCache
+
+
+class IncrementalState:
+    """Classe pour conserver l'état des traitements précédents d'un répertoire de sortie"""
+
+    STATE_FILE = "state.json"
+    SERIES_FILE = "series.npz"
+    VERSION = 2
+
+    def __init__(self, state_dir: str):
+        """
+        Initialise l'état, en relisant celui du dernier traitement s'il existe
+
+        Args:
+            state_dir: Répertoire de stockage de l'état
+        """
+        self.state_dir = Path(state_dir)
+        self.last_timestamp = None
+        self.years = {}
+
+        state_file = self.state_dir / self.STATE_FILE
+        if state_file.exists():
+            state = json.loads(state_file.read_text(encoding="utf-8"))
+            if state.get("version") == self.VERSION:
+                self.last_timestamp = state["last_timestamp"]
+                self.years = state["years"]
+
+    def load_series(self) -> pd.DataFrame:
+        """
+        Charge la série horaire fusionnée des extractions déjà traitées
+
+        Returns:
+            DataFrame Horodate/Valeur (vide au premier traitement)
+        """
+        series_file = self.state_dir / self.SERIES_FILE
+        if self.last_timestamp is None or not series_file.exists():
+            return pd.DataFrame(
+                {
+                    "Horodate": pd.Series(dtype="datetime64[ns]"),
+                    "Valeur": pd.Series(dtype="float64"),
+                }
+            )
+        with np.load(series_file, allow_pickle=False) as archive:
+            return pd.DataFrame(
+                {"Horodate": archive["horodate"], "Valeur": archive["valeur"]}
+            )
+
+    def _replace(self, name: str, write):
+        """
+        Écrit un fichier de l'état de façon atomique (fichier temporaire puis
+        renommage)
+
+        Args:
+            name: Nom du fichier dans le répertoire de l'état
+            write: Fonction écrivant le contenu dans le fichier binaire ouvert
+        """
+        target = self.state_dir / name
+        tmp_file = target.with_name(f".{name}.{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as handle:
+            write(handle)
+        os.replace(tmp_file, target)
+
+    def save(self, series: pd.DataFrame):
+        """
+        Enregistre la série fusionnée puis l'état (écritures atomiques)
+
+        Args:
+            series: Série horaire fusionnée
+        """
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self._replace(
+            self.SERIES_FILE,
+            lambda handle: np.savez(
+                handle,
+                horodate=series["Horodate"].to_numpy(dtype="datetime64[ns]"),
+                valeur=series["Valeur"].to_numpy(dtype=np.float64),
+            ),
+        )
+        if not series.empty:
+            self.last_timestamp = str(series["Horodate"].max())
+
+        state = json.dumps(
+            {
+                "version": self.VERSION,
+                "last_timestamp": self.last_timestamp,
+                "years": self.years,
+            },
+            indent=2,
+            sort_keys=True,
+        )
+        self._replace(
+            self.STATE_FILE, lambda handle: handle.write(state.encode("utf-8"))
+        )
+
+
+def merge_new_rows(stored: pd.DataFrame, extract: pd.DataFrame) -> tuple:
+    """
+    Fusionne la nouvelle extraction dans la série stockée
+
+    La nouvelle extraction fait foi : les heures révisées par ENEDIS prennent
+    la valeur de l'extraction, comme les heures absentes de la série stockée.
+
+    Args:
+        stored: Série horaire déjà traitée
+        extract: Série horaire de la nouvelle extraction
+
+    Returns:
+        Tuple (série fusionnée triée, lignes nouvelles ou révisées)
+    """
+    stored = stored.sort_values("Horodate", kind="mergesort").reset_index(drop=True)
+    known = stored["Horodate"].to_numpy(dtype="datetime64[ns]")
+    candidates = extract["Horodate"].to_numpy(dtype="datetime64[ns]")
+    positions = np.searchsorted(known, candidates)
+    is_known = positions < len(known)
+    is_known[is_known] = known[positions[is_known]] == candidates[is_known]
+
+    # Heures connues dont la valeur a changé (deux NaN sont égales)
+    stored_values = stored["Valeur"].to_numpy()[positions[is_known]]
+    values = extract["Valeur"].to_numpy()[is_known]
+    changed = ~is_known
+    changed[is_known] = (stored_values != values) & ~(
+        np.isnan(stored_values) & np.isnan(values)
+    )
+
+    changed_rows = extract.loc[changed, ["Horodate", "Valeur"]]
+    if changed_rows.empty:
+        return stored, changed_rows
+    merged = pd.concat([stored, changed_rows], ignore_index=True).drop_duplicates(
+        "Horodate", keep="last"
+    )
+    return (
+        merged.sort_values("Horodate", kind="mergesort").reset_index(drop=True),
+        changed_rows,
+    )
+
+
+def affected_years(new_rows: pd.DataFrame) -> set:
+    """
+    Détermine les années à recalculer après l'ajout ou la révision de lignes
+
+    Une année est affectée si elle reçoit des lignes ou si l'une de ses
+    voisines (source de remplacement) en reçoit.
+
+    Args:
+        new_rows: Lignes ajoutées ou révisées dans la série
+
+    Returns:
+        Ensemble des années affectées (int)
+    """
+    years = set(new_rows["Horodate"].dt.year.unique().tolist())
+    return {year + offset for year in years for offset in (-1, 0, 1)}
+
+
+def profile_digest(profile: pd.Series) -> str:
+    """
+    Calcule l'empreinte du profil médian de repli du compteur
+
+    Args:
+        profile: Profil médian (voir DataCleaner.profile())
+
+    Returns:
+        Empreinte SHA-256 hexadécimale
+    """
+    hashes = pd.util.hash_pandas_object(profile, index=True)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def uses_profile(cleaner: DataCleaner, year: str, full_year: bool = False) -> bool:
+    """
+    Indique si les données complétées d'une année dépendent du profil médian
+    de repli : heures complétées par le profil, ou heures restées manquantes
+    qu'un profil enrichi pourrait compléter
+
+    Args:
+        cleaner: Nettoyeur après complétion de l'année
+        year: Année complétée
+        full_year: Complétion de toute l'année civile
+
+    Returns:
+        True si l'année est à recalculer lorsque le profil change
+    """
+    sources = cleaner.get_data_by_year(year)["Source"]
+    return bool(
+        (sources == DataCleaner.PROFILE_SOURCE).any()
+        or not cleaner.gap_runs(year, full_year=full_year).empty
+    )
+
+
+def process_incremental(
+    input_file: str,
+    output_dir: str,
+    options: ProcessingOptions = DEFAULT_OPTIONS,
+    cache: ParseCache = None,
+    state_dir: str = None,
+    gap_report: str = None,
+    store=None,
+) -> list:
+    """
+    Intègre une nouvelle extraction ENEDIS en ne recalculant que les années
+    affectées et en n'exportant que les années dont le contenu a changé
+
+    Args:
+        input_file: Chemin du fichier CSV d'entrée
+        output_dir: Répertoire de sortie pour les fichiers Excel
+        options: Options de traitement des années (en basse mémoire, seule
+            la complétion des années est concernée : la série fusionnée
+            reste en float64 pour détecter les révisions)
+        cache: Cache des données lues et converties (désactivé si None)
+        state_dir: Répertoire de l'état (par défaut <output_dir>/.solarcalculet)
+        gap_report: Fichier CSV du rapport des trous de la série fusionnée
+            (non écrit si None)
+        store: Stockage des séries complétées (MongoStore ou HourlyStore,
+            désactivé si None)
+
+    Returns:
+        Liste des résumés de traitement des années recalculées
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    state = IncrementalState(state_dir or output_path / ".solarcalculet")
+
+    print(f"Lecture du fichier {input_file}...")
+    df = DataReader(input_file, mode="fast", cache=cache).load()
+    prm = meter_id(df)
+    extract = options.resampler().to_hourly(df)
+    del df
+    merged, new_rows = merge_new_rows(state.load_series(), extract)
+    print(
+        f"{len(new_rows)} heures nouvelles ou révisées (dernier traitement : {state.last_timestamp or 'aucun'})"
+    )
+
+    cleaner = DataCleaner(merged)
+    if gap_report is not None:
+        write_gap_report(
+            cleaner,
+            gap_report,
+            options.max_interpolation,
+            options.partial_years == "pad",
+        )
+    affected = affected_years(new_rows)
+    # Le profil de repli dépend de toute la série : une année qui en dépend
+    # est recalculée dès qu'il change
+    profile = cleaner.profile()
+    digest = profile_digest(profile)
+    reference = store_reference(store, cleaner, prm)
+    results = []
+    for year in options.years(cleaner.years()):
+        known = state.years.get(year)
+        # Année inchangée ignorée tant que son fichier existe
+        if (
+            known is not None
+            and int(year) not in affected
+            and known.get("profile") in (None, digest)
+            and Path(known["output"]).exists()
+        ):
+            continue
+        year_cleaner = DataCleaner(
+            neighbour_data(cleaner, year),
+            profile=profile,
+            low_memory=options.low_memory,
+            reference=reference,
+        )
+        result = process_year(
+            year_cleaner,
+            year,
+            output_path,
+            options.engine,
+            partial_years=options.partial_years,
+            known_digest=None if known is None else known["digest"],
+            template_file=options.template_file,
+            store=store,
+            prm=prm,
+            max_interpolation=options.max_interpolation,
+        )
+        if result["status"] in ("ok", "unchanged"):
+            state.years[year] = {
+                "digest": result["digest"],
+                "output": result["output"],
+                "profile": (
+                    digest
+                    if uses_profile(year_cleaner, year, options.partial_years == "pad")
+                    else None
+                ),
+            }
+        results.append(result)
+
+    state.save(merged)
+    print("\nTraitement terminé !")
+    return results
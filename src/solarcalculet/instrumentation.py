@@ -0,0 +1,221 @@
+"""
+Module d'instrumentation des étapes du traitement (durées, CPU, lignes, mémoire)
+"""
+
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - module indisponible sous Windows
+    resource = None
+
+
+def peak_rss_kb() -> int:
+    """
+    Donne le pic de mémoire résidente du processus depuis son démarrage
+
+    Returns:
+        Pic RSS en kilo-octets, ou None si indisponible sur la plateforme
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est exprimé en octets sous macOS, en kilo-octets sous Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class StageRecord:
+    """Mesures d'une étape du traitement"""
+
+    def __init__(self, name: str, rows_in: int = None, **context):
+        self.name = name
+        self.context = context
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        # Hausse du pic RSS du processus pendant l'étape : 0 si l'étape reste
+        # sous le pic déjà atteint (le pic lui-même figure une fois dans le
+        # rapport)
+        self.rss_growth_kb = None
+
+    def to_dict(self) -> dict:
+        """
+        Convertit les mesures en dictionnaire sérialisable en JSON
+
+        Returns:
+            Dictionnaire des mesures
+        """
+        return {
+            "stage": self.name,
+            **self.context,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rss_growth_kb": self.rss_growth_kb,
+        }
+
+
+class _NullStage:
+    """Étape sans mesure : contexte réutilisable au coût quasi nul"""
+
+    rows_in = None
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __setattr__(self, name, value):
+        # Les affectations (rows_out...) sont ignorées
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Contexte mesurant une étape"""
+
+    def __init__(self, instrumentation, record: StageRecord):
+        self.instrumentation = instrumentation
+        self.record = record
+        self.profiler = None
+        self.wall_start = None
+        self.cpu_start = None
+        self.rss_start = None
+
+    def __enter__(self) -> StageRecord:
+        if self.instrumentation.profile_dir is not None:
+            tracemalloc.start()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.rss_start = peak_rss_kb()
+        return self.record
+
+    def __exit__(self, *exc_info):
+        self.record.wall_seconds = time.perf_counter() - self.wall_start
+        self.record.cpu_seconds = time.process_time() - self.cpu_start
+        if self.rss_start is not None:
+            self.record.rss_growth_kb = peak_rss_kb() - self.rss_start
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.instrumentation.dump_profile(self.record, self.profiler)
+        self.instrumentation.records.append(self.record)
+        return False
+
+
+class Instrumentation:
+    """Classe pour mesurer les étapes du traitement et produire un rapport JSON"""
+
+    TRACEMALLOC_TOP = 25
+
+    def __init__(self, enabled: bool = True, profile_dir: str = None):
+        """
+        Initialise l'instrumentation
+
+        Args:
+            enabled: Active les mesures (sans effet mesurable si False)
+            profile_dir: Si renseigné, enregistre pour chaque étape un profil
+                cProfile (.prof) et les principales allocations tracemalloc
+        """
+        self.enabled = enabled
+        self.profile_dir = None if profile_dir is None else Path(profile_dir)
+        self.records = []
+
+    def stage(self, name: str, rows_in: int = None, **context):
+        """
+        Crée le contexte de mesure d'une étape
+
+        Args:
+            name: Nom de l'étape
+            rows_in: Nombre de lignes en entrée
+            **context: Informations complémentaires (année...)
+
+        Returns:
+            Contexte renvoyant l'enregistrement de l'étape (rows_out à renseigner)
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, StageRecord(name, rows_in, **context))
+
+    def extend(self, records: list):
+        """
+        Ajoute des mesures produites dans un autre processus
+
+        Args:
+            records: Liste de dictionnaires issus de report()["stages"]
+        """
+        if self.enabled:
+            self.records.extend(_RecordedStage(record) for record in records)
+
+    def report(self) -> dict:
+        """
+        Construit le rapport des mesures
+
+        Returns:
+            Rapport sérialisable en JSON
+        """
+        stages = [record.to_dict() for record in self.records]
+        return {
+            "stages": stages,
+            "total_wall_seconds": sum(stage["wall_seconds"] or 0.0 for stage in stages),
+            "total_cpu_seconds": sum(stage["cpu_seconds"] or 0.0 for stage in stages),
+            "peak_rss_kb": peak_rss_kb(),
+        }
+
+    def write_report(self, report_file: str):
+        """
+        Écrit le rapport JSON
+
+        Args:
+            report_file: Chemin du fichier de rapport
+        """
+        Path(report_file).write_text(
+            json.dumps(self.report(), indent=2), encoding="utf-8"
+        )
+
+    def dump_profile(self, record: StageRecord, profiler: cProfile.Profile):
+        """
+        Enregistre le profil CPU et les allocations mémoire d'une étape
+
+        Args:
+            record: Mesures de l'étape
+            profiler: Profileur arrêté de l'étape
+        """
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        suffix = "-".join(str(value) for value in record.context.values())
+        stem = f"{len(self.records):03d}-{record.name}" + (
+            f"-{suffix}" if suffix else ""
+        )
+        profiler.dump_stats(self.profile_dir / f"{stem}.prof")
+
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        top = snapshot.statistics("lineno")[: self.TRACEMALLOC_TOP]
+        (self.profile_dir / f"{stem}.tracemalloc.txt").write_text(
+            "\n".join(str(stat) for stat in top), encoding="utf-8"
+        )
+
+
+class _RecordedStage:
+    """Mesures déjà sérialisées (importées depuis un processus de travail)"""
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def to_dict(self) -> dict:
+        return dict(self.data)
+
+
+NULL_INSTRUMENTATION = Instrumentation(enabled=False)
@@ -1,84 +1,227 @@
 """
-Script principal pour le traitement des données ENEDIS
+Script principal pour le traitement des données ENEDIS (ligne de commande,
+le traitement lui-même est dans le module pipeline)
 """
 
-import sys
+import argparse
 from pathlib import Path
-from solarcalculet.data_reader import DataReader
-from solarcalculet.data_cleaner import DataCleaner
-from solarcalculet.excel_exporter import ExcelExporter
+from solarcalculet.constants import (
+    DEFAULT_TEMPLATE,
+    EXPORT_AGGREGATIONS,
+    EXPORT_ENGINES,
+    PARTIAL_YEAR_POLICIES,
+    TIMESTAMP_CONVENTIONS,
+)
 
 
-def process_enedis_data(input_file: str, output_dir: str):
+def main(argv: list = None, prog: str = "python -m solarcalculet.main"):
     """
-    Traite les données ENEDIS et génère les fichiers Excel
+    Point d'entrée en ligne de commande (commande process de
+    python -m solarcalculet)
 
     Args:
-        input_file: Chemin du fichier CSV d'entrée
-        output_dir: Répertoire de sortie pour les fichiers Excel
+        argv: Arguments de la ligne de commande (sys.argv[1:] par défaut)
+        prog: Nom du programme affiché dans l'aide
     """
-    # Crée le répertoire de sortie si nécessaire
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    # 1. Lecture des données
-    print(f"Lecture du fichier {input_file}...")
-    reader = DataReader(input_file)
-    df = reader.read()
-
-    # Vérifie les colonnes requises
-    missing_cols = reader.validate_columns(df)
-    if missing_cols:
-        raise ValueError(f"Colonnes manquantes : {', '.join(missing_cols)}")
-
-    # Conversion en kW
-    df = reader.convert_to_kw(df)
-    print("Données converties en kW")
-
-    # 2. Nettoyage des données
-    print("Nettoyage des données...")
-    cleaner = DataCleaner(df)
-
-    # Traite chaque année
-    for year in ["2023", "2024"]:
-        print(f"\nTraitement de l'année {year}:")
-
-        # Détecte les données manquantes
-        missing = cleaner.detect_missing_hours(year)
-        if missing:
-            print(f"- {len(missing)} heures manquantes détectées")
-
-            # Remplit les données manquantes
-            df = cleaner.fill_missing_data(year)
-            print("- Données manquantes complétées")
-        else:
-            print("- Aucune donnée manquante")
-
-        # Extrait les données de l'année
-        year_data = cleaner.get_data_by_year(year)
-
-        # 3. Export vers Excel
-        output_file = output_path / f"{year}.xlsx"
-        print(f"- Génération du fichier {output_file}")
-
-        exporter = ExcelExporter(year_data)
-        exporter.export_to_excel(str(output_file))
-
-        # Valide le format
-        errors = exporter.validate_export_format(str(output_file))
-        if errors:
-            print(f"⚠️ Erreurs de validation pour {year}.xlsx:")
-            for error in errors:
-                print(f"  - {error}")
-        else:
-            print(f"✅ Fichier {year}.xlsx généré avec succès")
-
-    print("\nTraitement terminé !")
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Traitement des données ENEDIS"
+    )
+    parser.add_argument(
+        "input_csv",
+        nargs="?",
+        help="Fichier CSV ENEDIS, URL ou répertoire de classeurs hebdomadaires",
+    )
+    parser.add_argument(
+        "output_dir", nargs="?", default=".", help="Répertoire de sortie"
+    )
+    parser.add_argument("--engine", choices=EXPORT_ENGINES, default="pandas")
+    parser.add_argument(
+        "--template",
+        default=DEFAULT_TEMPLATE,
+        help='Classeur modèle du moteur "template" (filled_template.xlsx du '
+        "paquet par défaut)",
+    )
+    parser.add_argument(
+        "--aggregation",
+        choices=EXPORT_AGGREGATIONS,
+        default="mean",
+        help="Agrégation des mesures infra-horaires",
+    )
+    parser.add_argument(
+        "--timestamp-at",
+        choices=TIMESTAMP_CONVENTIONS,
+        default="end",
+        help="Position de l'Horodate dans l'intervalle mesuré (fin pour ENEDIS)",
+    )
+    parser.add_argument(
+        "--fleet", action="store_true", help="Traite chaque compteur (PRM) séparément"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus (compteurs en mode parc, années sinon)",
+    )
+    parser.add_argument("--start-year", type=int, help="Première année à traiter")
+    parser.add_argument("--end-year", type=int, help="Dernière année à traiter")
+    parser.add_argument(
+        "--partial-years",
+        choices=PARTIAL_YEAR_POLICIES,
+        default="as-is",
+        help="Traitement des années incomplètes",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Ne recalcule que les années affectées par les nouvelles données",
+    )
+    parser.add_argument("--state-dir", help="Répertoire de l'état du mode incrémental")
+    parser.add_argument("--chunksize", type=int, help="Lecture par blocs de N lignes")
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Mode basse mémoire (float32, sans copies intermédiaires)",
+    )
+    parser.add_argument(
+        "--report", help="Écrit un rapport JSON des mesures par étape dans ce fichier"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help="Enregistre les profils cProfile et tracemalloc de chaque étape",
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="Enregistre les séries complétées dans MongoDB (variables MONGODB_*)",
+    )
+    parser.add_argument(
+        "--hourly-store",
+        metavar="DIR",
+        help="Enregistre les séries complétées dans des fichiers horaires "
+        "à emplacements fixes (np.memmap)",
+    )
+    parser.add_argument(
+        "--interpolate",
+        type=int,
+        default=0,
+        metavar="HOURS",
+        help="Interpole linéairement les trous d'au plus HOURS heures "
+        "(les plus longs sont remplacés par les années voisines)",
+    )
+    parser.add_argument(
+        "--gap-report", metavar="CSV", help="Écrit le rapport des trous par année"
+    )
+    parser.add_argument("--cache-dir", help="Répertoire du cache de lecture")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore le cache de lecture"
+    )
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="Vide le cache de lecture"
+    )
+    args = parser.parse_args(argv)
+    if args.engine == "template" and not Path(args.template).is_file():
+        parser.error(f"classeur modèle introuvable : {args.template} (--template)")
+
+    # Imports différés : l'aide s'affiche sans charger pandas ni openpyxl
+    # pylint: disable=import-outside-toplevel
+    from solarcalculet.instrumentation import Instrumentation
+    from solarcalculet.parse_cache import ParseCache
+    from solarcalculet.pipeline import ProcessingOptions, process_enedis_data
+
+    cache = None if args.no_cache else ParseCache(args.cache_dir)
+    if args.clear_cache:
+        removed = ParseCache(args.cache_dir).clear()
+        print(f"Cache vidé ({removed} entrées supprimées)")
+        if args.input_csv is None:
+            return
+    if args.input_csv is None:
+        parser.error("le fichier CSV d'entrée est requis")
+
+    if args.store and args.hourly_store:
+        parser.error("--store et --hourly-store sont exclusifs")
+    if args.fleet and args.gap_report:
+        parser.error("--gap-report ne s'applique pas au mode parc (--fleet)")
+    if args.incremental and args.workers != 1:
+        parser.error("--workers ne s'applique pas au mode incrémental")
+    if args.fleet or args.incremental:
+        mode = "--fleet" if args.fleet else "--incremental"
+        for option, value in (
+            ("--chunksize", args.chunksize),
+            ("--report", args.report),
+            ("--profile-dir", args.profile_dir),
+        ):
+            if value is not None:
+                parser.error(f"{option} ne s'applique pas avec {mode}")
+    options = ProcessingOptions(
+        engine=args.engine,
+        aggregation=args.aggregation,
+        timestamp_at=args.timestamp_at,
+        start_year=args.start_year,
+        end_year=args.end_year,
+        partial_years=args.partial_years,
+        template_file=args.template,
+        low_memory=args.low_memory,
+        max_interpolation=args.interpolate,
+    )
+    store = None
+    if args.store:
+        # pymongo n'est nécessaire qu'avec --store
+        from solarcalculet.mongo_store import MongoStore
+
+        store = MongoStore.from_env()
+        store.ensure_collection()
+    elif args.hourly_store:
+        from solarcalculet.hourly_store import HourlyStore
+
+        store = HourlyStore(args.hourly_store)
+
+    if args.fleet:
+        from solarcalculet.fleet import print_fleet_summary, process_fleet
+
+        print_fleet_summary(
+            process_fleet(
+                args.input_csv,
+                args.output_dir,
+                workers=args.workers,
+                options=options,
+                cache=cache,
+                store=store,
+            )
+        )
+        return
+
+    if args.incremental:
+        from solarcalculet.incremental import process_incremental
+
+        process_incremental(
+            args.input_csv,
+            args.output_dir,
+            options=options,
+            cache=cache,
+            state_dir=args.state_dir,
+            gap_report=args.gap_report,
+            store=store,
+        )
+        return
+
+    instrumentation = None
+    if args.report or args.profile_dir:
+        instrumentation = Instrumentation(profile_dir=args.profile_dir)
+    process_enedis_data(
+        args.input_csv,
+        args.output_dir,
+        options=options,
+        cache=cache,
+        workers=args.workers,
+        instrumentation=instrumentation,
+        store=store,
+        gap_report=args.gap_report,
+        chunksize=args.chunksize,
+    )
+    if args.report:
+        instrumentation.write_report(args.report)
+        print(f"Rapport des mesures écrit dans {args.report}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python -m solarcalculet.main <input_csv> <output_dir>")
-        sys.exit(1)
-
-    process_enedis_data(sys.argv[1], sys.argv[2])
+    main()
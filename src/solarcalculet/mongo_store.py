@@ -0,0 +1,265 @@
+"""
+Module de stockage des séries complétées dans une collection MongoDB
+"""
+
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from pymongo import ASCENDING, MongoClient, UpdateOne
+
+# Clients partagés par URI : un pool de connexions par processus
+_CLIENTS = {}
+
+
+def get_client(uri: str, pool_size: int = 50) -> MongoClient:
+    """
+    Donne le client (et son pool de connexions) associé à une URI
+
+    Args:
+        uri: URI de connexion MongoDB
+        pool_size: Nombre maximal de connexions du pool
+
+    Returns:
+        Client MongoDB réutilisé entre les appels
+    """
+    client = _CLIENTS.get(uri)
+    if client is None:
+        client = MongoClient(uri, maxPoolSize=pool_size, tz_aware=False)
+        _CLIENTS[uri] = client
+    return client
+
+
+def close_clients():
+    """Ferme tous les clients partagés"""
+    while _CLIENTS:
+        _, client = _CLIENTS.popitem()
+        client.close()
+
+
+class MongoStore:
+    """
+    Classe pour persister les séries horaires complétées dans une collection
+    time-series MongoDB, une mesure par (PRM, Horodate)
+    """
+
+    TIME_FIELD = "Horodate"
+    META_FIELD = "prm"
+    VALUE_FIELDS = ["Valeur", "Source"]
+    GRANULARITY = "hours"
+    DEFAULT_BATCH_SIZE = 10_000
+    ENV_VARIABLES = ("MONGODB_URI", "MONGODB_DB", "MONGODB_COLLECTION")
+
+    def __init__(
+        self,
+        uri: str = "mongodb://localhost:27017/",
+        database: str = "enedis_data",
+        collection: str = "consumption_data",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        timeseries: bool = True,
+        client: MongoClient = None,
+    ):
+        """
+        Initialise le stockage (aucune connexion n'est ouverte avant le
+        premier accès, l'instance peut être transmise à un autre processus)
+
+        Args:
+            uri: URI de connexion MongoDB
+            database: Nom de la base
+            collection: Nom de la collection
+            batch_size: Nombre d'opérations par écriture groupée
+            timeseries: Crée une collection time-series (sinon collection
+                classique avec index unique sur (prm, Horodate))
+            client: Client à utiliser à la place du pool partagé (serveur de
+                test, client compatible en mémoire)
+        """
+        self.uri = uri
+        self.database = database
+        self.collection_name = collection
+        self.batch_size = batch_size
+        self.timeseries = timeseries
+        self._client = client
+
+    @classmethod
+    def from_env(cls, env_file: str = ".env", **options) -> "MongoStore":
+        """
+        Crée le stockage à partir des variables MONGODB_URI, MONGODB_DB et
+        MONGODB_COLLECTION (fichier .env puis environnement)
+
+        Args:
+            env_file: Fichier de variables d'environnement
+            **options: Autres paramètres du constructeur
+
+        Returns:
+            Stockage configuré
+        """
+        # Import différé : python-dotenv n'est utile qu'à la configuration
+        from dotenv import load_dotenv  # pylint: disable=import-outside-toplevel
+
+        load_dotenv(env_file)
+        uri, database, collection = (os.environ.get(name) for name in cls.ENV_VARIABLES)
+        settings = {"uri": uri, "database": database, "collection": collection}
+        return cls(
+            **{key: value for key, value in settings.items() if value}, **options
+        )
+
+    def __getstate__(self) -> dict:
+        # Le client n'est pas transmis : l'autre processus utilise son propre pool
+        state = self.__dict__.copy()
+        state["_client"] = None
+        return state
+
+    @property
+    def client(self) -> MongoClient:
+        """Client MongoDB (pool partagé par défaut)"""
+        if self._client is None:
+            return get_client(self.uri)
+        return self._client
+
+    @property
+    def collection(self):
+        """Collection des mesures"""
+        return self.client[self.database][self.collection_name]
+
+    def ensure_collection(self):
+        """
+        Crée la collection et son index (prm, Horodate) si nécessaire
+        """
+        database = self.client[self.database]
+        if self.collection_name not in database.list_collection_names():
+            options = {}
+            if self.timeseries:
+                options["timeseries"] = {
+                    "timeField": self.TIME_FIELD,
+                    "metaField": self.META_FIELD,
+                    "granularity": self.GRANULARITY,
+                }
+            database.create_collection(self.collection_name, **options)
+        # Les collections time-series n'acceptent pas d'index unique
+        self.collection.create_index(
+            [(self.META_FIELD, ASCENDING), (self.TIME_FIELD, ASCENDING)],
+            unique=not self.timeseries,
+        )
+
+    def upsert_batches(self, df: pd.DataFrame, prm: str):
+        """
+        Prépare les écritures groupées d'une série, clé (prm, Horodate)
+
+        Args:
+            df: Série avec les colonnes Horodate, Valeur et éventuellement Source
+            prm: Identifiant du compteur
+
+        Yields:
+            Listes d'au plus batch_size opérations UpdateOne (upsert)
+        """
+        fields = [field for field in self.VALUE_FIELDS if field in df.columns]
+        horodates = pd.DatetimeIndex(df[self.TIME_FIELD]).to_pydatetime()
+        values = {field: self._to_bson(df[field]) for field in fields}
+        for start in range(0, len(df), self.batch_size):
+            stop = min(start + self.batch_size, len(df))
+            yield [
+                UpdateOne(
+                    {self.META_FIELD: prm, self.TIME_FIELD: horodates[i]},
+                    {"$set": {field: values[field][i] for field in fields}},
+                    upsert=True,
+                )
+                for i in range(start, stop)
+            ]
+
+    def write_series(self, df: pd.DataFrame, prm: str) -> dict:
+        """
+        Enregistre une série par écritures groupées non ordonnées
+
+        Args:
+            df: Série avec les colonnes Horodate, Valeur et éventuellement Source
+            prm: Identifiant du compteur
+
+        Returns:
+            Compteurs {"upserted": insertions, "modified": mises à jour}
+        """
+        counts = {"upserted": 0, "modified": 0}
+        for requests in self.upsert_batches(df, str(prm)):
+            result = self.collection.bulk_write(requests, ordered=False)
+            counts["upserted"] += result.upserted_count
+            counts["modified"] += result.modified_count
+        return counts
+
+    def read_range(
+        self, prm: str, start: datetime = None, end: datetime = None
+    ) -> pd.DataFrame:
+        """
+        Lit la série d'un compteur sur une plage [start, end)
+
+        Args:
+            prm: Identifiant du compteur
+            start: Date de début incluse (sans limite si None)
+            end: Date de fin exclue (sans limite si None)
+
+        Returns:
+            DataFrame trié Horodate, Valeur, Source, utilisable directement
+            par DataCleaner et ExcelExporter
+        """
+        query = {self.META_FIELD: str(prm)}
+        bounds = {}
+        if start is not None:
+            bounds["$gte"] = pd.Timestamp(start).to_pydatetime()
+        if end is not None:
+            bounds["$lt"] = pd.Timestamp(end).to_pydatetime()
+        if bounds:
+            query[self.TIME_FIELD] = bounds
+
+        projection = {"_id": 0, self.TIME_FIELD: 1, **{f: 1 for f in self.VALUE_FIELDS}}
+        cursor = self.collection.find(query, projection).sort(
+            self.TIME_FIELD, ASCENDING
+        )
+        df = pd.DataFrame(
+            list(cursor.batch_size(self.batch_size)),
+            columns=[self.TIME_FIELD, *self.VALUE_FIELDS],
+        )
+        df[self.TIME_FIELD] = pd.to_datetime(df[self.TIME_FIELD])
+        df["Valeur"] = df["Valeur"].astype("float64")
+        df["Source"] = df["Source"].fillna("original")
+        return df
+
+    def read_year(self, prm: str, year: str) -> pd.DataFrame:
+        """
+        Lit la série d'un compteur pour une année civile
+
+        Args:
+            prm: Identifiant du compteur
+            year: Année
+
+        Returns:
+            DataFrame trié Horodate, Valeur, Source
+        """
+        return self.read_range(
+            prm, pd.Timestamp(int(year), 1, 1), pd.Timestamp(int(year) + 1, 1, 1)
+        )
+
+    def prms(self) -> list:
+        """
+        Liste les compteurs présents dans la collection
+
+        Returns:
+            Liste triée des identifiants
+        """
+        return sorted(self.collection.distinct(self.META_FIELD))
+
+    @staticmethod
+    def _to_bson(column: pd.Series) -> list:
+        """
+        Convertit une colonne en valeurs Python encodables en BSON
+
+        Args:
+            column: Colonne numérique ou textuelle
+
+        Returns:
+            Liste de valeurs (float ou str, None pour une valeur manquante)
+        """
+        if pd.api.types.is_numeric_dtype(column):
+            values = column.to_numpy(dtype=np.float64)
+            if column.dtype == np.float32:
+                # float32 (mode basse mémoire) : 6 décimales comme à l'export
+                values = np.round(values, 6)
+            return [None if np.isnan(value) else value for value in values.tolist()]
+        return [None if pd.isna(value) else str(value) for value in column.tolist()]
@@ -0,0 +1,224 @@
+"""
+Module de cache disque des données ENEDIS déjà lues et converties
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+
+class ParseCache:
+    """Classe pour stocker les DataFrames lus dans un cache colonnaire adressé par contenu"""
+
+    DEFAULT_DIR = Path.home() / ".cache" / "solarcalculet"
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    FORMAT_VERSION = 2
+    SUFFIX = ".npz"
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialise le cache
+
+        Args:
+            cache_dir: Répertoire du cache (par défaut ~/.cache/solarcalculet)
+            max_bytes: Taille maximale du cache avant éviction des entrées les
+                moins récemment utilisées
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.DEFAULT_DIR
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def file_digest(file_path: str, block_size: int = 1024 * 1024) -> str:
+        """
+        Calcule l'empreinte SHA-256 du contenu d'un fichier
+
+        Args:
+            file_path: Chemin du fichier
+            block_size: Taille des blocs de lecture
+
+        Returns:
+            Empreinte hexadécimale
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def make_key(self, file_path: str, options: dict) -> str:
+        """
+        Construit la clé d'une entrée à partir du contenu du fichier et des
+        options de lecture
+
+        Args:
+            file_path: Chemin du fichier lu
+            options: Options de lecture influençant le résultat
+
+        Returns:
+            Clé de l'entrée
+        """
+        payload = json.dumps(
+            {
+                "content": self.file_digest(file_path),
+                "options": options,
+                "version": self.FORMAT_VERSION,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> pd.DataFrame:
+        """
+        Charge une entrée du cache
+
+        Args:
+            key: Clé de l'entrée
+
+        Returns:
+            DataFrame en cache, ou None si absent
+        """
+        path = self._entry_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                columns = json.loads(str(archive["__columns__"]))
+                df = pd.DataFrame(
+                    {
+                        name: self._decode(archive, f"col{i}", kind)
+                        for i, (name, kind) in enumerate(columns)
+                    }
+                )
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+        # Met à jour la date d'accès pour l'éviction LRU
+        os.utime(path)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        """
+        Enregistre un DataFrame dans le cache puis applique la limite de taille
+
+        Args:
+            key: Clé de l'entrée
+            df: DataFrame à enregistrer
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        columns = []
+        for i, name in enumerate(df.columns):
+            kind, parts = self._encode(df[name])
+            for suffix, array in parts.items():
+                arrays[f"col{i}{suffix}"] = array
+            columns.append((name, kind))
+        arrays["__columns__"] = np.array(json.dumps(columns))
+
+        # Écriture atomique : fichier temporaire puis renommage
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale"""
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    def clear(self) -> int:
+        """
+        Vide le cache
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        entries = list(self._entries())
+        for path, _ in entries:
+            path.unlink(missing_ok=True)
+        return len(entries)
+
+    def size(self) -> int:
+        """
+        Calcule la taille totale du cache
+
+        Returns:
+            Taille en octets
+        """
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _entries(self):
+        if not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                yield path, path.stat()
+            except FileNotFoundError:
+                continue
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    @staticmethod
+    def _encode(column: pd.Series) -> tuple:
+        """
+        Convertit une colonne en tableaux numpy sans objets Python
+
+        Les catégorielles sont stockées en codes et catégories, les chaînes
+        avec le masque de leurs valeurs manquantes, pour restituer NaN.
+
+        Args:
+            column: Colonne à enregistrer
+
+        Returns:
+            Tuple (type de colonne, {suffixe du nom: tableau})
+        """
+        if pd.api.types.is_datetime64_any_dtype(column):
+            return "datetime", {
+                "": column.to_numpy(dtype="datetime64[ns]").view("int64")
+            }
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return "category", {
+                "": column.cat.codes.to_numpy(),
+                "_categories": column.cat.categories.astype(str).to_numpy(dtype=str),
+            }
+        if pd.api.types.is_numeric_dtype(column):
+            return "numeric", {"": column.to_numpy()}
+        missing = column.isna().to_numpy()
+        return "string", {
+            "": column.where(~missing, "").astype(str).to_numpy(dtype=str),
+            "_na": missing,
+        }
+
+    @staticmethod
+    def _decode(archive, name: str, kind: str):
+        """
+        Reconstruit une colonne à partir de ses tableaux numpy
+
+        Args:
+            archive: Archive npz de l'entrée
+            name: Nom du tableau principal de la colonne
+            kind: Type de colonne (voir _encode)
+
+        Returns:
+            Valeurs de la colonne
+        """
+        array = archive[name]
+        if kind == "datetime":
+            return array.view("datetime64[ns]")
+        if kind == "string":
+            values = array.astype(object)
+            values[archive[f"{name}_na"]] = np.nan
+            return values
+        if kind == "category":
+            return pd.Categorical.from_codes(
+                array, archive[f"{name}_categories"].astype(object)
+            )
+        return array
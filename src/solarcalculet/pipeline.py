@@ -0,0 +1,714 @@
+"""
+Module du traitement des données ENEDIS : lecture, ré-échantillonnage puis
+complétion, export Excel et validation de chaque année
+"""
+
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+import pandas as pd
+from solarcalculet.constants import EXPORT_AGGREGATIONS, PARTIAL_YEAR_POLICIES
+from solarcalculet.data_reader import DataReader
+from solarcalculet.data_cleaner import DataCleaner
+from solarcalculet.excel_exporter import ExcelExporter
+from solarcalculet.hourly_store import HourlyStore
+from solarcalculet.http_fetcher import fetch_csv, is_url
+from solarcalculet.instrumentation import NULL_INSTRUMENTATION, Instrumentation
+from solarcalculet.parse_cache import ParseCache
+from solarcalculet.resampler import Resampler
+from solarcalculet.workbook_reader import WorkbookReader
+
+PRM_COLUMN = "Identifiant PRM"
+DEFAULT_PRM = "inconnu"
+
+
+@dataclass(frozen=True)
+class ProcessingOptions:  # pylint: disable=too-many-instance-attributes
+    """
+    Options de traitement des années, communes au traitement d'un fichier,
+    au mode parc, au mode incrémental et aux lots
+
+    Attributes:
+        engine: Moteur d'export Excel ("pandas", "streaming" ou "template")
+        aggregation: Agrégation des mesures infra-horaires ("mean" ou "max")
+        timestamp_at: Position de l'Horodate dans l'intervalle mesuré
+            ("end" pour les extractions ENEDIS, ou "start")
+        start_year: Première année à traiter (toutes si None)
+        end_year: Dernière année à traiter (toutes si None)
+        partial_years: Traitement des années incomplètes : "as-is" (export
+            de la plage disponible), "pad" (complétion de l'année civile
+            entière) ou "skip" (année ignorée)
+        template_file: Classeur modèle du moteur d'export "template"
+        low_memory: Mode basse mémoire (données transmises sans copie entre
+            les étapes, Valeur en float32, Source catégorielle)
+        max_interpolation: Longueur maximale (heures) des trous interpolés
+            linéairement, les plus longs étant remplacés par les années
+            voisines (désactivé à 0)
+    """
+
+    engine: str = "pandas"
+    aggregation: str = "mean"
+    timestamp_at: str = "end"
+    start_year: int = None
+    end_year: int = None
+    partial_years: str = "as-is"
+    template_file: str = None
+    low_memory: bool = False
+    max_interpolation: int = 0
+
+    def __post_init__(self):
+        """
+        Vérifie la politique des années incomplètes
+
+        Raises:
+            ValueError: Si la politique est inconnue
+        """
+        if self.partial_years not in PARTIAL_YEAR_POLICIES:
+            raise ValueError(
+                f"Politique d'années incomplètes inconnue : {self.partial_years}"
+            )
+
+    def resampler(self) -> Resampler:
+        """
+        Crée le ré-échantillonneur des données à exporter (voir hourly_resampler)
+
+        Returns:
+            Ré-échantillonneur au pas horaire
+        """
+        return hourly_resampler(self.aggregation, self.timestamp_at)
+
+    def years(self, available: list) -> list:
+        """
+        Sélectionne les années à traiter (voir select_years)
+
+        Args:
+            available: Années présentes dans les données
+
+        Returns:
+            Liste triée des années retenues (str)
+        """
+        return select_years(available, self.start_year, self.end_year)
+
+
+DEFAULT_OPTIONS = ProcessingOptions()
+
+
+def process_enedis_data(
+    input_file: str,
+    output_dir: str,
+    options: ProcessingOptions = DEFAULT_OPTIONS,
+    cache: ParseCache = None,
+    workers: int = 1,
+    instrumentation: Instrumentation = None,
+    store=None,
+    gap_report: str = None,
+    chunksize: int = None,
+    spill_dir: str = None,
+    max_memory: int = None,
+) -> list:
+    """
+    Traite les données ENEDIS et génère les fichiers Excel
+
+    Args:
+        input_file: Chemin ou URL http(s) du fichier CSV d'entrée (une URL
+            est téléchargée et analysée au fil de la réception), ou
+            répertoire de classeurs hebdomadaires <mois>.<semaine>.<année>.xlsx
+        output_dir: Répertoire de sortie pour les fichiers Excel
+        options: Options de traitement des années
+        cache: Cache des données lues et converties (désactivé si None)
+        workers: Nombre de processus traitant les années en parallèle
+        instrumentation: Mesure des étapes du traitement (désactivée si None)
+        store: Stockage des séries complétées (MongoStore ou HourlyStore,
+            désactivé si None). Un HourlyStore reçoit aussi les mesures, où
+            les années voisines sont lues par accès indexé
+        gap_report: Fichier CSV du rapport des trous de toutes les années
+            (non écrit si None)
+        chunksize: Si renseigné, lit le fichier local par blocs de cette
+            taille et traite une année à la fois (mémoire bornée)
+        spill_dir: Répertoire de déversement des partitions annuelles
+        max_memory: Taille maximale en octets des partitions en mémoire
+
+    Returns:
+        Liste des résumés de traitement par année
+    """
+    instrumentation = instrumentation or NULL_INSTRUMENTATION
+    low_memory = options.low_memory
+
+    # Crée le répertoire de sortie si nécessaire
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # 1. Lecture des données
+    print(f"Lecture du fichier {input_file}...")
+    reader = DataReader(input_file, mode="fast", cache=cache, low_memory=low_memory)
+    resampler = options.resampler()
+
+    if chunksize is not None and (is_url(input_file) or Path(input_file).is_dir()):
+        raise ValueError(
+            "La lecture par blocs ne s'applique qu'aux fichiers CSV locaux"
+        )
+    if chunksize is not None:
+        results = _process_by_partition(
+            reader,
+            resampler,
+            output_path,
+            options,
+            chunksize,
+            spill_dir,
+            max_memory,
+            instrumentation,
+            store,
+            gap_report,
+        )
+        print("\nTraitement terminé !")
+        return results
+
+    # Vérifie les colonnes requises et convertit en kW (ou charge depuis le cache)
+    if is_url(input_file):
+        with instrumentation.stage("read", source="http") as stage:
+            df = fetch_csv(input_file, low_memory=low_memory)
+            stage.rows_out = len(df)
+    elif Path(input_file).is_dir():
+        with instrumentation.stage("read", source="xlsx") as stage:
+            workbook_reader = WorkbookReader(input_file, low_memory=low_memory)
+            df = workbook_reader.load()
+            stage.rows_out = len(df)
+        for path, reason in workbook_reader.skipped:
+            print(f"⚠️  Classeur ignoré {path} : {reason}")
+    else:
+        df = reader.load(instrumentation)
+    print("Données converties en kW")
+    prm = meter_id(df)
+
+    # Agrège les mesures infra-horaires au pas horaire
+    with instrumentation.stage("resample", rows_in=len(df)) as stage:
+        df = resampler.to_hourly(df)
+        stage.rows_out = len(df)
+    print(f"Données agrégées au pas horaire ({len(df)} heures)")
+
+    # 2. Nettoyage des données
+    print("Nettoyage des données...")
+    cleaner = DataCleaner(df, low_memory=low_memory)
+    del df
+    years = options.years(cleaner.years())
+    print(f"Années à traiter : {', '.join(map(str, years)) or 'aucune'}")
+    if gap_report is not None:
+        write_gap_report(
+            cleaner,
+            gap_report,
+            options.max_interpolation,
+            options.partial_years == "pad",
+        )
+
+    # Chaque année est traitée sur ses propres données et celles des années
+    # voisines (sources de remplacement) : les années sont indépendantes. Le
+    # profil médian de repli est calculé une seule fois sur toutes les données
+    profile = cleaner.profile()
+    reference = store_reference(store, cleaner, prm)
+    tasks = [(neighbour_data(cleaner, year), year) for year in years]
+    if workers is None or workers > 1:
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _process_year_task,
+                    data,
+                    year,
+                    output_path,
+                    options,
+                    profile,
+                    Instrumentation(
+                        enabled=instrumentation.enabled,
+                        profile_dir=instrumentation.profile_dir,
+                    ),
+                    store,
+                    prm,
+                    reference,
+                )
+                for data, year in tasks
+            ]
+            for future in futures:
+                result = future.result()
+                instrumentation.extend(result.pop("stages"))
+                results.append(result)
+                print_year_result(result)
+    else:
+        results = [
+            process_year(
+                DataCleaner(
+                    data, profile=profile, low_memory=low_memory, reference=reference
+                ),
+                year,
+                output_path,
+                options.engine,
+                partial_years=options.partial_years,
+                instrumentation=instrumentation,
+                template_file=options.template_file,
+                store=store,
+                prm=prm,
+                max_interpolation=options.max_interpolation,
+            )
+            for data, year in tasks
+        ]
+
+    print("\nTraitement terminé !")
+    return results
+
+
+def _process_year_task(
+    data: pd.DataFrame,
+    year: str,
+    output_path: Path,
+    options: ProcessingOptions,
+    profile: pd.Series = None,
+    instrumentation: Instrumentation = NULL_INSTRUMENTATION,
+    store=None,
+    prm: str = DEFAULT_PRM,
+    reference: tuple = None,
+) -> dict:
+    """
+    Traite une année dans un processus de travail (sans affichage), les
+    mesures des étapes sont renvoyées dans la clé "stages" du résumé
+    """
+    result = process_year(
+        DataCleaner(
+            data, profile=profile, low_memory=options.low_memory, reference=reference
+        ),
+        year,
+        output_path,
+        options.engine,
+        verbose=False,
+        partial_years=options.partial_years,
+        instrumentation=instrumentation,
+        template_file=options.template_file,
+        store=store,
+        prm=prm,
+        max_interpolation=options.max_interpolation,
+    )
+    result["stages"] = instrumentation.report()["stages"]
+    return result
+
+
+def _process_by_partition(
+    reader: DataReader,
+    resampler: Resampler,
+    output_path: Path,
+    options: ProcessingOptions,
+    chunksize: int,
+    spill_dir: str = None,
+    max_memory: int = None,
+    instrumentation: Instrumentation = NULL_INSTRUMENTATION,
+    store=None,
+    gap_report: str = None,
+) -> list:
+    """
+    Traite le fichier lu par blocs et réparti par année
+
+    Les mesures brutes ne sont chargées qu'une partition annuelle à la fois ;
+    seule la série horaire, bien plus compacte, est gardée pour toutes les
+    années, ce qui permet de calculer une seule fois le profil médian du
+    compteur, comme pour une lecture complète.
+
+    Args:
+        reader: Lecteur du fichier d'entrée
+        resampler: Ré-échantillonneur au pas horaire
+        output_path: Répertoire de sortie
+        options: Options de traitement des années
+        chunksize: Nombre de lignes par bloc
+        spill_dir: Répertoire de déversement des partitions annuelles
+        max_memory: Taille maximale en octets des partitions en mémoire
+        instrumentation: Mesure des étapes du traitement
+        store: Stockage des séries complétées (désactivé si None)
+        gap_report: Fichier CSV du rapport des trous (non écrit si None)
+
+    Returns:
+        Liste des résumés de traitement par année
+    """
+    frames = []
+    prms = set()
+    with reader.partition_by_year(
+        chunksize, spill_dir=spill_dir, max_memory=max_memory
+    ) as partitions:
+        available = partitions.years()
+        print(f"Données réparties par année : {', '.join(map(str, available))}")
+        # Années parcourues à rebours : les mesures du début d'une partition
+        # (jusqu'à 1 h le 1er janvier) peuvent clore la dernière heure de
+        # l'année précédente et sont reprises avec la partition suivante,
+        # puis seules (None) pour une année sans partition
+        carry = None
+        upper = None
+        for year in [*reversed(available), None]:
+            parts = [] if year is None else [partitions.get(year)]
+            if carry is not None:
+                parts.append(carry)
+            if not parts:
+                continue
+            df = pd.concat(parts, ignore_index=True)
+            carry = None
+            lower = None
+            if year is not None:
+                prms.add(meter_id(parts[0]))
+                lower = pd.Timestamp(year, 1, 1)
+                carry = df.loc[df["Horodate"] <= lower + resampler.HOUR]
+            with instrumentation.stage(
+                "convert_kw", rows_in=len(df), year=year
+            ) as stage:
+                df = reader.convert_to_kw(df, copy=not reader.low_memory)
+                stage.rows_out = len(df)
+            with instrumentation.stage("resample", rows_in=len(df), year=year) as stage:
+                df = resampler.to_hourly(df)
+                stage.rows_out = len(df)
+            keep = pd.Series(True, index=df.index)
+            if lower is not None:
+                keep &= df["Horodate"] >= lower
+            if upper is not None:
+                keep &= df["Horodate"] < upper
+            frames.append(df.loc[keep])
+            upper = lower
+
+    if not frames:
+        return []
+    hourly = pd.concat(frames[::-1], ignore_index=True)
+    del frames
+    prm = prms.pop() if len(prms) == 1 else DEFAULT_PRM
+    cleaner = DataCleaner(hourly, low_memory=reader.low_memory)
+    del hourly
+    if gap_report is not None:
+        write_gap_report(
+            cleaner,
+            gap_report,
+            options.max_interpolation,
+            options.partial_years == "pad",
+        )
+    profile = cleaner.profile()
+    reference = store_reference(store, cleaner, prm)
+    return [
+        process_year(
+            DataCleaner(
+                neighbour_data(cleaner, year),
+                profile=profile,
+                low_memory=reader.low_memory,
+                reference=reference,
+            ),
+            year,
+            output_path,
+            options.engine,
+            partial_years=options.partial_years,
+            instrumentation=instrumentation,
+            template_file=options.template_file,
+            store=store,
+            prm=prm,
+            max_interpolation=options.max_interpolation,
+        )
+        for year in options.years(cleaner.years())
+    ]
+
+
+def write_gap_report(
+    cleaner: DataCleaner,
+    report_file: str,
+    max_interpolation: int = 0,
+    full_year: bool = False,
+):
+    """
+    Écrit le rapport des trous (une ligne par plage d'heures manquantes)
+
+    Args:
+        cleaner: Nettoyeur contenant toutes les données
+        report_file: Fichier CSV du rapport
+        max_interpolation: Longueur maximale (heures) des trous interpolés
+        full_year: Inclut les trous de début et de fin d'année civile
+    """
+    report = cleaner.gap_report(max_interpolation, full_year=full_year)
+    report.to_csv(report_file, sep=";", index=False)
+    print(
+        f"Rapport des trous écrit dans {report_file} "
+        f"({len(report)} trous, {int(report['hours'].sum())} heures)"
+    )
+
+
+def hourly_resampler(aggregation: str = "mean", timestamp_at: str = "end") -> Resampler:
+    """
+    Crée le ré-échantillonneur des données à exporter
+
+    Args:
+        aggregation: Agrégation des mesures infra-horaires ("mean" ou "max")
+        timestamp_at: Position de l'Horodate dans l'intervalle mesuré
+
+    Returns:
+        Ré-échantillonneur au pas horaire
+
+    Raises:
+        ValueError: Agrégation dont le résultat n'est pas une puissance
+            (le modèle Excel n'accepte que des kW ou des W)
+    """
+    if aggregation not in EXPORT_AGGREGATIONS:
+        raise ValueError(
+            f"Agrégation non exportable : {aggregation} (le modèle Excel "
+            "attend une puissance en kW)"
+        )
+    return Resampler(aggregation, timestamp_at)
+
+
+def store_reference(store, cleaner: DataCleaner, prm: str) -> tuple:
+    """
+    Enregistre les mesures d'un compteur dans un stockage à emplacements
+    fixes, qui sert ensuite de référence à la complétion (valeurs des années
+    voisines lues par accès indexé)
+
+    Args:
+        store: Stockage des séries (désactivé si None)
+        cleaner: Nettoyeur contenant toutes les mesures du compteur
+        prm: Identifiant du compteur
+
+    Returns:
+        Tuple (HourlyStore, PRM) à transmettre à DataCleaner, ou None pour
+        un autre stockage
+    """
+    if not isinstance(store, HourlyStore):
+        return None
+    store.write_series(cleaner.data, prm)
+    return store, prm
+
+
+def select_years(available: list, start_year: int = None, end_year: int = None) -> list:
+    """
+    Sélectionne les années à traiter parmi celles présentes dans les données
+
+    Args:
+        available: Années présentes
+        start_year: Première année retenue (sans limite si None)
+        end_year: Dernière année retenue (sans limite si None)
+
+    Returns:
+        Liste triée des années retenues (str)
+    """
+    return [
+        str(year)
+        for year in sorted(available)
+        if (start_year is None or year >= int(start_year))
+        and (end_year is None or year <= int(end_year))
+    ]
+
+
+def meter_id(df: pd.DataFrame) -> str:
+    """
+    Donne l'identifiant du compteur d'un fichier mono-compteur
+
+    Args:
+        df: Données lues, avec éventuellement la colonne Identifiant PRM
+
+    Returns:
+        PRM du fichier, ou DEFAULT_PRM s'il est absent ou non unique
+    """
+    if PRM_COLUMN not in df.columns:
+        return DEFAULT_PRM
+    prms = df[PRM_COLUMN].dropna().unique()
+    return str(prms[0]) if len(prms) == 1 else DEFAULT_PRM
+
+
+def neighbour_data(cleaner: DataCleaner, year: str) -> pd.DataFrame:
+    """
+    Extrait les données d'une année et de ses deux années voisines
+
+    Args:
+        cleaner: Nettoyeur contenant toutes les données
+        year: Année centrale
+
+    Returns:
+        DataFrame des années year - 1 à year + 1
+    """
+    return cleaner.get_data_by_range(
+        pd.Timestamp(int(year) - 1, 1, 1), pd.Timestamp(int(year) + 2, 1, 1)
+    )
+
+
+def process_year(
+    cleaner: DataCleaner,
+    year: str,
+    output_path: Path,
+    engine: str = "pandas",
+    verbose: bool = True,
+    partial_years: str = "as-is",
+    known_digest: str = None,
+    instrumentation: Instrumentation = None,
+    template_file: str = None,
+    store=None,
+    prm: str = DEFAULT_PRM,
+    max_interpolation: int = 0,
+) -> dict:
+    """
+    Complète, exporte et valide les données d'une année
+
+    Args:
+        cleaner: Nettoyeur contenant les données de l'année et des années voisines
+        year: Année à traiter
+        output_path: Répertoire de sortie
+        engine: Moteur d'export Excel
+        verbose: Affiche la progression
+        partial_years: Traitement d'une année incomplète ("as-is", "pad" ou "skip")
+        known_digest: Empreinte de la série déjà exportée : si la série
+            complétée est identique et le fichier présent, l'export est ignoré
+        instrumentation: Mesure des étapes du traitement (désactivée si None)
+        template_file: Classeur modèle du moteur d'export "template"
+        store: Stockage des séries complétées (MongoStore ou HourlyStore,
+            désactivé si None)
+        prm: Identifiant du compteur dans le stockage
+        max_interpolation: Longueur maximale (heures) des trous interpolés
+            linéairement (désactivé à 0)
+
+    Returns:
+        Résumé du traitement (année, statut, heures manquantes, trous,
+        fichier, erreurs, empreinte de la série)
+    """
+    echo = print if verbose else _silent
+    instrumentation = instrumentation or NULL_INSTRUMENTATION
+    echo(f"\nTraitement de l'année {year}:")
+
+    if partial_years == "skip" and not cleaner.covers_full_year(year):
+        echo("- Année incomplète ignorée")
+        return {
+            "year": str(year),
+            "status": "skipped",
+            "missing": 0,
+            "gaps": 0,
+            "rows": 0,
+            "output": None,
+            "errors": [],
+            "digest": None,
+        }
+
+    # Détecte les données manquantes
+    full_year = partial_years == "pad"
+    with instrumentation.stage(
+        "detect_missing_hours", rows_in=len(cleaner.get_data_by_year(year)), year=year
+    ) as stage:
+        runs = cleaner.gap_runs(year, full_year=full_year)
+        missing = int(runs["hours"].sum())
+        stage.rows_out = missing
+    if missing:
+        echo(f"- {missing} heures manquantes détectées ({len(runs)} trous)")
+
+        # Remplit les données manquantes (met à jour les données du nettoyeur)
+        with instrumentation.stage(
+            "fill_missing_data", rows_in=missing, year=year
+        ) as stage:
+            cleaner.fill_missing_data(
+                year, full_year=full_year, max_interpolation=max_interpolation
+            )
+            stage.rows_out = len(cleaner.get_data_by_year(year))
+        echo("- Données manquantes complétées")
+    else:
+        echo("- Aucune donnée manquante")
+
+    # Extrait les données complétées de l'année
+    year_data = cleaner.get_data_by_year(year)
+    digest = series_digest(year_data)
+
+    # 3. Export vers Excel
+    output_file = output_path / f"{year}.xlsx"
+    if digest == known_digest and output_file.exists():
+        echo(f"- Données inchangées, {output_file} conservé")
+        return {
+            "year": str(year),
+            "status": "unchanged",
+            "missing": missing,
+            "gaps": len(runs),
+            "rows": len(year_data),
+            "output": str(output_file),
+            "errors": [],
+            "digest": digest,
+        }
+    if store is not None:
+        # Série complétée persistée avant l'export (relecture sans CSV)
+        with instrumentation.stage("store", rows_in=len(year_data), year=year):
+            store.write_series(year_data, prm)
+        echo(f"- Série enregistrée pour le compteur {prm}")
+    echo(f"- Génération du fichier {output_file}")
+
+    if isinstance(store, HourlyStore):
+        # Année relue sans copie dans le stockage qui vient d'être écrit
+        exporter = ExcelExporter.from_hourly_store(
+            store, prm, year, engine=engine, template_file=template_file
+        )
+    else:
+        exporter = ExcelExporter(
+            year_data,
+            engine=engine,
+            template_file=template_file,
+            low_memory=cleaner.low_memory,
+        )
+    with instrumentation.stage(
+        "format_labels", rows_in=len(year_data), year=year
+    ) as stage:
+        excel_data = exporter.prepare_excel_data()
+        stage.rows_out = len(excel_data)
+
+    # Valide les données préparées avant écriture : pas de relecture du
+    # fichier, l'année civile complète est exigée dès qu'elle est couverte
+    full_year = full_year or cleaner.covers_full_year(year)
+    with instrumentation.stage("validate_export", rows_in=len(excel_data), year=year):
+        errors = exporter.validate_excel_data(excel_data, full_year=full_year)
+    with instrumentation.stage(
+        "write_excel", rows_in=len(excel_data), year=year
+    ) as stage:
+        exporter.write_excel(excel_data, str(output_file))
+        stage.rows_out = len(excel_data)
+
+    if errors:
+        echo(f"⚠️ Erreurs de validation pour {year}.xlsx:")
+        for error in errors:
+            echo(f"  - {error}")
+    else:
+        echo(f"✅ Fichier {year}.xlsx généré avec succès")
+
+    return {
+        "year": str(year),
+        "status": "invalid" if errors else "ok",
+        "missing": missing,
+        "gaps": len(runs),
+        "rows": len(year_data),
+        "output": str(output_file),
+        "errors": errors,
+        "digest": digest,
+    }
+
+
+def series_digest(year_data: pd.DataFrame) -> str:
+    """
+    Calcule l'empreinte du contenu exporté d'une année (Horodate et Valeur)
+
+    Args:
+        year_data: Données complétées de l'année
+
+    Returns:
+        Empreinte SHA-256 hexadécimale
+    """
+    hashes = pd.util.hash_pandas_object(year_data[["Horodate", "Valeur"]], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def print_year_result(result: dict):
+    """
+    Affiche le résumé d'une année traitée hors du processus principal
+
+    Args:
+        result: Résumé renvoyé par process_year
+    """
+    if result["status"] == "skipped":
+        print(f"- {result['year']} : année incomplète ignorée")
+    elif result["status"] == "unchanged":
+        print(f"- {result['year']}.xlsx : données inchangées, export ignoré")
+    elif result["errors"]:
+        print(f"⚠️ {result['year']}.xlsx : {'; '.join(result['errors'])}")
+    else:
+        print(
+            f"✅ {result['year']}.xlsx : {result['rows']} heures, "
+            f"{result['missing']} heures manquantes détectées "
+            f"({result['gaps']} trous)"
+        )
+
+
+def _silent(*_args, **_kwargs):
+    """Remplace print lorsque l'affichage est désactivé"""
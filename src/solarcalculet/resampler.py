@@ -0,0 +1,115 @@
+"""
+Module de ré-échantillonnage horaire des courbes de charge ENEDIS
+"""
+
+import pandas as pd
+from solarcalculet.constants import AGGREGATIONS, KW_DECIMALS, TIMESTAMP_CONVENTIONS
+
+
+class Resampler:
+    """Classe pour agréger les données infra-horaires (PT10M, PT30M...) au pas horaire"""
+
+    AGGREGATIONS = AGGREGATIONS
+    TIMESTAMP_CONVENTIONS = TIMESTAMP_CONVENTIONS
+    HOUR = pd.Timedelta(hours=1)
+    DECIMALS = KW_DECIMALS
+
+    def __init__(self, aggregation: str = "mean", timestamp_at: str = "end"):
+        """
+        Initialise le ré-échantillonneur
+
+        Args:
+            aggregation: "mean" (puissance moyenne en kW), "max" (puissance
+                maximale en kW) ou "energy" (énergie consommée en kWh)
+            timestamp_at: "end" si l'Horodate marque la fin de l'intervalle
+                mesuré (convention ENEDIS des courbes de charge : la mesure
+                de 00:30 couvre 00:00-00:30), "start" s'il en marque le début
+        """
+        if aggregation not in self.AGGREGATIONS:
+            raise ValueError(f"Agrégation inconnue : {aggregation}")
+        if timestamp_at not in self.TIMESTAMP_CONVENTIONS:
+            raise ValueError(f"Convention d'horodatage inconnue : {timestamp_at}")
+        self.aggregation = aggregation
+        self.timestamp_at = timestamp_at
+
+    def to_hourly(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Agrège les données au pas horaire
+
+        Args:
+            df: DataFrame avec les colonnes Horodate, Valeur (kW) et
+                éventuellement Pas (durée ISO 8601 de chaque mesure)
+
+        Returns:
+            DataFrame horaire trié avec les colonnes Horodate et Valeur
+            (kW, ou kWh pour l'agrégation "energy")
+        """
+        missing_horodates = df["Horodate"].isna()
+        if missing_horodates.any():
+            df = df[~missing_horodates]
+        # Le pas de chaque mesure n'est utile que pour l'énergie ou un
+        # horodatage en fin d'intervalle
+        steps = None
+        if self.aggregation == "energy" or self.timestamp_at == "end":
+            steps = self.parse_steps(df)
+        horodates = df["Horodate"]
+        if self.timestamp_at == "end":
+            horodates = horodates - steps
+        buckets = horodates.dt.floor(self.HOUR).rename("Horodate")
+
+        values = df["Valeur"]
+        if self.aggregation == "energy":
+            values = values * (steps / self.HOUR)
+            hourly = values.groupby(buckets).sum(min_count=1)
+        elif self.aggregation == "max":
+            hourly = values.groupby(buckets).max()
+        else:
+            hourly = values.groupby(buckets).mean()
+
+        # Le template n'accepte que 6 décimales pour des valeurs en kW
+        return hourly.round(self.DECIMALS).rename("Valeur").reset_index()
+
+    @classmethod
+    def parse_steps(cls, df: pd.DataFrame) -> pd.Series:
+        """
+        Détermine le pas de chaque ligne à partir de la colonne Pas
+
+        Les valeurs sont converties une seule fois par modalité distincte.
+        Sans colonne Pas (ou pour une valeur illisible), le pas médian entre
+        horodates successives est utilisé, plafonné à une heure.
+
+        Args:
+            df: DataFrame avec les colonnes Horodate et éventuellement Pas
+
+        Returns:
+            Série des pas (Timedelta) alignée sur df
+        """
+        default_step = cls._infer_step(df["Horodate"])
+        if "Pas" not in df.columns:
+            return pd.Series(default_step, index=df.index)
+
+        pas = df["Pas"].astype("category")
+        category_steps = pd.to_timedelta(
+            pas.cat.categories.astype(str), errors="coerce"
+        )
+        codes = pas.cat.codes.to_numpy()
+        steps = pd.Series(category_steps.take(codes).to_numpy(), index=df.index)
+        steps[codes < 0] = pd.NaT
+        return steps.fillna(default_step)
+
+    @classmethod
+    def _infer_step(cls, horodates: pd.Series) -> pd.Timedelta:
+        """
+        Estime le pas de mesure à partir des horodates
+
+        Args:
+            horodates: Série des horodates
+
+        Returns:
+            Pas médian, plafonné à une heure
+        """
+        deltas = horodates.sort_values().diff()
+        deltas = deltas[deltas > pd.Timedelta(0)]
+        if deltas.empty:
+            return cls.HOUR
+        return min(deltas.median(), cls.HOUR)
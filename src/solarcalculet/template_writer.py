@@ -0,0 +1,179 @@
+"""
+Module d'export par injection des données dans le classeur modèle
+(filled_template.xlsx) attendu par l'outil de dimensionnement
+"""
+
+import math
+import posixpath
+import re
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+import pandas as pd
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+class TemplateWriter:
+    """
+    Classe pour écrire les données dans la feuille d'un classeur modèle
+
+    Le modèle est lu une seule fois : toutes les parties du paquet (styles,
+    thème, propriétés...) sont recopiées à l'identique, seules les lignes de
+    données de la feuille sont régénérées à partir de la première ligne de
+    données du modèle (mêmes styles et cellules annexes). Aucun modèle objet
+    openpyxl n'est construit.
+    """
+
+    # Lignes d'en-tête du modèle (note, intervalle, unité, titres)
+    HEADER_ROW_COUNT = 4
+
+    def __init__(self, template_file: str):
+        """
+        Lit et découpe le classeur modèle
+
+        Args:
+            template_file: Chemin du classeur modèle (.xlsx)
+        """
+        self.template_file = str(template_file)
+        with zipfile.ZipFile(self.template_file) as archive:
+            self.parts = [
+                (info, archive.read(info.filename)) for info in archive.infolist()
+            ]
+            self.sheet_name = self._first_sheet_path(archive)
+        sheet_xml = dict((info.filename, data) for info, data in self.parts)[
+            self.sheet_name
+        ].decode("utf-8")
+        self.prefix, self.row_pattern, self.suffix = self._split_sheet(sheet_xml)
+
+    @classmethod
+    @lru_cache(maxsize=8)
+    def load(cls, template_file: str) -> "TemplateWriter":
+        """
+        Donne le modèle découpé, lu une seule fois par processus
+
+        Args:
+            template_file: Chemin du classeur modèle
+
+        Returns:
+            Instance réutilisable pour toutes les années
+        """
+        return cls(template_file)
+
+    @staticmethod
+    def _first_sheet_path(archive: zipfile.ZipFile) -> str:
+        """
+        Résout le chemin de la première feuille via workbook.xml et ses relations
+
+        Args:
+            archive: Classeur modèle ouvert
+
+        Returns:
+            Nom de la partie XML de la feuille dans le paquet
+        """
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        sheet = workbook.find(f"{{{_MAIN_NS}}}sheets/{{{_MAIN_NS}}}sheet")
+        if sheet is None:
+            raise ValueError("Template sans feuille de calcul")
+        relation_id = sheet.get(f"{{{_REL_NS}}}id")
+
+        relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        for relation in relations.iter(f"{{{_PACKAGE_REL_NS}}}Relationship"):
+            if relation.get("Id") == relation_id:
+                target = relation.get("Target")
+                if target.startswith("/"):
+                    return target.lstrip("/")
+                return posixpath.normpath(posixpath.join("xl", target))
+        raise ValueError(f"Relation de feuille introuvable : {relation_id}")
+
+    @classmethod
+    def _split_sheet(cls, sheet_xml: str) -> tuple:
+        """
+        Découpe la feuille en (début, gabarit de ligne de données, fin)
+
+        Le gabarit est la première ligne de données du modèle, où le numéro
+        de ligne, le libellé de la colonne A et la valeur de la colonne B sont
+        remplacés par des champs {row}, {label} et {value_cell}.
+
+        Args:
+            sheet_xml: Contenu XML de la feuille
+
+        Returns:
+            Tuple (début, gabarit, fin)
+        """
+        first_row = cls.HEADER_ROW_COUNT + 1
+        start = sheet_xml.find(f'<row r="{first_row}"')
+        end = sheet_xml.find("</sheetData>")
+        if start < 0 or end < 0:
+            raise ValueError("Template non reconnu : ligne de données absente")
+        row_xml = sheet_xml[start : sheet_xml.index("</row>", start) + len("</row>")]
+
+        pattern = row_xml.replace("{", "{{").replace("}", "}}")
+        pattern = re.sub(rf'r="([A-Z]*){first_row}"', r'r="\1{row}"', pattern)
+        pattern, labels = re.subn(
+            r'(<c r="A\{row\}"[^>]*><is><t[^>]*>)[^<]*(</t>)',
+            r"\1{label}\2",
+            pattern,
+        )
+        pattern, values = re.subn(
+            r'<c r="B\{row\}"[^>]*?(?:/>|>.*?</c>)', "{value_cell}", pattern
+        )
+        if labels != 1 or values != 1:
+            raise ValueError("Template non reconnu : cellules A/B de données absentes")
+        return sheet_xml[:start], pattern, sheet_xml[end:]
+
+    def write(self, excel_data: pd.DataFrame, output_file: str):
+        """
+        Écrit les données préparées dans une copie du modèle
+
+        Args:
+            excel_data: Données renvoyées par ExcelExporter.prepare_excel_data
+                (les lignes d'en-tête du modèle sont conservées telles quelles)
+            output_file: Chemin du fichier de sortie
+        """
+        body = excel_data.iloc[self.HEADER_ROW_COUNT :]
+        first_row = self.HEADER_ROW_COUNT + 1
+        rows = "".join(
+            self.row_pattern.format(
+                row=row,
+                label=escape(str(label)),
+                value_cell=self._value_cell(row, value),
+            )
+            for row, (label, value) in enumerate(
+                zip(body.index, body["Value"]), start=first_row
+            )
+        )
+        last_row = max(first_row + len(body) - 1, self.HEADER_ROW_COUNT)
+        prefix = re.sub(
+            r'(<dimension ref="[A-Z]+\d+:[A-Z]+)\d+"',
+            rf'\g<1>{last_row}"',
+            self.prefix,
+            count=1,
+        )
+        sheet_xml = (prefix + rows + self.suffix).encode("utf-8")
+
+        with zipfile.ZipFile(Path(output_file), "w") as archive:
+            for info, data in self.parts:
+                if info.filename == self.sheet_name:
+                    data = sheet_xml
+                archive.writestr(info, data, compress_type=info.compress_type)
+
+    @staticmethod
+    def _value_cell(row: int, value) -> str:
+        """
+        Construit la cellule numérique de la colonne B (vide si pas de valeur)
+
+        Args:
+            row: Numéro de ligne
+            value: Valeur de la puissance
+
+        Returns:
+            XML de la cellule
+        """
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return f'<c r="B{row}" />'
+        return f'<c r="B{row}" t="n"><v>{float(value)!r}</v></c>'
@@ -0,0 +1,306 @@
+"""
+Module de lecture des classeurs hebdomadaires ENEDIS (<mois>.<semaine>.<année>.xlsx)
+"""
+
+import difflib
+import itertools
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+import pandas as pd
+from openpyxl import load_workbook
+from solarcalculet.data_reader import DataReader
+
+
+class WeeklyFile(NamedTuple):
+    """Classeur hebdomadaire identifié par son nom"""
+
+    path: str
+    year: int
+    month: int
+    week: int
+    start: pd.Timestamp
+    end: pd.Timestamp
+
+
+class WorkbookReader:
+    """
+    Classe pour lire un répertoire de classeurs hebdomadaires ENEDIS
+    (export « Consommation Horaire » de l'espace client) et les fusionner en
+    une seule série, au même format que DataReader.load
+    """
+
+    MONTHS = (
+        "janvier",
+        "fevrier",
+        "mars",
+        "avril",
+        "mai",
+        "juin",
+        "juillet",
+        "aout",
+        "septembre",
+        "octobre",
+        "novembre",
+        "decembre",
+    )
+    # Abréviations rencontrées dans les noms de fichiers
+    MONTH_ABBREVIATIONS = {
+        "janv": 1,
+        "fev": 2,
+        "fevr": 2,
+        "mar": 3,
+        "avr": 4,
+        "juil": 7,
+        "sept": 9,
+        "oct": 10,
+        "nov": 11,
+        "dec": 12,
+    }
+    FILE_PATTERN = re.compile(
+        r"^(?P<month>.+?)\.(?P<week>\d{1,2})\.(?P<year>\d{4})\.xlsx$", re.IGNORECASE
+    )
+    DATE_FORMAT = "%d/%m/%Y %H:%M:%S"
+    HEADER = ("Début", "Fin")
+    # L'en-tête suit quelques lignes de métadonnées : au-delà, la feuille (page
+    # d'accueil, export quotidien) n'est pas parcourue davantage
+    HEADER_MAX_ROW = 50
+    COLUMNS = ["Identifiant PRM", "Horodate", "Valeur", "Pas", "Source"]
+
+    def __init__(self, directory: str, workers: int = None, low_memory: bool = False):
+        """
+        Initialise le lecteur
+
+        Args:
+            directory: Répertoire des classeurs
+            workers: Nombre de processus de lecture (nombre de cœurs par
+                défaut, 1 pour une lecture dans le processus courant)
+            low_memory: Valeur en float32 (comme DataReader en basse mémoire)
+        """
+        self.directory = Path(directory)
+        self.workers = workers
+        self.low_memory = low_memory
+        self.skipped = []
+
+    @classmethod
+    def month_number(cls, name: str) -> int:
+        """
+        Reconnaît un nom de mois français, abrégé, sans accent ou mal
+        orthographié (ex. "juiellet", "mar", "mai\\x03")
+
+        Args:
+            name: Nom du mois tel qu'il figure dans le nom de fichier
+
+        Returns:
+            Numéro du mois (1 à 12), ou None s'il n'est pas reconnu
+        """
+        ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore")
+        key = re.sub(r"[^a-z]", "", ascii_name.decode("ascii").lower())
+        if key in cls.MONTHS:
+            return cls.MONTHS.index(key) + 1
+        if key in cls.MONTH_ABBREVIATIONS:
+            return cls.MONTH_ABBREVIATIONS[key]
+        matches = difflib.get_close_matches(key, cls.MONTHS, n=1, cutoff=0.75)
+        return cls.MONTHS.index(matches[0]) + 1 if matches else None
+
+    @staticmethod
+    def week_period(year: int, month: int, week: int) -> tuple:
+        """
+        Période couverte par la semaine d'un mois : les semaines vont du lundi
+        au dimanche, la première commence le 1er du mois et la dernière
+        s'arrête à la fin du mois
+
+        Args:
+            year: Année
+            month: Mois
+            week: Numéro de la semaine dans le mois (à partir de 1)
+
+        Returns:
+            Tuple (début inclus, fin exclue)
+        """
+        first_day = pd.Timestamp(year, month, 1)
+        month_end = first_day + pd.offsets.MonthBegin(1)
+        first_monday = first_day - pd.Timedelta(days=first_day.weekday())
+        start = max(first_day, first_monday + pd.Timedelta(weeks=week - 1))
+        end = min(month_end, first_monday + pd.Timedelta(weeks=week))
+        return start, max(start, end)
+
+    def discover(self, start=None, end=None) -> list:
+        """
+        Recense les classeurs du répertoire d'après leur nom, sans les ouvrir
+
+        Args:
+            start: Date de début incluse de la période voulue (toutes si None)
+            end: Date de fin exclue de la période voulue (toutes si None)
+
+        Returns:
+            Liste des classeurs triée par période (les fichiers dont le nom
+            n'est pas reconnu sont ajoutés à self.skipped)
+        """
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+        files = []
+        for path in sorted(self.directory.glob("*.xlsx")):
+            match = self.FILE_PATTERN.match(path.name)
+            month = match and self.month_number(match["month"])
+            if not month:
+                self.skipped.append((str(path), "Nom de fichier non reconnu"))
+                continue
+            year, week = int(match["year"]), int(match["week"])
+            period_start, period_end = self.week_period(year, month, week)
+            if (start is not None and period_end <= start) or (
+                end is not None and period_start >= end
+            ):
+                continue
+            files.append(
+                WeeklyFile(str(path), year, month, week, period_start, period_end)
+            )
+        return sorted(files, key=lambda weekly: (weekly.start, weekly.path))
+
+    def load(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Lit les classeurs en parallèle et fusionne leurs mesures
+
+        Les lignes présentes dans plusieurs classeurs (semaines qui se
+        chevauchent) ne sont gardées qu'une fois ; les horodates répétées au
+        sein d'un même classeur (heure d'hiver) sont conservées.
+
+        Args:
+            start: Date de début incluse de la période voulue (toutes si None)
+            end: Date de fin exclue de la période voulue (toutes si None)
+
+        Returns:
+            DataFrame trié Identifiant PRM, Horodate (fin de l'intervalle,
+            comme les CSV ENEDIS), Valeur (kW), Pas, Source
+        """
+        files = self.discover(start, end)
+        paths = [weekly.path for weekly in files]
+        workers = self.workers or os.cpu_count() or 1
+        if workers == 1 or len(paths) <= 1:
+            results = [read_workbook(path) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                results = list(executor.map(read_workbook, paths))
+
+        frames = []
+        for rank, (path, (df, reason)) in enumerate(zip(paths, results)):
+            if df is None:
+                self.skipped.append((path, reason))
+            elif not df.empty:
+                frames.append(df.assign(rank=rank))
+        if not frames:
+            return pd.DataFrame({col: pd.Series(dtype=object) for col in self.COLUMNS})
+
+        df = pd.concat(frames, ignore_index=True)
+        # Chaque horodate est prise dans le premier classeur qui la contient
+        first_rank = df.groupby("Horodate")["rank"].transform("min")
+        df = df[df["rank"] == first_rank]
+        df = df.sort_values("Horodate", kind="mergesort", ignore_index=True)
+        if start is not None:
+            df = df[df["Horodate"] > pd.Timestamp(start)]
+        if end is not None:
+            df = df[df["Horodate"] <= pd.Timestamp(end)]
+        df["Source"] = "original"
+        dtypes = dict(DataReader.PIPELINE_DTYPES)
+        if self.low_memory:
+            dtypes.update(DataReader.LOW_MEMORY_DTYPES)
+        return df[self.COLUMNS].astype(dtypes).reset_index(drop=True)
+
+
+def read_workbook(path: str) -> tuple:
+    """
+    Lit la courbe de charge d'un classeur en mode lecture seule (en continu)
+
+    Args:
+        path: Chemin du classeur
+
+    Returns:
+        Tuple (DataFrame Identifiant PRM, Horodate, Valeur, Pas, ou None si
+        le classeur ne contient pas de courbe horaire ; motif du rejet)
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            prm, columns = _find_header(rows)
+            if columns is None:
+                continue
+            start_col, end_col, value_col = columns
+            starts, ends, values = [], [], []
+            for row in rows:
+                if len(row) <= value_col or row[start_col] is None:
+                    break
+                starts.append(row[start_col])
+                ends.append(row[end_col])
+                values.append(row[value_col])
+            return _build_frame(prm, starts, ends, values), None
+    finally:
+        workbook.close()
+    return None, "Pas de courbe de charge horaire (Début/Fin)"
+
+
+def _find_header(rows) -> tuple:
+    """
+    Avance jusqu'à la ligne d'en-tête Début/Fin/Valeur d'une feuille
+
+    Args:
+        rows: Itérateur des lignes (consommé jusqu'à l'en-tête)
+
+    Returns:
+        Tuple (PRM, (colonnes début, fin, valeur)), colonnes à None si la
+        feuille n'a pas d'en-tête de courbe de charge
+    """
+    prm = None
+    for row in itertools.islice(rows, WorkbookReader.HEADER_MAX_ROW):
+        cells = [cell.strip() if isinstance(cell, str) else cell for cell in row]
+        for index, cell in enumerate(cells[:-1]):
+            if isinstance(cell, str) and cell.startswith("Point Référence Mesure"):
+                prm = cells[index + 1]
+        if WorkbookReader.HEADER[0] in cells and WorkbookReader.HEADER[1] in cells:
+            start_col = cells.index(WorkbookReader.HEADER[0])
+            end_col = cells.index(WorkbookReader.HEADER[1])
+            value_col = next(
+                index
+                for index, cell in enumerate(cells)
+                if isinstance(cell, str) and cell.startswith("Valeur")
+            )
+            return prm, (start_col, end_col, value_col)
+    return prm, None
+
+
+def _build_frame(prm: str, starts: list, ends: list, values: list) -> pd.DataFrame:
+    """
+    Convertit les colonnes lues (textes au format français) en mesures
+
+    Args:
+        prm: Identifiant du compteur
+        starts: Débuts des intervalles
+        ends: Fins des intervalles
+        values: Valeurs en kW (virgule décimale)
+
+    Returns:
+        DataFrame Identifiant PRM, Horodate (fin d'intervalle), Valeur, Pas
+    """
+    start = pd.to_datetime(
+        pd.Series(starts, dtype=object), format=WorkbookReader.DATE_FORMAT
+    )
+    end = pd.to_datetime(
+        pd.Series(ends, dtype=object), format=WorkbookReader.DATE_FORMAT
+    )
+    valeur = pd.to_numeric(
+        pd.Series(values, dtype=object).astype(str).str.replace(",", ".", regex=False),
+        errors="coerce",
+    )
+    # Pas ISO 8601 de chaque mesure (PT30M...), comme la colonne Pas des CSV
+    minutes = ((end - start) // pd.Timedelta(minutes=1)).astype("int64")
+    return pd.DataFrame(
+        {
+            "Identifiant PRM": prm,
+            "Horodate": end,
+            "Valeur": valeur,
+            "Pas": "PT" + minutes.astype(str) + "M",
+        }
+    )
@@ -0,0 +1,134 @@
+"""
+Module de partitionnement par année des données ENEDIS lues par blocs
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+import pandas as pd
+
+
+class YearPartitions:  # pylint: disable=too-many-instance-attributes
+    """Classe pour répartir des blocs de lignes en partitions annuelles, en mémoire ou sur disque"""
+
+    HORODATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(
+        self, spill_dir: str = None, max_memory: int = None, dtypes: dict = None
+    ):
+        """
+        Initialise les partitions
+
+        Args:
+            spill_dir: Répertoire où écrire les partitions (toujours sur disque
+                si renseigné)
+            max_memory: Taille maximale en octets des partitions gardées en
+                mémoire avant déversement sur disque (illimitée si None)
+            dtypes: Types des colonnes relues depuis le disque, ceux des
+                blocs ajoutés (voir DataReader.pipeline_dtypes)
+        """
+        self.max_memory = max_memory
+        self.dtypes = dtypes
+        self._owns_dir = spill_dir is None
+        self.spill_dir = None if spill_dir is None else Path(spill_dir)
+        self._always_spill = spill_dir is not None
+        self._buffers = {}
+        self._spilled = set()
+        self._memory = 0
+
+    def add(self, chunk: pd.DataFrame):
+        """
+        Répartit un bloc de lignes dans les partitions de leurs années
+
+        Args:
+            chunk: DataFrame contenant une colonne Horodate au format datetime
+        """
+        chunk = chunk.dropna(subset=["Horodate"])
+        for year, rows in chunk.groupby(chunk["Horodate"].dt.year, sort=False):
+            self._buffers.setdefault(int(year), []).append(rows)
+            self._memory += int(rows.memory_usage(index=False, deep=True).sum())
+
+        if self._always_spill or (
+            self.max_memory is not None and self._memory > self.max_memory
+        ):
+            self.flush()
+
+    def flush(self):
+        """Écrit sur disque toutes les partitions gardées en mémoire"""
+        if not self._buffers:
+            return
+        if self.spill_dir is None:
+            self.spill_dir = Path(tempfile.mkdtemp(prefix="solarcalculet-"))
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        for year, frames in self._buffers.items():
+            pd.concat(frames, ignore_index=True).to_csv(
+                self._spill_path(year),
+                sep=";",
+                mode="a",
+                header=year not in self._spilled,
+                index=False,
+                date_format=self.HORODATE_FORMAT,
+            )
+            self._spilled.add(year)
+        self._buffers = {}
+        self._memory = 0
+
+    def years(self) -> list:
+        """
+        Liste les années présentes
+
+        Returns:
+            Liste triée des années (int)
+        """
+        return sorted(set(self._buffers) | self._spilled)
+
+    def get(self, year: int) -> pd.DataFrame:
+        """
+        Reconstitue la partition d'une année, triée par Horodate
+
+        Args:
+            year: Année à extraire
+
+        Returns:
+            DataFrame de l'année (vide si absente)
+        """
+        year = int(year)
+        frames = []
+        if year in self._spilled:
+            spilled = pd.read_csv(self._spill_path(year), sep=";", dtype=self.dtypes)
+            spilled["Horodate"] = pd.to_datetime(
+                spilled["Horodate"], format=self.HORODATE_FORMAT
+            )
+            frames.append(spilled)
+        frames.extend(self._buffers.get(year, []))
+        if not frames:
+            return pd.DataFrame(columns=["Horodate", "Valeur"])
+
+        df = pd.concat(frames, ignore_index=True)
+        return df.sort_values("Horodate", kind="mergesort").reset_index(drop=True)
+
+    def close(self):
+        """Supprime les fichiers de déversement créés par les partitions"""
+        if self.spill_dir is not None:
+            if self._owns_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+            else:
+                for year in self._spilled:
+                    self._spill_path(year).unlink(missing_ok=True)
+        self._buffers = {}
+        self._spilled = set()
+        self._memory = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        for year in self.years():
+            yield year, self.get(year)
+
+    def _spill_path(self, year: int) -> Path:
+        return self.spill_dir / f"{year}.csv"
@@ -0,0 +1,186 @@
+"""
+Tests du traitement par lot reprenable
+"""  # pylint: disable=redefined-outer-name
+
+import fcntl
+import json
+import pandas as pd
+import pytest
+from solarcalculet.batch import (
+    LOCK_FILE,
+    BatchJournal,
+    batch_lock,
+    collect_inputs,
+    file_signature,
+    run_batch,
+)
+from solarcalculet.pipeline import ProcessingOptions
+
+
+def _write_csv(path, prm: str, skip_hour: int = None):
+    rows = [
+        f"{prm};{timestamp:%Y-%m-%d %H:%M:%S};{500 + timestamp.hour};PT60M"
+        for timestamp in pd.date_range("2023-12-30", "2024-01-02 23:00", freq="h")
+        if timestamp.hour != skip_hour
+    ]
+    path.write_text("Identifiant PRM;Horodate;Valeur;Pas\n" + "\n".join(rows) + "\n")
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """Répertoire de deux extractions couvrant 2023 et 2024"""
+    directory = tmp_path / "input"
+    directory.mkdir()
+    _write_csv(directory / "meter_a.csv", "1", skip_hour=3)
+    _write_csv(directory / "meter_b.csv", "2")
+    return directory
+
+
+def _events(journal_file) -> list:
+    return [json.loads(line) for line in journal_file.read_text().splitlines()]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_then_resume(input_dir, tmp_path, workers):
+    """Vérifie le traitement du lot puis la reprise sans retraitement"""
+    output_dir = tmp_path / f"output_{workers}"
+
+    summary = run_batch(str(input_dir), str(output_dir), workers=workers)
+
+    assert (summary["files"], summary["processed"], summary["failed"]) == (2, 2, 0)
+    assert (output_dir / "meter_a" / "2023.xlsx").exists()
+    assert (output_dir / "meter_b" / "2024.xlsx").exists()
+    assert not list(output_dir.glob("*/.*.tmp.xlsx"))
+    journal_file = output_dir / BatchJournal.FILE_NAME
+    assert len(_events(journal_file)) == 6
+
+    again = run_batch(str(input_dir), str(output_dir), workers=workers)
+
+    assert (again["processed"], again["resumed"]) == (0, 2)
+    assert len(_events(journal_file)) == 6
+
+
+def test_resume_after_crash_skips_done_years(input_dir, tmp_path):
+    """Vérifie la reprise d'un fichier interrompu à partir des années consignées"""
+    output_dir = tmp_path / "output"
+    csv_file = str(input_dir / "meter_a.csv")
+    output_2023 = output_dir / "meter_a" / "2023.xlsx"
+    journal = BatchJournal(output_dir / BatchJournal.FILE_NAME)
+    journal.record(
+        file=csv_file,
+        signature=file_signature(csv_file),
+        year="2023",
+        status="ok",
+        output=str(output_2023),
+    )
+    # Arrêt brutal pendant l'écriture d'un événement et d'un export
+    with open(journal.path, "a", encoding="utf-8") as handle:
+        handle.write('{"file": "interrompu')
+    (output_dir / "meter_a").mkdir()
+    output_2023.write_bytes(b"PK")
+    (output_dir / "meter_a" / ".2024.1234.tmp.xlsx").write_bytes(b"PK")
+
+    summary = run_batch(csv_file, str(output_dir), workers=1)
+
+    result = summary["results"][0]
+    assert result["years"] == {"2023": "done", "2024": "ok"}
+    assert output_2023.read_bytes() == b"PK"
+    assert (output_dir / "meter_a" / "2024.xlsx").exists()
+    assert not (output_dir / "meter_a" / ".2024.1234.tmp.xlsx").exists()
+
+
+def test_missing_output_is_regenerated(input_dir, tmp_path):
+    """Vérifie qu'une année consignée dont le fichier a disparu est recalculée"""
+    output_dir = tmp_path / "output"
+    run_batch(str(input_dir), str(output_dir), workers=1)
+    (output_dir / "meter_a" / "2023.xlsx").unlink()
+
+    summary = run_batch(str(input_dir), str(output_dir), workers=1)
+
+    assert (summary["processed"], summary["resumed"]) == (1, 1)
+    assert summary["results"][0]["years"] == {"2023": "ok", "2024": "done"}
+    assert (output_dir / "meter_a" / "2023.xlsx").exists()
+
+
+def test_invalid_year_is_not_done(tmp_path):
+    """Vérifie qu'une année invalide est recalculée à la reprise"""
+    states = {
+        ("a.csv", "1"): {
+            "status": "done",
+            "years": {
+                "2023": {"status": "invalid", "output": None},
+                "2024": {"status": "skipped", "output": None},
+                "2025": {"status": "ok", "output": str(tmp_path / "absent.xlsx")},
+            },
+        }
+    }
+    assert BatchJournal.done_years(states, "a.csv", "1") == {"2024"}
+
+
+def test_failed_file_is_retried(input_dir, tmp_path):
+    """Vérifie qu'un fichier en échec est consigné puis retraité une fois corrigé"""
+    output_dir = tmp_path / "output"
+    broken = input_dir / "meter_c.csv"
+    broken.write_text("Horodate;Puissance\n2024-01-01 00:00:00;5\n")
+
+    summary = run_batch(str(input_dir / "*.csv"), str(output_dir), workers=1)
+
+    assert (summary["processed"], summary["failed"]) == (2, 1)
+    failed = summary["results"][2]
+    assert failed["error"] == "ValueError: Colonnes manquantes : Valeur"
+
+    _write_csv(broken, "3")
+    again = run_batch(str(input_dir), str(output_dir), workers=1)
+    assert (again["processed"], again["resumed"], again["failed"]) == (1, 2, 0)
+
+
+def test_options_change_is_reprocessed(input_dir, tmp_path):
+    """Vérifie qu'un lot relancé avec d'autres options n'est pas repris"""
+    output_dir = tmp_path / "output"
+    run_batch(str(input_dir), str(output_dir), workers=1)
+
+    summary = run_batch(
+        str(input_dir),
+        str(output_dir),
+        workers=1,
+        options=ProcessingOptions(engine="streaming"),
+    )
+
+    assert (summary["processed"], summary["resumed"]) == (2, 0)
+
+
+def test_duplicate_names_are_rejected(input_dir, tmp_path):
+    """Vérifie que deux fichiers de même nom ne partagent pas leur sortie"""
+    other_dir = input_dir / "other"
+    other_dir.mkdir()
+    _write_csv(other_dir / "meter_a.csv", "3")
+
+    summary = run_batch(
+        str(input_dir / "**" / "*.csv"), str(tmp_path / "output"), workers=1
+    )
+
+    failed = [result for result in summary["results"] if result["status"] == "failed"]
+    assert [result["file"] for result in failed] == [
+        str(input_dir / "meter_a.csv"),
+        str(other_dir / "meter_a.csv"),
+    ]
+    assert "meter_a.csv" in failed[0]["error"]
+    assert summary["processed"] == 1
+
+
+def test_batch_lock(tmp_path):
+    """Vérifie que le répertoire de sortie est verrouillé pendant le lot"""
+    with batch_lock(str(tmp_path)):
+        with open(tmp_path / LOCK_FILE, "a", encoding="utf-8") as handle:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    with open(tmp_path / LOCK_FILE, "a", encoding="utf-8") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def test_collect_inputs(input_dir):
+    """Vérifie la sélection des fichiers par répertoire, motif ou chemin"""
+    expected = [str(input_dir / "meter_a.csv"), str(input_dir / "meter_b.csv")]
+    assert collect_inputs(str(input_dir)) == expected
+    assert collect_inputs(str(input_dir / "meter_*.csv")) == expected
+    assert collect_inputs(expected[1]) == expected[1:]
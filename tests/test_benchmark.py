@@ -0,0 +1,91 @@
+"""
+Tests pour le module de mesure des performances
+"""
+
+import pandas as pd
+import pytest
+from solarcalculet.benchmark import (
+    compare_to_baseline,
+    generate_enedis_csv,
+    run_benchmark,
+)
+from solarcalculet.constants import ENEDIS_COLUMNS
+
+
+def test_generate_enedis_csv(tmp_path):
+    """Teste la génération d'un fichier ENEDIS synthétique"""
+    csv_file = tmp_path / "synthetic.csv"
+    rows = generate_enedis_csv(
+        csv_file, resolution="PT30M", prms=2, gap_rate=0.05, gap_hours=(2, 6)
+    )
+    df = pd.read_csv(csv_file, sep=";")
+
+    assert tuple(df.columns) == ENEDIS_COLUMNS
+    assert len(df) == rows
+    assert df["Identifiant PRM"].nunique() == 2
+    assert set(df["Pas"]) == {"PT30M"}
+    assert (df["Valeur"] >= 0).all()
+    # Environ 5 % des mesures manquent, par trous de 2 à 6 heures
+    expected = 2 * 365 * 48
+    assert 0.9 * expected < rows < 0.99 * expected
+
+
+def test_generate_enedis_csv_invalid_resolution(tmp_path):
+    """Vérifie le rejet d'une résolution inconnue"""
+    with pytest.raises(ValueError):
+        generate_enedis_csv(tmp_path / "synthetic.csv", resolution="PT15M")
+
+
+def test_run_benchmark(tmp_path):
+    """Teste la mesure de toutes les étapes sur un petit fichier"""
+    csv_file = tmp_path / "synthetic.csv"
+    generate_enedis_csv(csv_file, resolution="PT60M", gap_rate=0)
+    lines = csv_file.read_text(encoding="utf-8").splitlines()
+    csv_file.write_text("\n".join(lines[:49]), encoding="utf-8")
+
+    stages = run_benchmark(str(csv_file), str(tmp_path / "work"))
+
+    assert list(stages) == [
+        "read",
+        "convert_resample",
+        "detect_missing_hours",
+        "fill_missing_data",
+        "prepare_excel_data",
+        "export_to_excel",
+        "validate_export_format",
+        "end_to_end",
+    ]
+    assert stages["read"]["rows"] == 48
+    assert all(
+        stage["seconds"] > 0 and stage["peak_bytes"] > 0 for stage in stages.values()
+    )
+
+
+def test_run_benchmark_fleet(tmp_path):
+    """Vérifie que les compteurs sont ré-échantillonnés et traités séparément"""
+    csv_file = tmp_path / "synthetic.csv"
+    generate_enedis_csv(csv_file, resolution="PT60M", prms=2, gap_rate=0)
+    lines = csv_file.read_text(encoding="utf-8").splitlines()
+    # 48 heures de chacun des deux compteurs (8760 lignes par compteur)
+    csv_file.write_text("\n".join(lines[:49] + lines[8761:8809]), encoding="utf-8")
+
+    stages = run_benchmark(str(csv_file), str(tmp_path / "work"))
+
+    assert stages["convert_resample"]["rows"] == 96
+    end_to_end = tmp_path / "work" / "timing" / "end_to_end"
+    assert sorted(path.name for path in end_to_end.iterdir()) == [
+        "19125759625988",
+        "19125759625989",
+    ]
+    assert not (end_to_end / "2023.xlsx").exists()
+
+
+def test_compare_to_baseline():
+    """Teste la détection des régressions par rapport à la référence"""
+    baseline = {"read": {"seconds": 1.0}, "export_to_excel": {"seconds": 0.01}}
+    stages = {"read": {"seconds": 1.5}, "export_to_excel": {"seconds": 0.03}}
+
+    regressions = compare_to_baseline(stages, baseline)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("read")
+    assert not compare_to_baseline(stages, baseline, tolerance=0.6)
@@ -0,0 +1,176 @@
+"""
+Tests de l'interface en ligne de commande python -m solarcalculet
+"""  # pylint: disable=redefined-outer-name
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+from solarcalculet.cli import main
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """Crée un fichier CSV ENEDIS de deux jours"""
+    rows = [
+        f"1;{timestamp:%Y-%m-%d %H:%M:%S};{500 + hour};PT60M"
+        for hour, timestamp in enumerate(
+            pd.date_range("2024-01-01 01:00", periods=48, freq="h")
+        )
+    ]
+    path = tmp_path / "input.csv"
+    path.write_text("Identifiant PRM;Horodate;Valeur;Pas\n" + "\n".join(rows) + "\n")
+    return path
+
+
+def test_light_commands_do_not_import_pandas(csv_file):
+    """Vérifie que l'aide et la validation CSV démarrent sans pandas"""
+    script = (
+        "import sys\n"
+        "from solarcalculet.cli import main\n"
+        f"assert main(['validate', {str(csv_file)!r}]) == 0\n"
+        "for argv in (['--help'], ['process', '--help']):\n"
+        "    try:\n"
+        "        main(argv)\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "heavy = {'pandas', 'numpy', 'openpyxl'} & set(sys.modules)\n"
+        "assert not heavy, heavy\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env={"PYTHONPATH": str(SRC_DIR)},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_validate_csv(csv_file, tmp_path, capsys):
+    """Vérifie la validation d'un CSV valide puis invalide"""
+    assert main(["validate", str(csv_file), "--json"]) == 0
+    summary = json.loads(capsys.readouterr().out)[0]
+    assert summary["rows"] == 48
+    assert summary["end"] == "2024-01-03 00:00:00"
+
+    invalid = tmp_path / "invalid.csv"
+    invalid.write_text("Horodate\n2024-01-01 00:00:00\n")
+    assert main(["validate", str(invalid)]) == 1
+    assert "Colonnes manquantes : Valeur" in capsys.readouterr().out
+
+
+def test_validate_then_process(csv_file, tmp_path):
+    """Vérifie la poursuite par le traitement après une validation réussie"""
+    output_dir = tmp_path / "output"
+
+    assert main(["validate", str(csv_file), "--process", str(output_dir)]) == 0
+    assert (output_dir / "2024.xlsx").exists()
+
+    invalid = tmp_path / "invalid.csv"
+    invalid.write_text("Horodate;Valeur\n2024-01-01 00:00:00;-1\n")
+    assert main(["validate", str(invalid), "--process", str(tmp_path / "none")]) == 1
+    assert not (tmp_path / "none").exists()
+
+
+def test_process_legacy_form_and_validate_xlsx(csv_file, tmp_path, capsys):
+    """Vérifie la forme historique (sans commande) puis la validation Excel"""
+    output_dir = tmp_path / "output"
+
+    assert main([str(csv_file), str(output_dir), "--no-cache"]) == 0
+    assert main(["validate", str(output_dir / "2024.xlsx")]) == 0
+    assert f"✅ {output_dir / '2024.xlsx'}" in capsys.readouterr().out
+
+
+def test_cache_clear(tmp_path, capsys):
+    """Vérifie la commande de vidage du cache"""
+    assert main(["cache", "clear", "--cache-dir", str(tmp_path)]) == 0
+    assert "Cache vidé (0 entrées supprimées)" in capsys.readouterr().out
+
+
+def test_process_interpolate_and_gap_report(tmp_path):
+    """Vérifie l'interpolation des trous courts et le rapport des trous"""
+    lines = [
+        f"1;{timestamp:%Y-%m-%d %H:%M:%S};{500 + hour};PT60M"
+        for hour, timestamp in enumerate(
+            pd.date_range("2024-01-01 01:00", periods=48, freq="h")
+        )
+        if hour not in (10, 11)
+    ]
+    csv_file = tmp_path / "holes.csv"
+    csv_file.write_text("Identifiant PRM;Horodate;Valeur;Pas\n" + "\n".join(lines))
+    report_file = tmp_path / "gaps.csv"
+
+    args = [str(csv_file), str(tmp_path / "output"), "--no-cache", "--interpolate"]
+    assert main(args + ["2", "--gap-report", str(report_file)]) == 0
+
+    report = pd.read_csv(report_file, sep=";")
+    assert report[["year", "hours", "fill"]].values.tolist() == [
+        [2024, 2, "interpolation"]
+    ]
+    data = pd.read_excel(tmp_path / "output" / "2024.xlsx", header=None, skiprows=4)
+    assert data.iloc[10:12, 1].tolist() == [0.51, 0.511]
+
+
+@pytest.mark.parametrize(
+    "mode, output", [("--fleet", "1/2024.xlsx"), ("--incremental", "2024.xlsx")]
+)
+def test_interpolate_in_fleet_and_incremental(tmp_path, mode, output):
+    """Vérifie la prise en compte de --interpolate en modes parc et incrémental"""
+    lines = [
+        f"1;{timestamp:%Y-%m-%d %H:%M:%S};{500 + hour};PT60M"
+        for hour, timestamp in enumerate(
+            pd.date_range("2024-01-01 01:00", periods=48, freq="h")
+        )
+        if hour not in (10, 11)
+    ]
+    csv_file = tmp_path / "holes.csv"
+    csv_file.write_text("Identifiant PRM;Horodate;Valeur;Pas\n" + "\n".join(lines))
+    args = [str(csv_file), str(tmp_path / "output"), "--no-cache", mode]
+    report_file = tmp_path / "gaps.csv"
+    for option in (["--chunksize", "10"], ["--report", str(tmp_path / "report")]):
+        with pytest.raises(SystemExit):
+            main(args + option)
+
+    if mode == "--fleet":
+        with pytest.raises(SystemExit):
+            main(args + ["--gap-report", str(report_file)])
+        assert main(args + ["--interpolate", "2"]) == 0
+    else:
+        with pytest.raises(SystemExit):
+            main(args + ["--workers", "2"])
+        assert (
+            main(args + ["--interpolate", "2", "--gap-report", str(report_file)]) == 0
+        )
+        report = pd.read_csv(report_file, sep=";")
+        assert report["fill"].tolist() == ["interpolation"]
+    data = pd.read_excel(tmp_path / "output" / output, header=None, skiprows=4)
+    assert data.iloc[10:12, 1].tolist() == [0.51, 0.511]
+
+
+def test_process_template_default(csv_file, tmp_path, monkeypatch):
+    """Vérifie le classeur modèle par défaut hors du dépôt et le refus d'un
+    modèle introuvable"""
+    monkeypatch.chdir(tmp_path)
+    args = [str(csv_file), "output", "--no-cache", "--engine", "template"]
+
+    assert main(args) == 0
+    assert (tmp_path / "output" / "2024.xlsx").exists()
+    with pytest.raises(SystemExit):
+        main(args + ["--template", "absent.xlsx"])
+
+
+def test_process_timestamp_conventions(csv_file, tmp_path):
+    """Vérifie l'option --timestamp-at et le refus d'une énergie à exporter"""
+    output_dir = tmp_path / "start"
+    args = [str(csv_file), str(output_dir), "--no-cache", "--timestamp-at", "start"]
+
+    assert main(args) == 0
+    data = pd.read_excel(output_dir / "2024.xlsx", header=None, skiprows=4)
+    assert data.iloc[0, 1] == 0.5
+    with pytest.raises(SystemExit):
+        main([str(csv_file), str(tmp_path / "energy"), "--aggregation", "energy"])
@@ -0,0 +1,145 @@
+"""
+Tests de la validation rapide des fichiers CSV ENEDIS
+"""
+
+import pandas as pd
+from solarcalculet.csv_validator import validate_csv
+from solarcalculet.data_cleaner import DataCleaner
+from solarcalculet.data_reader import DataReader
+from solarcalculet.resampler import Resampler
+
+HEADER = "Identifiant PRM;Horodate;Valeur;Pas\n"
+
+
+def test_valid_file_summary(tmp_path):
+    """Vérifie le résumé d'un fichier valide"""
+    csv_file = tmp_path / "valide.csv"
+    csv_file.write_text(
+        HEADER
+        + "1;2024-01-01 00:00:00;500;PT60M\n"
+        + "1;2024-01-01 01:00:00;600;PT60M\n",
+        encoding="utf-8-sig",
+    )
+
+    summary = validate_csv(csv_file)
+
+    assert summary["errors"] == []
+    assert summary["rows"] == 2
+    assert summary["columns"] == ["Identifiant PRM", "Horodate", "Valeur", "Pas"]
+    assert (summary["start"], summary["end"]) == (
+        "2024-01-01 00:00:00",
+        "2024-01-01 01:00:00",
+    )
+
+
+def test_structure_errors(tmp_path):
+    """Vérifie les erreurs de colonnes, de champs et de valeurs vides"""
+    missing = tmp_path / "colonnes.csv"
+    missing.write_text("Horodate;Puissance\n2024-01-01 00:00:00;5\n")
+    assert validate_csv(missing)["errors"] == ["Colonnes manquantes : Valeur"]
+
+    broken = tmp_path / "lignes.csv"
+    broken.write_text(
+        HEADER
+        + "1;2024-01-01 00:00:00;500\n"
+        + "1;2024-01-01 01:00:00;;PT60M\n"
+        + "1;2024-01-01 02:00:00;;PT60M\n"
+    )
+    assert validate_csv(broken)["errors"] == [
+        "Nombre de champs incorrect ligne 2 (1 occurrences)",
+        "Horodate ou valeur vide ligne 3 (2 occurrences)",
+    ]
+
+    empty = tmp_path / "vide.csv"
+    empty.write_text("")
+    assert validate_csv(empty)["errors"] == ["Fichier vide"]
+    assert validate_csv(tmp_path / "absent.csv")["errors"][0].startswith(
+        "Erreur de lecture"
+    )
+
+
+def test_order_values_and_duplicates(tmp_path):
+    """Vérifie les horodates illisibles ou non croissantes et les valeurs"""
+    csv_file = tmp_path / "ordre.csv"
+    csv_file.write_text(
+        HEADER
+        + "1;2024-01-01 00:00:00;500;PT60M\n"
+        + "1;2024-01-01 01:00:00;-5;PT60M\n"
+        + "1;2024-01-01 01:00:00;12.5;PT60M\n"
+        + "1;2024-01-01 00:00:00;500;PT60M\n"
+        + "1;01/01/2024 03:00;500;PT60M\n"
+        + "1;2024-01-01 02:00:00;500;PT60M\n"
+    )
+
+    summary = validate_csv(csv_file)
+
+    assert summary["errors"] == [
+        "Horodate illisible ligne 6 (1 occurrences)",
+        "Horodates non croissantes ligne 5 (1 occurrences)",
+        "Valeur non entière ou négative ligne 3 (2 occurrences)",
+    ]
+    assert summary["warnings"] == ["Horodate en double ligne 4 (1 occurrences)"]
+    assert summary["duplicates"] == 1
+
+
+def test_missing_hours_and_gap_runs(tmp_path):
+    """Vérifie les heures manquantes par année, les trous et l'heure d'hiver"""
+    horodates = [
+        "2023-10-29 01:30:00",
+        "2023-10-29 02:00:00",
+        "2023-10-29 02:30:00",
+        # Heure répétée au passage à l'heure d'hiver
+        "2023-10-29 02:00:00",
+        "2023-10-29 02:30:00",
+        "2023-10-29 03:00:00",
+        "2023-10-29 06:00:00",
+        "2023-12-31 23:00:00",
+        "2024-01-01 00:00:00",
+        "2024-01-01 01:00:00",
+        "2024-01-01 05:00:00",
+    ]
+    csv_file = tmp_path / "trous.csv"
+    csv_file.write_text(
+        HEADER + "".join(f"1;{horodate};500;PT30M\n" for horodate in horodates)
+    )
+
+    summary = validate_csv(csv_file)
+
+    assert summary["errors"] == []
+    assert summary["duplicates"] == 0
+    # Horodates de fin d'intervalle : 2024-01-01 00:00 compte pour 2023
+    assert summary["years"] == {
+        "2023": {"hours": 5, "missing": 1530, "gap_runs": 2},
+        "2024": {"hours": 2, "missing": 3, "gap_runs": 1},
+    }
+    assert summary["gap_runs"] == 3
+    assert summary["gaps"] == [
+        ("2023-10-29 03:00:00", 2),
+        ("2023-10-29 06:00:00", 1528),
+        ("2024-01-01 01:00:00", 3),
+    ]
+    assert summary["warnings"] == ["1533 heures manquantes en 3 trous"]
+
+
+def test_missing_hours_match_cleaner(tmp_path):
+    """Vérifie que les heures manquantes sont celles détectées par DataCleaner"""
+    horodates = [
+        horodate
+        for horodate in pd.date_range(
+            "2024-01-02 00:30", "2024-01-02 12:00", freq="30min"
+        )
+        if not pd.Timestamp("2024-01-02 05:00")
+        <= horodate
+        <= pd.Timestamp("2024-01-02 07:30")
+    ]
+    csv_file = tmp_path / "demi_heures.csv"
+    csv_file.write_text(
+        HEADER + "".join(f"1;{horodate};500;PT30M\n" for horodate in horodates)
+    )
+
+    summary = validate_csv(csv_file)
+    cleaner = DataCleaner(Resampler().to_hourly(DataReader(csv_file).load()))
+
+    missing = cleaner.detect_missing_hours("2024")
+    assert summary["years"]["2024"]["missing"] == len(missing) == 2
+    assert summary["gaps"] == [(str(missing[0]), 2)]
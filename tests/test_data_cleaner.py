@@ -3,6 +3,7 @@ Tests pour le module de nettoyage des données
 """  # pylint: disable=redefined-outer-name
 
 from datetime import datetime
+import numpy as np
 import pytest
 import pandas as pd
 from solarcalculet.data_cleaner import DataCleaner
@@ -62,7 +63,8 @@ def test_fill_missing_data(sample_data):
     missing_hour = filled_df[filled_df["Horodate"] == datetime(2023, 1, 1, 2, 0)]
     assert len(missing_hour) == 1
     assert missing_hour.iloc[0]["Valeur"] == 0.7
-    assert missing_hour.iloc[0]["Source"] == "2024"  # Vérifie la source de la donnée
+    # Vérifie la source de la donnée (stratégie et année utilisées)
+    assert missing_hour.iloc[0]["Source"] == "adjacent-year:2024"
 
 
 def test_get_data_by_year(sample_data):
@@ -75,3 +77,270 @@ def test_get_data_by_year(sample_data):
     assert len(data_2024) == 4
     assert all(dt.year == 2023 for dt in data_2023["Horodate"])
     assert all(dt.year == 2024 for dt in data_2024["Horodate"])
+
+
+def test_fill_missing_data_batch_matches_iterative(sample_data):
+    """Vérifie que le mode batch produit le même résultat que le mode itératif"""
+    batch_df = DataCleaner(sample_data).fill_missing_data("2023", mode="batch")
+    iterative_df = DataCleaner(sample_data).fill_missing_data("2023", mode="iterative")
+
+    pd.testing.assert_frame_equal(batch_df, iterative_df, check_dtype=False)
+
+
+def test_fill_missing_data_previous_year_source():
+    """Vérifie le repli sur l'année précédente et la traçabilité de la source"""
+    df = pd.DataFrame(
+        {
+            "Horodate": pd.to_datetime(
+                [
+                    "2023-06-01 10:00:00",
+                    "2024-06-01 09:00:00",
+                    "2024-06-01 11:00:00",
+                ]
+            ),
+            "Valeur": [1.5, 0.4, 0.6],
+        }
+    )
+    cleaner = DataCleaner(df)
+    filled_df = cleaner.fill_missing_data("2024")
+
+    filled_row = filled_df[filled_df["Horodate"] == datetime(2024, 6, 1, 10, 0)]
+    assert len(filled_row) == 1
+    assert filled_row.iloc[0]["Valeur"] == 1.5
+    assert filled_row.iloc[0]["Source"] == "adjacent-year:2023"
+
+
+def test_fill_missing_data_invalid_mode(sample_data):
+    """Vérifie le rejet d'un mode de remplissage inconnu"""
+    cleaner = DataCleaner(sample_data)
+    with pytest.raises(ValueError):
+        cleaner.fill_missing_data("2023", mode="unknown")
+
+
+def test_get_data_by_year_after_fill(sample_data):
+    """Vérifie que l'index est mis à jour après le remplissage"""
+    cleaner = DataCleaner(sample_data)
+    cleaner.fill_missing_data("2023")
+    data_2023 = cleaner.get_data_by_year("2023")
+
+    assert len(data_2023) == 4
+    assert data_2023["Horodate"].is_monotonic_increasing
+    assert cleaner.detect_missing_hours("2023") == []
+
+
+def test_get_data_by_range(sample_data):
+    """Teste l'extraction d'une plage de dates [début, fin)"""
+    cleaner = DataCleaner(sample_data)
+    data = cleaner.get_data_by_range(
+        datetime(2023, 1, 1, 1, 0), datetime(2024, 1, 1, 1, 0)
+    )
+
+    assert len(data) == 3
+    assert data.iloc[0]["Horodate"] == datetime(2023, 1, 1, 1, 0)
+    assert data.iloc[-1]["Horodate"] == datetime(2024, 1, 1, 0, 0)
+    assert cleaner.get_data_by_year("2022").empty
+
+
+def test_locate(sample_data):
+    """Teste la recherche ponctuelle dans l'index trié"""
+    cleaner = DataCleaner(sample_data)
+    positions = cleaner.locate([datetime(2024, 1, 1, 2, 0), datetime(2023, 1, 1, 2, 0)])
+
+    assert positions[1] == -1
+    assert cleaner.data.iloc[positions[0]]["Valeur"] == 0.7
+
+
+def test_years_and_full_year_detection(sample_data):
+    """Teste la liste des années et la détection sur l'année civile entière"""
+    cleaner = DataCleaner(sample_data)
+
+    assert cleaner.years() == [2023, 2024]
+    assert not cleaner.covers_full_year("2023")
+    assert len(cleaner.detect_missing_hours("2023", full_year=True)) == 8760 - 3
+
+    cleaner.fill_missing_data("2023", full_year=True)
+    # Seules les heures alignées sur des mesures existantes (même date,
+    # même jour de la semaine ou profil mois/jour/heure) sont complétées
+    data_2023 = cleaner.get_data_by_year("2023")
+    sources = data_2023["Source"].str.split(":").str[0].value_counts()
+    assert sources["original"] == 3
+    assert sources["adjacent-year"] == 1
+    assert set(sources.index) == {"original", "adjacent-year", "weekday", "profile"}
+    assert data_2023["Horodate"].dt.month.isin([1, 12]).all()
+
+
+@pytest.fixture
+def two_years():
+    """Crée deux années horaires complètes (2023-2024) de valeurs distinctes"""
+    horodates = pd.date_range(
+        "2023-01-01", "2024-12-31 23:00", freq=pd.Timedelta(hours=1)
+    )
+    return pd.DataFrame(
+        {"Horodate": horodates, "Valeur": np.arange(len(horodates)) / 1000}
+    )
+
+
+def test_fill_strategy_chain(two_years):
+    """Vérifie l'ordre des stratégies de remplacement"""
+    data = two_years.set_index("Horodate")
+    holes = pd.DatetimeIndex(
+        [
+            "2024-02-29 10:00",  # pas de 29 février voisin : même jour de semaine
+            "2024-06-03 08:00",  # même date 2023 disponible
+            "2023-06-05 08:00",  # même date 2024 disponible (année suivante)
+        ]
+    )
+    # 2023-06-05 et 2024-06-03 sont des lundis à 52 semaines d'écart : le
+    # second trou ne peut pas servir de source au premier
+    cleaner = DataCleaner(data.drop(index=holes).reset_index())
+    rows = cleaner._build_batch_rows(holes)  # pylint: disable=protected-access
+
+    # 29 février : 52 semaines après (2025) absent, 52 semaines avant en 2023
+    assert list(rows["Source"]) == [
+        "weekday:2023",
+        "adjacent-year:2023",
+        "adjacent-year:2024",
+    ]
+    assert list(rows["Valeur"]) == [
+        data.loc[pd.Timestamp("2024-02-29 10:00") - pd.Timedelta(weeks=52), "Valeur"],
+        data.loc[pd.Timestamp("2023-06-03 08:00"), "Valeur"],
+        data.loc[pd.Timestamp("2024-06-05 08:00"), "Valeur"],
+    ]
+
+
+@pytest.mark.parametrize("year", ["2023", "2024"])
+def test_iterative_matches_batch_on_every_strategy(two_years, year):
+    """Vérifie que la recherche heure par heure et la jointure batch
+    choisissent les mêmes sources pour chaque stratégie"""
+    holes = pd.DatetimeIndex(
+        [
+            "2024-02-29 10:00",  # même jour de semaine 52 semaines avant
+            "2024-06-03 08:00",  # année précédente
+            "2023-06-07 08:00",  # année suivante
+            "2023-06-05 08:00",  # sources voisines toutes manquantes : profil
+            "2024-06-05 08:00",  # idem
+        ]
+    )
+    data = two_years[~two_years["Horodate"].isin(holes)]
+
+    batch = DataCleaner(data).fill_missing_data(year, mode="batch")
+    iterative = DataCleaner(data).fill_missing_data(year, mode="iterative")
+
+    pd.testing.assert_frame_equal(batch, iterative, check_dtype=False)
+    sources = set(batch.loc[batch["Horodate"].isin(holes), "Source"])
+    assert (
+        sources
+        == {
+            "2023": {"adjacent-year:2024", "profile"},
+            "2024": {"weekday:2023", "adjacent-year:2023", "profile"},
+        }[year]
+    )
+
+
+def test_find_replacement_data_leap_day(two_years):
+    """Vérifie qu'un 29 février manquant ne lève plus d'erreur"""
+    data = two_years[two_years["Horodate"] != datetime(2024, 2, 29, 5)]
+    cleaner = DataCleaner(data)
+
+    replacement = cleaner.find_replacement_data(datetime(2024, 2, 29, 5))
+    assert replacement == pytest.approx(
+        two_years.set_index("Horodate").loc["2023-03-02 05:00", "Valeur"]
+    )
+
+
+def test_fill_from_profile():
+    """Vérifie le remplissage par le profil médian sans année voisine"""
+    horodates = pd.date_range(
+        "2023-01-02", "2023-01-31 23:00", freq=pd.Timedelta(hours=1)
+    )
+    data = pd.DataFrame(
+        {"Horodate": horodates, "Valeur": horodates.day / 10 + horodates.hour}
+    )
+    hole = datetime(2023, 1, 16, 7)  # lundi : lundis restants les 2, 9, 23, 30
+    cleaner = DataCleaner(data[data["Horodate"] != hole])
+
+    cleaner.fill_missing_data("2023")
+    row = cleaner.data[cleaner.data["Horodate"] == hole].iloc[0]
+    assert row["Source"] == "profile"
+    assert row["Valeur"] == pytest.approx((0.9 + 2.3) / 2 + 7)
+    assert cleaner.profile().loc[(1, 0, 7)] == row["Valeur"]
+
+
+def test_profile_precomputed(sample_data):
+    """Vérifie l'utilisation d'un profil fourni (calculé une fois par compteur)"""
+    profile = DataCleaner(sample_data).profile()
+    cleaner = DataCleaner(sample_data.iloc[:2], profile=profile)
+
+    assert cleaner.profile() is profile
+
+
+def test_low_memory_mode(sample_data):
+    """Vérifie les types compacts et l'absence de copie en mode basse mémoire"""
+    data = sample_data.assign(Extra="inutile")
+    cleaner = DataCleaner(data, low_memory=True)
+
+    assert list(cleaner.data.columns) == ["Horodate", "Valeur", "Source"]
+    assert cleaner.data["Valeur"].dtype == "float32"
+    assert cleaner.data["Source"].dtype == "category"
+    # Données triées : les horodates sont reprises sans copie
+    assert np.shares_memory(
+        cleaner.data["Horodate"].to_numpy(), data["Horodate"].to_numpy()
+    )
+
+    filled = cleaner.fill_missing_data("2023")
+    assert filled is cleaner.data
+    assert filled["Valeur"].dtype == "float32"
+    assert filled["Source"].dtype == "category"
+    assert set(filled["Source"]) == {"original", "adjacent-year:2024"}
+
+
+def test_gap_runs(sample_data):
+    """Vérifie l'index des trous en plages, y compris en année civile"""
+    cleaner = DataCleaner(sample_data)
+
+    runs = cleaner.gap_runs("2023")
+    assert runs["start"].tolist() == [pd.Timestamp("2023-01-01 02:00")]
+    assert runs["hours"].tolist() == [1]
+
+    full = cleaner.gap_runs("2023", full_year=True)
+    assert full["start"].tolist() == [
+        pd.Timestamp("2023-01-01 02:00"),
+        pd.Timestamp("2023-01-01 04:00"),
+    ]
+    assert full["hours"].tolist() == [1, 8760 - 4]
+    missing = cleaner.detect_missing_hours("2023", full_year=True)
+    assert len(missing) == full["hours"].sum()
+    assert missing[1] == pd.Timestamp("2023-01-01 04:00")
+    assert missing[-1] == pd.Timestamp("2023-12-31 23:00")
+
+
+def test_fill_interpolates_short_runs(two_years):
+    """Vérifie l'interpolation des trous courts et le remplacement des longs"""
+    data = two_years.set_index("Horodate")
+    short = pd.date_range("2023-03-01 10:00", periods=3, freq="h")
+    long = pd.date_range("2023-06-01 00:00", periods=5, freq="h")
+    cleaner = DataCleaner(data.drop(index=short.append(long)).reset_index())
+
+    filled = cleaner.fill_missing_data("2023", max_interpolation=3).set_index(
+        "Horodate"
+    )
+
+    # Série linéaire : l'interpolation retrouve les valeurs supprimées
+    assert filled.loc[short, "Valeur"].tolist() == data.loc[short, "Valeur"].tolist()
+    assert set(filled.loc[short, "Source"]) == {"interpolation"}
+    assert set(filled.loc[long, "Source"]) == {"adjacent-year:2024"}
+
+
+def test_gap_report(two_years):
+    """Vérifie le rapport des trous et la stratégie prévue pour chacun"""
+    holes = pd.DatetimeIndex(["2023-03-01 10:00", "2023-03-01 11:00"]).append(
+        pd.date_range("2024-05-01", periods=10, freq="h")
+    )
+    data = two_years.set_index("Horodate").drop(index=holes).reset_index()
+
+    report = DataCleaner(data).gap_report(max_interpolation=3)
+
+    assert report["year"].tolist() == ["2023", "2024"]
+    assert report["end"].tolist() == [holes[1], holes[-1]]
+    assert report["hours"].tolist() == [2, 10]
+    assert report["fill"].tolist() == ["interpolation", "replacement"]
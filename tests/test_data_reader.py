@@ -5,28 +5,15 @@ Tests pour le module de lecture des données ENEDIS
 from pathlib import Path
 import pytest
 import pandas as pd
+from solarcalculet.constants import ENEDIS_COLUMNS
 from solarcalculet.data_reader import DataReader
+from solarcalculet.parse_cache import ParseCache
 
 
 @pytest.fixture
 def sample_data_path(tmp_path):
     """Crée un fichier CSV de test"""
-    headers = [
-        "Identifiant PRM",
-        "Date de début",
-        "Date de fin",
-        "Grandeur physique",
-        "Grandeur métier",
-        "Etape métier",
-        "Unité",
-        "Horodate",
-        "Valeur",
-        "Nature",
-        "Pas",
-        "Indice de vraisemblance",
-        "Etat complémentaire",
-    ]
-    data = ";".join(headers) + "\n"
+    data = ";".join(ENEDIS_COLUMNS) + "\n"
     data += (
         "19125759625988;2023-03-13 00:00:00;2025-03-13 00:00:00;PA;CONS;BRUT;W;"
         "2023-03-13 00:30:00;692;B;PT30M;0;0\n"
@@ -88,3 +75,87 @@ def test_convert_values_to_kw(sample_data_path):
 
     # La première valeur était 692 W, donc devrait être 0.692 kW
     assert df.iloc[0]["Valeur"] == 0.692
+
+
+def test_read_fast_mode(sample_data_path):
+    """Teste la lecture rapide limitée aux colonnes utiles"""
+    generic_df = DataReader(sample_data_path).read()
+    fast_df = DataReader(sample_data_path, mode="fast").read()
+
+    assert list(fast_df.columns) == ["Identifiant PRM", "Horodate", "Valeur", "Pas"]
+    assert pd.api.types.is_datetime64_any_dtype(fast_df["Horodate"])
+    assert fast_df["Valeur"].dtype == "float64"
+    pd.testing.assert_series_equal(fast_df["Horodate"], generic_df["Horodate"])
+    assert fast_df["Valeur"].tolist() == [692.0, 1284.0]
+
+
+def test_read_fast_mode_fallback(tmp_path):
+    """Vérifie le repli sur la lecture générique si le format de date diffère"""
+    data = "Horodate;Valeur\n2023-03-13T00:30:00;692\n2023-03-13T01:00:00;1284"
+    csv_file = tmp_path / "iso.csv"
+    csv_file.write_text(data)
+
+    df = DataReader(csv_file, mode="fast").read()
+    assert df.iloc[1]["Horodate"] == pd.Timestamp("2023-03-13 01:00:00")
+    assert df.iloc[0]["Valeur"] == 692
+
+
+def test_read_invalid_mode():
+    """Vérifie le rejet d'un mode de lecture inconnu"""
+    with pytest.raises(ValueError):
+        DataReader("dummy.csv", mode="unknown")
+
+
+def test_read_chunks(sample_data_path):
+    """Teste la lecture par blocs"""
+    reader = DataReader(sample_data_path, mode="fast")
+    chunks = list(reader.read_chunks(chunksize=1))
+
+    assert len(chunks) == 2
+    assert list(chunks[0].columns) == ["Identifiant PRM", "Horodate", "Valeur", "Pas"]
+    assert chunks[1].iloc[0]["Horodate"] == pd.Timestamp("2023-03-13 01:00:00")
+
+
+def test_partition_by_year(sample_data_path):
+    """Teste la répartition par année lors de la lecture par blocs"""
+    with DataReader(sample_data_path).partition_by_year(chunksize=1) as partitions:
+        assert partitions.years() == [2023]
+        assert len(partitions.get(2023)) == 2
+
+
+def test_partition_by_year_missing_columns(tmp_path):
+    """Vérifie l'erreur si les colonnes requises sont absentes"""
+    csv_file = tmp_path / "invalid.csv"
+    csv_file.write_text("Col1;Col2\n1;2")
+
+    with pytest.raises(ValueError):
+        DataReader(csv_file).partition_by_year()
+
+
+def test_load_uses_cache(sample_data_path, tmp_path, monkeypatch):
+    """Vérifie que le second chargement est servi par le cache"""
+    reader = DataReader(
+        sample_data_path, mode="fast", cache=ParseCache(tmp_path / "cache")
+    )
+    df = reader.load()
+    assert list(df.columns) == ["Identifiant PRM", "Horodate", "Valeur", "Pas"]
+    assert df.iloc[0]["Valeur"] == 0.692
+
+    def fail_read():
+        raise AssertionError("le fichier ne doit pas être relu")
+
+    monkeypatch.setattr(reader, "read", fail_read)
+    pd.testing.assert_frame_equal(reader.load(), df)
+
+
+def test_load_low_memory(sample_data_path):
+    """Vérifie les types compacts et la conversion sans copie du mode basse mémoire"""
+    reader = DataReader(sample_data_path, mode="fast", low_memory=True)
+    df = reader.load()
+
+    assert df["Valeur"].dtype == "float32"
+    assert list(df.columns) == ["Identifiant PRM", "Horodate", "Valeur", "Pas"]
+    assert df.iloc[0]["Valeur"] == pytest.approx(0.692)
+
+    raw = reader.read()
+    assert reader.convert_to_kw(raw, copy=False) is raw
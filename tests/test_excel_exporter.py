@@ -3,12 +3,18 @@ Tests pour le module d'export Excel
 """  # pylint: disable=redefined-outer-name
 
 import os
+import zipfile
+from pathlib import Path
 
+import openpyxl
 import pandas as pd
 import pytest
 
+from solarcalculet.constants import DEFAULT_TEMPLATE
 from solarcalculet.excel_exporter import ExcelExporter
 
+TEMPLATE_FILE = Path(DEFAULT_TEMPLATE)
+
 
 @pytest.fixture
 def sample_data():
@@ -77,3 +83,232 @@ def test_validate_export_format(sample_data, tmp_path):
     # Vérifie le format du fichier exporté
     validation_errors = exporter.validate_export_format(str(output_file))
     assert len(validation_errors) == 0
+
+
+def test_format_date_hour_leap_year():
+    """Vérifie les libellés autour du 29 février et en fin d'année"""
+    df = pd.DataFrame(
+        {
+            "Horodate": pd.to_datetime(
+                ["2024-02-29 05:00:00", "2024-03-01 00:00:00", "2024-12-31 23:00:00"]
+            ),
+            "Valeur": [0.1, 0.2, 0.3],
+        }
+    )
+    formatted = ExcelExporter(df).format_date_hour()
+
+    assert formatted["Month/Day Hour:Minute"].tolist() == [
+        "2/29 5:00",
+        "3/1 0:00",
+        "12/31 23:00",
+    ]
+
+
+def test_prepare_excel_data_layout(sample_data):
+    """Vérifie l'ordre des lignes : en-tête puis une ligne par libellé"""
+    duplicated = pd.concat(
+        [
+            sample_data,
+            pd.DataFrame(
+                {"Horodate": pd.to_datetime(["2023-01-01 00:30:00"]), "Valeur": [0.9]}
+            ),
+        ],
+        ignore_index=True,
+    )
+    excel_data = ExcelExporter(duplicated).prepare_excel_data()
+
+    assert list(excel_data.index[:5]) == [
+        "Note",
+        "Time Interval",
+        "Unit",
+        "Month/Day Hour:Minute",
+        "1/1 0:00",
+    ]
+    assert len(excel_data) == 4 + 4
+    # Un libellé répété conserve sa position et prend la dernière valeur
+    assert excel_data.loc["1/1 0:00", "Value"] == 0.9
+
+
+def test_export_to_excel_streaming_matches_pandas(sample_data, tmp_path):
+    """Vérifie que le moteur streaming produit la même feuille que pandas"""
+    exporter = ExcelExporter(sample_data)
+    pandas_file = tmp_path / "pandas.xlsx"
+    streaming_file = tmp_path / "streaming.xlsx"
+    exporter.export_to_excel(str(pandas_file))
+    exporter.export_to_excel(str(streaming_file), engine="streaming")
+
+    pandas_sheet = openpyxl.load_workbook(pandas_file)["Sheet1"]
+    streaming_sheet = openpyxl.load_workbook(streaming_file)["Sheet1"]
+    assert [[c.value for c in row] for row in pandas_sheet.iter_rows()] == [
+        [c.value for c in row] for row in streaming_sheet.iter_rows()
+    ]
+    assert streaming_sheet.column_dimensions["A"].width == 25
+    assert streaming_sheet.column_dimensions["B"].width == 15
+    assert streaming_sheet["A5"].font.b
+    assert len(exporter.validate_export_format(str(streaming_file))) == 0
+
+
+def test_export_engine_invalid(sample_data):
+    """Vérifie le rejet d'un moteur d'export inconnu"""
+    with pytest.raises(ValueError):
+        ExcelExporter(sample_data, engine="unknown")
+
+
+def test_write_excel_is_atomic(sample_data, tmp_path, monkeypatch):
+    """Vérifie qu'une écriture interrompue ne laisse aucun fichier de sortie"""
+    exporter = ExcelExporter(sample_data)
+    output_file = tmp_path / "2024.xlsx"
+
+    def interrupted(_excel_data, partial_file):
+        with open(partial_file, "wb") as handle:
+            handle.write(b"PK")
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(exporter, "_write_pandas", interrupted)
+    with pytest.raises(OSError):
+        exporter.export_to_excel(str(output_file))
+
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.fixture
+def full_year_data():
+    """Crée une année 2024 complète (bissextile)"""
+    horodates = pd.date_range(
+        "2024-01-01", "2024-12-31 23:00", freq=pd.Timedelta(hours=1)
+    )
+    return pd.DataFrame({"Horodate": horodates, "Valeur": 0.123456})
+
+
+@pytest.mark.parametrize("engine", ExcelExporter.EXPORT_ENGINES)
+def test_validate_export_format_full_year(full_year_data, tmp_path, engine):
+    """Vérifie toutes les règles du template sur un classeur d'année complète"""
+    output_file = tmp_path / "2024.xlsx"
+    exporter = ExcelExporter(full_year_data, engine=engine, template_file=TEMPLATE_FILE)
+    exporter.export_to_excel(str(output_file))
+
+    assert exporter.validate_export_format(str(output_file), full_year=True) == []
+
+    # Une heure en moins : trou et nombre de lignes incorrect
+    partial = ExcelExporter(
+        full_year_data.drop(index=[100]), engine=engine, template_file=TEMPLATE_FILE
+    )
+    partial.export_to_excel(str(output_file))
+    assert partial.validate_export_format(str(output_file), full_year=True) == [
+        "Missing hours before A105",
+        "Expected 8784 data rows, found 8783",
+    ]
+    assert partial.validate_export_format(str(output_file)) == []
+
+
+def test_validate_excel_data_rules(full_year_data):
+    """Vérifie la détection de chaque règle enfreinte avant écriture"""
+    data = full_year_data[full_year_data["Horodate"].dt.month < 3].copy()
+    data["Horodate"] = data["Horodate"] - pd.DateOffset(years=1)
+    data = data.dropna()
+    exporter = ExcelExporter(data)
+    excel_data = exporter.prepare_excel_data()
+
+    # Janvier-février 2023 : année non bissextile contiguë mais incomplète
+    assert exporter.validate_excel_data(excel_data) == []
+    assert exporter.validate_excel_data(excel_data, full_year=True) == [
+        "Expected 8760 data rows, found 1416"
+    ]
+
+    excel_data.loc["Unit", "Value"] = "MW"
+    excel_data.iloc[4, 0] = -1.0
+    excel_data.iloc[5, 0] = 0.1234567
+    excel_data.iloc[6, 0] = None
+    excel_data.iloc[7, 0] = "n/a"
+    assert exporter.validate_excel_data(excel_data) == [
+        "Unit should be kW or W (B3)",
+        "Negative value in B5",
+        "More than 6 decimals in B6",
+        "Empty cell B7",
+        "Non-numeric value in B8",
+    ]
+
+
+def test_validate_leap_year_row_count(full_year_data):
+    """Vérifie que 2024 sans 29 février n'est pas acceptée comme année complète"""
+    no_leap_day = full_year_data[
+        ~(
+            (full_year_data["Horodate"].dt.month == 2)
+            & (full_year_data["Horodate"].dt.day == 29)
+        )
+    ]
+    exporter = ExcelExporter(no_leap_day)
+
+    assert exporter.validate_excel_data(full_year=True) == [
+        "Missing hours before A1421",
+        "Expected 8784 data rows, found 8760",
+    ]
+    rows = list(ExcelExporter.HEADER_ROWS) + [("2/28 23:00", 1.0), ("2/29 0:00", 1.0)]
+    assert ExcelExporter.check_template_rows(rows, leap_year=False) == [
+        "2/29 label in a non-leap year in A6"
+    ]
+
+
+def test_validate_excel_data_labels():
+    """Vérifie les contrôles d'ordre et de format des libellés"""
+    exporter = ExcelExporter(pd.DataFrame({"Horodate": [], "Valeur": []}))
+    header = list(ExcelExporter.HEADER_ROWS)
+    rows = header + [("1/1 1:00", 1.0), ("1/1 0:00", 1.0), ("13/1 0:00", 1.0)]
+    assert exporter.check_template_rows(rows) == [
+        "Labels out of order in A6",
+        "Invalid date/hour label in A7: '13/1 0:00'",
+    ]
+    assert exporter.check_template_rows(rows[1:])[0] == (
+        "Missing required element: Note (A1)"
+    )
+
+
+def test_validate_export_format_unreadable(sample_data, tmp_path):
+    """Vérifie l'erreur renvoyée pour un fichier illisible"""
+    broken_file = tmp_path / "broken.xlsx"
+    broken_file.write_text("not a workbook")
+    errors = ExcelExporter(sample_data).validate_export_format(str(broken_file))
+    assert len(errors) == 1
+    assert errors[0].startswith("Error reading Excel file")
+
+
+def test_export_to_excel_template(sample_data, tmp_path):
+    """Vérifie l'injection des données dans le classeur modèle"""
+    output_file = tmp_path / "2023.xlsx"
+    exporter = ExcelExporter(
+        sample_data, engine="template", template_file=TEMPLATE_FILE
+    )
+    exporter.export_to_excel(str(output_file))
+
+    # Toutes les parties autres que la feuille sont identiques au modèle
+    with zipfile.ZipFile(TEMPLATE_FILE) as template, zipfile.ZipFile(
+        output_file
+    ) as output:
+        assert template.namelist() == output.namelist()
+        for name in template.namelist():
+            if name != "xl/worksheets/sheet1.xml":
+                assert template.read(name) == output.read(name)
+
+    sheet = openpyxl.load_workbook(output_file)["Sheet1"]
+    template_sheet = openpyxl.load_workbook(TEMPLATE_FILE)["Sheet1"]
+    assert sheet.max_row == 4 + len(sample_data)
+    for row in range(1, 5):
+        assert [c.value for c in sheet[row]] == [c.value for c in template_sheet[row]]
+    assert [
+        (sheet[f"A{row}"].value, sheet[f"B{row}"].value) for row in range(5, 9)
+    ] == [
+        ("1/1 0:00", 0.5),
+        ("1/1 1:00", 0.6),
+        ("1/1 2:00", 0.7),
+        ("12/31 23:00", 0.8),
+    ]
+    assert sheet["A5"].style_id == template_sheet["A5"].style_id
+    assert exporter.validate_export_format(str(output_file)) == []
+
+
+def test_export_to_excel_template_required(sample_data, tmp_path):
+    """Vérifie que le moteur template exige un classeur modèle"""
+    with pytest.raises(ValueError):
+        ExcelExporter(sample_data, engine="template").export_to_excel(
+            str(tmp_path / "2023.xlsx")
+        )
@@ -0,0 +1,60 @@
+"""
+Tests pour le module de traitement d'un parc de compteurs
+"""  # pylint: disable=redefined-outer-name
+
+import pandas as pd
+import pytest
+from solarcalculet.constants import ENEDIS_COLUMNS
+from solarcalculet.fleet import process_fleet, process_meter, split_by_prm
+
+
+@pytest.fixture
+def fleet_csv(tmp_path):
+    """Crée un fichier CSV de test avec deux compteurs"""
+    header = ";".join(ENEDIS_COLUMNS)
+    rows = []
+    for prm, hours in [("11111111111111", [0, 1, 3]), ("22222222222222", [0, 1, 2])]:
+        for year in (2023, 2024):
+            for hour in hours:
+                rows.append(
+                    f"{prm};2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;"
+                    f"{year}-01-01 {hour + 1:02d}:00:00;{500 + 100 * hour};B;PT60M;0;0"
+                )
+    csv_file = tmp_path / "fleet.csv"
+    csv_file.write_text(header + "\n" + "\n".join(rows))
+    return csv_file
+
+
+def test_split_by_prm():
+    """Teste la séparation des données par compteur"""
+    df = pd.DataFrame({"Identifiant PRM": ["1", "2", "1"], "Valeur": [1.0, 2.0, 3.0]})
+    meters = split_by_prm(df)
+
+    assert sorted(meters) == ["1", "2"]
+    assert meters["1"]["Valeur"].tolist() == [1.0, 3.0]
+    assert "Identifiant PRM" not in meters["1"].columns
+    assert list(split_by_prm(df.drop(columns=["Identifiant PRM"]))) == ["inconnu"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_process_fleet(fleet_csv, tmp_path, workers):
+    """Teste le traitement du parc, séquentiel et en parallèle"""
+    output_dir = tmp_path / f"output_{workers}"
+    summary = process_fleet(str(fleet_csv), str(output_dir), workers=workers)
+
+    assert summary["meters"] == 2
+    assert summary["failed"] == 0
+    assert summary["rows"] == 12
+    results = {result["prm"]: result for result in summary["results"]}
+    assert results["11111111111111"]["missing"] == {"2023": 1, "2024": 1}
+    assert results["22222222222222"]["missing"] == {"2023": 0, "2024": 0}
+    assert (output_dir / "11111111111111" / "2023.xlsx").exists()
+    assert (output_dir / "22222222222222" / "2024.xlsx").exists()
+
+
+def test_process_meter_failure_is_reported(tmp_path):
+    """Vérifie qu'un compteur en erreur est signalé sans lever d'exception"""
+    result = process_meter("bad", pd.DataFrame({"Valeur": [1.0]}), str(tmp_path))
+
+    assert result["status"] == "failed"
+    assert "KeyError" in result["error"]
@@ -0,0 +1,246 @@
+"""
+Tests du stockage horaire à emplacements fixes
+"""  # pylint: disable=redefined-outer-name
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from solarcalculet.data_cleaner import DataCleaner
+from solarcalculet.excel_exporter import ExcelExporter
+from solarcalculet.hourly_store import HourlyStore
+from solarcalculet.main import main
+from solarcalculet.pipeline import process_enedis_data
+
+PRM = "19125759625988"
+
+
+@pytest.fixture
+def series():
+    """Deux années horaires (dont une bissextile) avec quelques trous"""
+    horodates = pd.date_range("2023-01-01", "2024-12-31 23:00", freq="h")
+    rng = np.random.default_rng(0)
+    # Mesures au watt près et moyennes de demi-heures, comme après Resampler
+    values = np.round(
+        rng.integers(0, 12_000, len(horodates)) / 1000
+        + rng.integers(0, 2, len(horodates)) * 0.0005,
+        6,
+    )
+    df = pd.DataFrame({"Horodate": horodates, "Valeur": values, "Source": "original"})
+    df.loc[10, "Source"] = "profile"
+    df.loc[9000, "Source"] = "next_year:2024"
+    return df.drop(index=[5, 6, 100]).reset_index(drop=True)
+
+
+def test_layout():
+    """Vérifie la taille fixe des fichiers annuels"""
+    assert HourlyStore.slots(2023) == 8760
+    assert HourlyStore.slots("2024") == 8784
+    assert HourlyStore.layout(2023)[-1] == 8760 * 9 + 1095
+
+
+def test_round_trip_is_lossless(series, tmp_path):
+    """Vérifie l'aller-retour sans perte avec le format DataFrame"""
+    store = HourlyStore(tmp_path)
+
+    assert store.write_series(series, PRM) == {"2023": 8757, "2024": 8784}
+
+    pd.testing.assert_frame_equal(store.read_range(PRM), series)
+    assert store.years(PRM) == ["2023", "2024"]
+    assert store.prms() == [PRM]
+    assert store.path(PRM, 2023).stat().st_size == HourlyStore.layout(2023)[-1]
+    # Relecture par une autre instance (fichiers seuls)
+    reopened = HourlyStore(tmp_path).read_year(PRM, "2024")
+    pd.testing.assert_frame_equal(
+        reopened, series[series["Horodate"].dt.year == 2024].reset_index(drop=True)
+    )
+
+
+def test_values_and_valid_are_indexed_by_hour(series, tmp_path):
+    """Vérifie l'accès par rang horaire et le bitmap de validité"""
+    store = HourlyStore(tmp_path)
+    store.write_series(series, PRM)
+
+    values = store.values(PRM, 2023)
+    valid = store.valid(PRM, 2023)
+    assert len(values) == 8760 and values.dtype == np.float64
+    assert not values.flags.writeable
+    assert np.flatnonzero(~valid).tolist() == [5, 6, 100]
+    assert np.isnan(values[5])
+    assert values[7] == series["Valeur"].iloc[5]
+
+
+def test_round_trip_keeps_sub_watt_means(tmp_path):
+    """Vérifie l'aller-retour exact des moyennes de mesures PT10M"""
+    store = HourlyStore(tmp_path)
+    df = pd.DataFrame(
+        {
+            "Horodate": pd.date_range("2024-01-01", periods=3, freq="h"),
+            "Valeur": [17.618167, 16.129167, 123456.789012],
+        }
+    )
+    store.write_series(df, PRM)
+
+    assert store.read_year(PRM, 2024)["Valeur"].tolist() == df["Valeur"].tolist()
+
+
+def test_partial_writes_are_merged(series, tmp_path):
+    """Vérifie qu'une écriture partielle conserve les heures déjà stockées"""
+    store = HourlyStore(tmp_path)
+    store.write_series(series, PRM)
+    patch = pd.DataFrame(
+        {
+            "Horodate": pd.to_datetime(["2023-01-01 05:00", "2023-01-01 06:00"]),
+            "Valeur": [1.25, 2.5],
+            "Source": ["profile", "interpolation"],
+        }
+    )
+
+    store.write_series(patch, PRM)
+
+    year = store.read_year(PRM, 2023)
+    assert len(year) == 8759
+    assert year["Valeur"].iloc[5:7].tolist() == [1.25, 2.5]
+    assert year["Source"].iloc[5:7].tolist() == ["profile", "interpolation"]
+
+
+def test_lookup_across_years(series, tmp_path):
+    """Vérifie la lecture indexée de dates de plusieurs années"""
+    store = HourlyStore(tmp_path)
+    store.write_series(series, PRM)
+    targets = pd.DatetimeIndex(
+        ["2024-02-29 12:00", "2023-01-01 05:00", "2025-01-01", "2023-03-01 00:30", None]
+    )
+
+    values, found = store.lookup(PRM, targets)
+
+    assert found.tolist() == [True, False, False, False, False]
+    expected = series.loc[series["Horodate"] == "2024-02-29 12:00", "Valeur"].item()
+    assert values[0] == expected
+
+
+def test_rejects_non_hourly_series(tmp_path):
+    """Vérifie le refus d'une série infra-horaire"""
+    df = pd.DataFrame(
+        {"Horodate": pd.to_datetime(["2024-01-01 00:30"]), "Valeur": [1.0]}
+    )
+    with pytest.raises(ValueError, match="heure pleine"):
+        HourlyStore(tmp_path).write_series(df, PRM)
+
+
+def test_cleaner_uses_store_for_aligned_years(series, tmp_path):
+    """Vérifie la complétion par accès indexé au stockage"""
+    store = HourlyStore(tmp_path)
+    store.write_series(series, PRM)
+    year_data = series[series["Horodate"].dt.year == 2023]
+    from_memory = DataCleaner(series).fill_missing_data("2023")
+
+    cleaner = DataCleaner(year_data, reference=pickle.loads(pickle.dumps((store, PRM))))
+    from_store = cleaner.fill_missing_data("2023")
+
+    pd.testing.assert_frame_equal(from_store, from_memory.iloc[: len(from_store)])
+    assert from_store["Source"].iloc[[5, 6, 100]].tolist() == ["adjacent-year:2024"] * 3
+
+
+def test_exporter_reads_year_without_copy(series, tmp_path):
+    """Vérifie l'export d'une année complète lue sans copie"""
+    store = HourlyStore(tmp_path)
+    store.write_series(series, PRM)
+
+    exporter = ExcelExporter.from_hourly_store(store, PRM, 2024)
+
+    assert np.shares_memory(exporter.data["Valeur"].to_numpy(), store.values(PRM, 2024))
+    excel_data = exporter.prepare_excel_data()
+    assert len(excel_data) == 4 + 8784
+    assert exporter.validate_excel_data(excel_data, full_year=True) == []
+
+
+def test_cli_hourly_store(tmp_path):
+    """Vérifie l'enregistrement des séries traitées avec --hourly-store"""
+    csv_file = tmp_path / "input.csv"
+    rows = [
+        f"{PRM};{timestamp:%Y-%m-%d %H:%M:%S};{1000 + hour};PT60M"
+        for hour, timestamp in enumerate(
+            pd.date_range("2024-01-01 01:00", periods=48, freq="h")
+        )
+    ]
+    csv_file.write_text("Identifiant PRM;Horodate;Valeur;Pas\n" + "\n".join(rows))
+
+    main(
+        [
+            str(csv_file),
+            str(tmp_path / "output"),
+            "--no-cache",
+            "--hourly-store",
+            str(tmp_path / "store"),
+        ]
+    )
+
+    store = HourlyStore(tmp_path / "store")
+    assert store.prms() == [PRM]
+    assert len(store.read_year(PRM, 2024)) == 48
+
+
+def _write_source(args) -> dict:
+    """Écrit une heure d'une année avec sa propre source (processus de travail)"""
+    directory, year = args
+    df = pd.DataFrame(
+        {
+            "Horodate": [pd.Timestamp(year, 1, 1)],
+            "Valeur": [1.0],
+            "Source": [f"source:{year}"],
+        }
+    )
+    return HourlyStore(directory).write_series(df, PRM)
+
+
+def test_concurrent_writers_share_source_table(tmp_path):
+    """Vérifie la table des sources complétée par plusieurs processus"""
+    years = list(range(2010, 2026))
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_write_source, [(tmp_path, year) for year in years]))
+
+    store = HourlyStore(tmp_path)
+    assert store.read_range(PRM)["Source"].tolist() == [
+        f"source:{year}" for year in years
+    ]
+    assert not list((tmp_path / PRM).glob("*.tmp"))
+
+
+def test_lookup_original_only(series, tmp_path):
+    """Vérifie que les heures complétées ne servent pas de remplacement"""
+    store = HourlyStore(tmp_path)
+    store.write_series(series, PRM)
+    profile_hour = series.index[series["Source"] == "profile"][0]
+    targets = series["Horodate"].iloc[[profile_hour - 1, profile_hour]]
+
+    assert store.lookup(PRM, targets)[1].tolist() == [True, True]
+    assert store.lookup(PRM, targets, original_only=True)[1].tolist() == [True, False]
+
+
+def test_pipeline_with_hourly_store_matches_memory(tmp_path):
+    """Vérifie que la complétion et l'export via le stockage donnent les
+    mêmes classeurs que le traitement en mémoire"""
+    csv_file = tmp_path / "input.csv"
+    horodates = pd.date_range("2023-01-01 01:00", "2025-01-01 00:00", freq="h")
+    rows = [
+        f"{PRM};{timestamp:%Y-%m-%d %H:%M:%S};{1000 + hour % 5000};PT60M"
+        for hour, timestamp in enumerate(horodates)
+        if hour % 1000 not in (7, 8, 9)
+    ]
+    csv_file.write_text("Identifiant PRM;Horodate;Valeur;Pas\n" + "\n".join(rows))
+
+    in_memory = process_enedis_data(str(csv_file), str(tmp_path / "memory"))
+    stored = process_enedis_data(
+        str(csv_file), str(tmp_path / "stored"), store=HourlyStore(tmp_path / "store")
+    )
+
+    assert [result["digest"] for result in stored] == [
+        result["digest"] for result in in_memory
+    ]
+    for year in ("2023", "2024"):
+        pd.testing.assert_frame_equal(
+            pd.read_excel(tmp_path / "stored" / f"{year}.xlsx", header=None),
+            pd.read_excel(tmp_path / "memory" / f"{year}.xlsx", header=None),
+        )
@@ -0,0 +1,231 @@
+"""
+Tests du téléchargement concurrent des fichiers CSV ENEDIS
+"""  # pylint: disable=redefined-outer-name
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import pytest
+from solarcalculet.data_reader import DataReader
+from solarcalculet.fleet import process_fleet
+from solarcalculet.http_fetcher import HttpError, HttpFetcher, fetch_csv, fetch_csvs
+
+HEADER = "Identifiant PRM;Horodate;Valeur;Pas\n"
+
+
+def _csv(prm: str, hours: int) -> bytes:
+    rows = [
+        f"{prm};{timestamp:%Y-%m-%d %H:%M:%S};{1000 + hour};PT60M\n"
+        for hour, timestamp in enumerate(
+            pd.date_range("2024-01-01 01:00", periods=hours, freq="h")
+        )
+    ]
+    return (HEADER + "".join(rows)).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Serveur de test : fichiers, réponses par morceaux, compressées ou sans
+    longueur, pannes, redirection
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Sert le fichier demandé selon le scénario du chemin"""
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.clients.add(self.client_address)
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            failures = server.failures.get(self.path, 0)
+            if failures:
+                server.failures[self.path] = failures - 1
+        try:
+            time.sleep(server.delay)
+            self._serve(failures)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _serve(self, failures: int):
+        server = self.server
+        if failures:
+            self._reply(503, b"indisponible")
+        elif self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/meter-1.csv")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path in server.files:
+            body = server.files[self.path]
+            if self.path.startswith("/gzip"):
+                assert "gzip" in self.headers["Accept-Encoding"]
+                compressed = gzip.compress(body)
+                self.send_response(200)
+                self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(compressed)))
+                self.end_headers()
+                self.wfile.write(compressed)
+            elif self.path.startswith("/unsized"):
+                # Corps sans longueur, délimité par la fermeture de la connexion
+                self.send_response(200)
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(body)
+                self.close_connection = True
+            elif self.path.startswith("/chunked"):
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for start in range(0, len(body), 1000):
+                    part = body[start : start + 1000]
+                    self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                self._reply(200, body)
+        else:
+            self._reply(404, b"introuvable")
+
+    def _reply(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def server():
+    """Serveur HTTP local démarré dans un thread"""
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    http_server.lock = threading.Lock()
+    http_server.requests = []
+    http_server.clients = set()
+    http_server.active = http_server.peak = 0
+    http_server.delay = 0.0
+    http_server.failures = {}
+    http_server.files = {
+        "/meter-1.csv": _csv("11111111111111", 48),
+        "/meter-2.csv": _csv("22222222222222", 24),
+        "/chunked.csv": _csv("11111111111111", 250),
+        "/gzip.csv": _csv("11111111111111", 100),
+        "/unsized.csv": _csv("11111111111111", 30),
+    }
+    thread = threading.Thread(
+        target=http_server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    http_server.base_url = f"http://127.0.0.1:{http_server.server_address[1]}"
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def test_fetch_csv_matches_file_reader(server, tmp_path):
+    """Vérifie que le téléchargement donne les mêmes données que la lecture locale"""
+    csv_file = tmp_path / "meter.csv"
+    csv_file.write_bytes(server.files["/meter-1.csv"])
+
+    df = fetch_csv(server.base_url + "/meter-1.csv", chunksize=10)
+
+    expected = DataReader(csv_file, mode="fast").load()
+    pd.testing.assert_frame_equal(df, expected)
+    assert df["Valeur"].iloc[1] == 1.001
+
+
+@pytest.mark.parametrize(
+    "path, rows", [("/chunked.csv", 250), ("/gzip.csv", 100), ("/unsized.csv", 30)]
+)
+def test_fetch_body_encodings(server, path, rows):
+    """Vérifie l'analyse des réponses par morceaux, compressées ou sans longueur"""
+    df = fetch_csv(server.base_url + path, chunksize=64)
+
+    assert len(df) == rows
+    assert df["Horodate"].is_monotonic_increasing
+
+
+def test_fetch_all_bounds_concurrency(server):
+    """Vérifie le téléchargement concurrent borné à max_connections"""
+    server.delay = 0.05
+    urls = [server.base_url + path for path in ("/meter-1.csv", "/meter-2.csv") * 4]
+
+    frames, errors = fetch_csvs(urls, max_connections=2)
+
+    assert not errors
+    assert [len(frames[url]) for url in urls[:2]] == [48, 24]
+    assert len(server.requests) == 8
+    assert server.peak == 2
+    # Une connexion persistante par thread, réutilisée d'un fichier à l'autre
+    assert len(server.clients) == 2
+
+
+def test_connection_reuse_after_errors(server):
+    """Vérifie la réutilisation de la connexion après une erreur et une
+    réponse sans longueur, et le signalement des échecs URL par URL"""
+    paths = ["/absent.csv", "/meter-1.csv", "/unsized.csv", "/meter-2.csv"]
+    urls = [server.base_url + path for path in paths]
+
+    frames, errors = fetch_csvs(urls, max_connections=1, retries=0)
+
+    assert list(errors) == [urls[0]]
+    assert errors[urls[0]].status == 404
+    assert [len(frames[url]) for url in urls[1:]] == [48, 30, 24]
+    # Seule la réponse sans longueur ferme la connexion
+    assert len(server.clients) == 2
+
+
+def test_retry_with_backoff(server):
+    """Vérifie les nouvelles tentatives après des réponses 503"""
+    server.failures["/meter-2.csv"] = 2
+
+    df = fetch_csv(server.base_url + "/meter-2.csv", retries=2, backoff=0.01)
+
+    assert len(df) == 24
+    assert server.requests.count("/meter-2.csv") == 3
+
+
+def test_errors_are_raised(server):
+    """Vérifie l'échec après épuisement des tentatives et sur un 404"""
+    server.failures["/meter-2.csv"] = 5
+    with pytest.raises(HttpError) as error:
+        fetch_csv(server.base_url + "/meter-2.csv", retries=1, backoff=0.01)
+    assert error.value.status == 503
+
+    fetcher = HttpFetcher(retries=3, backoff=0.01)
+    with pytest.raises(HttpError, match="404"):
+        fetcher.fetch(server.base_url + "/absent.csv")
+    assert server.requests.count("/absent.csv") == 1
+
+
+def test_redirect_is_followed(server):
+    """Vérifie le suivi des redirections"""
+    assert len(fetch_csv(server.base_url + "/redirect")) == 48
+
+
+def test_process_fleet_from_urls(server, tmp_path):
+    """Vérifie le traitement d'un parc à partir de plusieurs extraits téléchargés"""
+    urls = [server.base_url + "/meter-1.csv", server.base_url + "/meter-2.csv"]
+
+    summary = process_fleet(urls, str(tmp_path), workers=1)
+
+    assert summary["meters"] == 2
+    assert summary["rows"] == 72
+    assert (tmp_path / "22222222222222" / "2024.xlsx").exists()
+
+    # Un extrait introuvable n'interrompt pas le traitement des autres
+    summary = process_fleet(
+        urls + [server.base_url + "/absent.csv"], str(tmp_path / "partial"), workers=1
+    )
+    assert summary["meters"] == 3
+    assert summary["failed"] == 1
+    failed = [result for result in summary["results"] if result["status"] == "failed"]
+    assert failed[0]["prm"] == server.base_url + "/absent.csv"
+    assert "404" in failed[0]["error"]
+    assert (tmp_path / "partial" / "11111111111111" / "2024.xlsx").exists()
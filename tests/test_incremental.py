@@ -0,0 +1,146 @@
+"""
+Tests pour le module de traitement incrémental
+"""  # pylint: disable=redefined-outer-name
+
+import pandas as pd
+import pytest
+from solarcalculet.incremental import (
+    IncrementalState,
+    affected_years,
+    merge_new_rows,
+    process_incremental,
+)
+from solarcalculet.pipeline import ProcessingOptions
+
+HEADER = "Identifiant PRM;Horodate;Valeur;Pas"
+
+
+def write_extract(path, horodates):
+    """Écrit une extraction de test au pas horaire (Horodate = fin de l'heure)"""
+    rows = [
+        f"19125759625988;{horodate};{500 + i};PT60M"
+        for i, horodate in enumerate(horodates)
+    ]
+    path.write_text(HEADER + "\n" + "\n".join(rows))
+    return path
+
+
+@pytest.fixture
+def first_extract(tmp_path):
+    """Crée une première extraction couvrant fin 2022 et début 2023"""
+    return write_extract(
+        tmp_path / "first.csv",
+        [
+            "2022-06-01 01:00:00",
+            "2022-06-01 02:00:00",
+            "2023-01-01 01:00:00",
+            "2023-01-01 03:00:00",
+        ],
+    )
+
+
+def test_merge_new_rows():
+    """Teste la fusion des heures nouvelles et révisées"""
+    stored = pd.DataFrame(
+        {
+            "Horodate": pd.to_datetime(["2023-01-01 00:00", "2023-01-01 01:00"]),
+            "Valeur": [1.0, 2.0],
+        }
+    )
+    extract = pd.DataFrame(
+        {
+            "Horodate": pd.to_datetime(["2023-01-01 01:00", "2023-01-01 02:00"]),
+            "Valeur": [9.0, 3.0],
+        }
+    )
+    merged, new_rows = merge_new_rows(stored, extract)
+
+    assert merged["Valeur"].tolist() == [1.0, 9.0, 3.0]
+    assert new_rows["Valeur"].tolist() == [9.0, 3.0]
+    assert affected_years(new_rows) == {2022, 2023, 2024}
+
+    # Extraction identique : aucune ligne à recalculer
+    merged_again, new_rows = merge_new_rows(merged, extract)
+    assert new_rows.empty
+    pd.testing.assert_frame_equal(merged_again, merged)
+
+
+def test_process_incremental(first_extract, tmp_path):
+    """Vérifie que seules les années modifiées sont recalculées et réexportées"""
+    output_dir = tmp_path / "output"
+    results = process_incremental(str(first_extract), str(output_dir))
+    assert [result["year"] for result in results] == ["2022", "2023"]
+    assert all(result["status"] == "ok" for result in results)
+
+    state = IncrementalState(output_dir / ".solarcalculet")
+    assert state.last_timestamp == "2023-01-01 02:00:00"
+    assert set(state.years) == {"2022", "2023"}
+
+    # Relance identique : rien à recalculer
+    assert not process_incremental(str(first_extract), str(output_dir))
+
+    # Fichier supprimé : l'année est régénérée malgré l'absence de nouvelles heures
+    (output_dir / "2022.xlsx").unlink()
+    results = process_incremental(str(first_extract), str(output_dir))
+    assert [(result["year"], result["status"]) for result in results] == [
+        ("2022", "ok")
+    ]
+    assert (output_dir / "2022.xlsx").exists()
+
+    # Nouvelle extraction chevauchante : seule l'heure manquante de 2023 est ajoutée
+    second_extract = write_extract(
+        tmp_path / "second.csv", ["2023-01-01 02:00:00", "2023-01-01 03:00:00"]
+    )
+    results = {
+        result["year"]: result
+        for result in process_incremental(str(second_extract), str(output_dir))
+    }
+    assert results["2023"]["status"] == "ok"
+    assert results["2023"]["rows"] == 3
+    # 2022 est recalculée (voisine de 2023) mais son contenu n'a pas changé
+    assert results["2022"]["status"] == "unchanged"
+
+    # Révision ENEDIS d'une heure déjà traitée : la nouvelle valeur fait foi
+    # (valeur 501 dans la première extraction, 500 dans celle-ci)
+    revised_extract = write_extract(tmp_path / "revised.csv", ["2022-06-01 02:00:00"])
+    results = {
+        result["year"]: result
+        for result in process_incremental(str(revised_extract), str(output_dir))
+    }
+    assert results["2022"]["status"] == "ok"
+    series = IncrementalState(output_dir / ".solarcalculet").load_series()
+    assert series.loc[series["Horodate"] == "2022-06-01 01:00", "Valeur"].item() == 0.5
+
+
+def test_profile_change_recomputes_year(first_extract, tmp_path):
+    """Vérifie qu'une année dépendant du profil est réexportée quand il change"""
+    output_dir = tmp_path / "output"
+    process_incremental(str(first_extract), str(output_dir))
+    state = IncrementalState(output_dir / ".solarcalculet")
+    # 2023-01-01 01:00 reste manquante : aucune mesure d'un dimanche de janvier à 1 h
+    assert state.years["2022"]["profile"] is None
+    assert state.years["2023"]["profile"] is not None
+    assert (output_dir / ".solarcalculet" / IncrementalState.SERIES_FILE).exists()
+
+    # 2025 n'est pas voisine de 2023 mais complète son profil de repli
+    later_extract = write_extract(
+        tmp_path / "later.csv", ["2025-01-05 02:00:00", "2025-01-05 03:00:00"]
+    )
+    results = process_incremental(str(later_extract), str(output_dir))
+    assert [(result["year"], result["status"]) for result in results] == [
+        ("2023", "ok"),
+        ("2025", "ok"),
+    ]
+
+
+def test_year_bounds(first_extract, tmp_path):
+    """Vérifie la restriction aux années demandées"""
+    output_dir = tmp_path / "output"
+    results = process_incremental(
+        str(first_extract),
+        str(output_dir),
+        ProcessingOptions(start_year=2023, end_year=2023),
+    )
+    assert [result["year"] for result in results] == ["2023"]
+    assert not (output_dir / "2022.xlsx").exists()
+    assert set(IncrementalState(output_dir / ".solarcalculet").years) == {"2023"}
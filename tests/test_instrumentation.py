@@ -0,0 +1,90 @@
+"""
+Tests pour le module d'instrumentation
+"""
+
+import json
+import sys
+from types import SimpleNamespace
+from solarcalculet import instrumentation as instrumentation_module
+from solarcalculet.instrumentation import (
+    NULL_INSTRUMENTATION,
+    Instrumentation,
+    peak_rss_kb,
+)
+
+
+def test_stage_records_measures():
+    """Vérifie les mesures enregistrées pour une étape"""
+    instrumentation = Instrumentation()
+    with instrumentation.stage("fill_missing_data", rows_in=3, year="2023") as stage:
+        sum(range(10_000))
+        stage.rows_out = 5
+
+    (record,) = instrumentation.report()["stages"]
+    assert record["stage"] == "fill_missing_data"
+    assert record["year"] == "2023"
+    assert record["rows_in"] == 3
+    assert record["rows_out"] == 5
+    assert record["wall_seconds"] > 0
+    assert record["cpu_seconds"] >= 0
+    assert record["rss_growth_kb"] >= 0
+    assert instrumentation.report()["peak_rss_kb"] > 0
+
+
+def test_peak_rss_unit_by_platform(monkeypatch):
+    """Vérifie la conversion en kilo-octets de ru_maxrss (octets sous macOS)"""
+    usage = SimpleNamespace(ru_maxrss=2048 * 1024)
+    monkeypatch.setattr(
+        instrumentation_module,
+        "resource",
+        SimpleNamespace(RUSAGE_SELF=0, getrusage=lambda _who: usage),
+    )
+
+    monkeypatch.setattr(sys, "platform", "darwin")
+    assert peak_rss_kb() == 2048
+    monkeypatch.setattr(sys, "platform", "linux")
+    assert peak_rss_kb() == 2048 * 1024
+
+
+def test_disabled_instrumentation_records_nothing():
+    """Vérifie qu'une instrumentation désactivée n'enregistre rien"""
+    instrumentation = Instrumentation(enabled=False)
+    with instrumentation.stage("read") as stage:
+        stage.rows_out = 10
+    with NULL_INSTRUMENTATION.stage("read") as stage:
+        stage.rows_out = 10
+
+    assert instrumentation.report()["stages"] == []
+    assert NULL_INSTRUMENTATION.report()["stages"] == []
+    assert stage.rows_out is None
+
+
+def test_extend_and_write_report(tmp_path):
+    """Teste l'ajout de mesures d'un autre processus et l'écriture du rapport"""
+    worker = Instrumentation()
+    with worker.stage("write_excel", year="2024"):
+        pass
+    instrumentation = Instrumentation()
+    with instrumentation.stage("read"):
+        pass
+    instrumentation.extend(worker.report()["stages"])
+
+    report_file = tmp_path / "report.json"
+    instrumentation.write_report(report_file)
+    report = json.loads(report_file.read_text(encoding="utf-8"))
+    assert [stage["stage"] for stage in report["stages"]] == ["read", "write_excel"]
+    assert report["total_wall_seconds"] >= 0
+
+
+def test_profile_dir_dumps(tmp_path):
+    """Vérifie l'enregistrement des profils cProfile et tracemalloc"""
+    instrumentation = Instrumentation(profile_dir=tmp_path / "profiles")
+    with instrumentation.stage("format_labels", year="2023"):
+        labels = [str(i) for i in range(1000)]
+    assert len(labels) == 1000
+
+    files = sorted(path.name for path in (tmp_path / "profiles").iterdir())
+    assert files == [
+        "000-format_labels-2023.prof",
+        "000-format_labels-2023.tracemalloc.txt",
+    ]
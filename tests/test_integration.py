@@ -2,40 +2,35 @@
 Tests d'intégration du processus complet
 """  # pylint: disable=redefined-outer-name
 
+import tracemalloc
 import pytest
 import pandas as pd
+from solarcalculet.benchmark import generate_enedis_csv
+from solarcalculet.constants import ENEDIS_COLUMNS
 from solarcalculet.data_reader import DataReader
 from solarcalculet.data_cleaner import DataCleaner
 from solarcalculet.excel_exporter import ExcelExporter
+from solarcalculet.instrumentation import Instrumentation
+from solarcalculet.pipeline import (
+    ProcessingOptions,
+    neighbour_data,
+    process_enedis_data,
+)
+from solarcalculet.resampler import Resampler
 
 
 @pytest.fixture
 def input_csv(tmp_path):
     """Crée un fichier CSV de test avec des données sur 2023-2024"""
-    headers = [
-        "Identifiant PRM",
-        "Date de début",
-        "Date de fin",
-        "Grandeur physique",
-        "Grandeur métier",
-        "Etape métier",
-        "Unité",
-        "Horodate",
-        "Valeur",
-        "Nature",
-        "Pas",
-        "Indice de vraisemblance",
-        "Etat complémentaire",
-    ]
     data_rows = [
-        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2023-01-01 00:00:00;500;B;PT30M;0;0",
-        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2023-01-01 01:00:00;600;B;PT30M;0;0",
-        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2023-01-01 03:00:00;700;B;PT30M;0;0",
-        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2024-01-01 00:00:00;550;B;PT30M;0;0",
-        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2024-01-01 01:00:00;650;B;PT30M;0;0",
-        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2024-01-01 02:00:00;750;B;PT30M;0;0",
+        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2023-01-01 00:30:00;500;B;PT30M;0;0",
+        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2023-01-01 01:30:00;600;B;PT30M;0;0",
+        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2023-01-01 03:30:00;700;B;PT30M;0;0",
+        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2024-01-01 00:30:00;550;B;PT30M;0;0",
+        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2024-01-01 01:30:00;650;B;PT30M;0;0",
+        "19125759625988;2023-01-01 00:00:00;2024-12-31 23:59:59;PA;CONS;BRUT;W;2024-01-01 02:30:00;750;B;PT30M;0;0",
     ]
-    data = ";".join(headers) + "\n" + "\n".join(data_rows)
+    data = ";".join(ENEDIS_COLUMNS) + "\n" + "\n".join(data_rows)
 
     csv_file = tmp_path / "ENEDIS.input.csv"
     csv_file.write_text(data)
@@ -101,3 +96,171 @@ def test_full_process(input_csv, tmp_path):
     assert "kW" in df_2023.iloc[1].values
     assert "Time Interval" in df_2024.iloc[0].values
     assert "kW" in df_2024.iloc[1].values
+
+
+def test_process_by_partition_matches_full_read(input_csv, tmp_path):
+    """Vérifie que le traitement par blocs produit les mêmes fichiers"""
+    process_enedis_data(str(input_csv), str(tmp_path / "full"))
+    process_enedis_data(
+        str(input_csv), str(tmp_path / "chunked"), chunksize=2, max_memory=1
+    )
+
+    for year in ["2023", "2024"]:
+        full = pd.read_excel(tmp_path / "full" / f"{year}.xlsx", header=None)
+        chunked = pd.read_excel(tmp_path / "chunked" / f"{year}.xlsx", header=None)
+        pd.testing.assert_frame_equal(full, chunked)
+
+
+def test_process_by_partition_uses_meter_profile(tmp_path):
+    """Vérifie que le traitement par blocs complète avec le profil de tout le compteur"""
+    horodates = list(pd.date_range("2022-01-01 01:00", "2022-02-01 00:00", freq="h"))
+    # 2024 : trou de 3 h le lundi 1er janvier, sans année voisine mesurée
+    horodates += [
+        pd.Timestamp("2024-01-01 01:00") + pd.Timedelta(hours=hour)
+        for hour in range(8)
+        if hour not in (2, 3, 4)
+    ]
+    rows = [
+        f"19125759625988;{horodate:%Y-%m-%d %H:%M:%S};{800 + i % 7};PT60M"
+        for i, horodate in enumerate(horodates)
+    ]
+    csv_file = tmp_path / "profile.csv"
+    csv_file.write_text("Identifiant PRM;Horodate;Valeur;Pas\n" + "\n".join(rows))
+
+    process_enedis_data(str(csv_file), str(tmp_path / "full"))
+    process_enedis_data(
+        str(csv_file), str(tmp_path / "chunked"), chunksize=100, max_memory=1
+    )
+
+    for year in ["2022", "2024"]:
+        full = pd.read_excel(tmp_path / "full" / f"{year}.xlsx", header=None)
+        chunked = pd.read_excel(tmp_path / "chunked" / f"{year}.xlsx", header=None)
+        pd.testing.assert_frame_equal(full, chunked)
+    filled = pd.read_excel(tmp_path / "chunked" / "2024.xlsx", header=None, skiprows=4)
+    assert filled.iloc[:8, 1].notna().all()
+
+
+def test_process_years_discovery_and_policies(input_csv, tmp_path):
+    """Teste la découverte des années, le filtrage et la politique d'années incomplètes"""
+    results = process_enedis_data(str(input_csv), str(tmp_path / "all"))
+    assert [result["year"] for result in results] == ["2023", "2024"]
+    assert results[0]["missing"] == 1
+
+    results = process_enedis_data(
+        str(input_csv),
+        str(tmp_path / "clipped"),
+        options=ProcessingOptions(start_year=2024),
+    )
+    assert [result["year"] for result in results] == ["2024"]
+    assert not (tmp_path / "clipped" / "2023.xlsx").exists()
+
+    results = process_enedis_data(
+        str(input_csv),
+        str(tmp_path / "skip"),
+        options=ProcessingOptions(partial_years="skip"),
+    )
+    assert all(result["status"] == "skipped" for result in results)
+
+    results = process_enedis_data(
+        str(input_csv),
+        str(tmp_path / "pad"),
+        options=ProcessingOptions(partial_years="pad"),
+    )
+    assert results[0]["missing"] == 8760 - 3
+
+
+def test_process_years_in_parallel(input_csv, tmp_path):
+    """Vérifie que le traitement parallèle des années produit les mêmes fichiers"""
+    process_enedis_data(str(input_csv), str(tmp_path / "sequential"))
+    process_enedis_data(str(input_csv), str(tmp_path / "parallel"), workers=2)
+
+    for year in ["2023", "2024"]:
+        sequential = pd.read_excel(
+            tmp_path / "sequential" / f"{year}.xlsx", header=None
+        )
+        parallel = pd.read_excel(tmp_path / "parallel" / f"{year}.xlsx", header=None)
+        pd.testing.assert_frame_equal(sequential, parallel)
+
+
+def test_process_with_instrumentation(input_csv, tmp_path):
+    """Vérifie les étapes mesurées par l'instrumentation du traitement"""
+    instrumentation = Instrumentation()
+    process_enedis_data(str(input_csv), str(tmp_path), instrumentation=instrumentation)
+
+    stages = [
+        (stage["stage"], stage.get("year"))
+        for stage in instrumentation.report()["stages"]
+    ]
+    assert stages[:3] == [("read", None), ("convert_kw", None), ("resample", None)]
+    # 2024 est complète : aucune complétion n'est mesurée
+    assert ("fill_missing_data", "2023") in stages
+    assert ("fill_missing_data", "2024") not in stages
+    for year in ["2023", "2024"]:
+        for name in [
+            "detect_missing_hours",
+            "format_labels",
+            "write_excel",
+            "validate_export",
+        ]:
+            assert (name, year) in stages
+    write = instrumentation.report()["stages"][-1]
+    assert write["rows_out"] == write["rows_in"] > 0
+
+
+def test_low_memory_peak_within_raw_multiple(tmp_path):
+    """Vérifie que le pic mémoire du mode basse mémoire, lecture comprise,
+    reste borné par un multiple de la taille des colonnes lues"""
+    csv_file = tmp_path / "synthetic.csv"
+    generate_enedis_csv(csv_file, years=2, resolution="PT30M", gap_rate=0.02)
+    ExcelExporter._label_table()  # pylint: disable=protected-access
+
+    reader = DataReader(csv_file, mode="fast", low_memory=True)
+    # Traçage dès la lecture : le pic inclut les colonnes lues elles-mêmes
+    # et les horodates texte analysées par la lecture
+    tracemalloc.start()
+    try:
+        df = reader.read()
+        raw_size = df["Horodate"].nbytes + df["Valeur"].nbytes
+        df = reader.convert_to_kw(df, copy=False)
+        cleaner = DataCleaner(Resampler().to_hourly(df), low_memory=True)
+        del df
+        for year in cleaner.years():
+            year_cleaner = DataCleaner(
+                neighbour_data(cleaner, year),
+                profile=cleaner.profile(),
+                low_memory=True,
+            )
+            year_cleaner.fill_missing_data(str(year), full_year=True)
+            ExcelExporter(
+                year_cleaner.get_data_by_year(year), low_memory=True
+            ).prepare_excel_data()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Pic atteint à la lecture (horodates texte), les étapes suivantes
+    # travaillant sans copie intermédiaire
+    assert peak < 12 * raw_size
+
+
+def test_low_memory_matches_default(input_csv, tmp_path):
+    """Vérifie que le mode basse mémoire produit les mêmes fichiers"""
+    process_enedis_data(str(input_csv), str(tmp_path / "default"))
+    process_enedis_data(
+        str(input_csv),
+        str(tmp_path / "low"),
+        options=ProcessingOptions(low_memory=True),
+    )
+
+    for year in ["2023", "2024"]:
+        default = pd.read_excel(tmp_path / "default" / f"{year}.xlsx", header=None)
+        low = pd.read_excel(tmp_path / "low" / f"{year}.xlsx", header=None)
+        pd.testing.assert_frame_equal(default, low)
+
+
+def test_energy_aggregation_is_not_exported(input_csv, tmp_path):
+    """Vérifie le refus d'exporter des kWh dans un modèle attendant des kW"""
+    with pytest.raises(ValueError, match="non exportable"):
+        process_enedis_data(
+            str(input_csv), str(tmp_path), ProcessingOptions(aggregation="energy")
+        )
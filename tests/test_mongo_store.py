@@ -0,0 +1,240 @@
+"""
+Tests du stockage MongoDB des séries complétées
+"""  # pylint: disable=redefined-outer-name
+
+import os
+import pickle
+import shutil
+import socket
+import subprocess
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import PyMongoError
+from solarcalculet.data_cleaner import DataCleaner
+from solarcalculet.excel_exporter import ExcelExporter
+from solarcalculet.pipeline import PRM_COLUMN, meter_id, process_year
+from solarcalculet.mongo_store import MongoStore
+
+
+@pytest.fixture
+def series():
+    """Série horaire complétée de deux semaines"""
+    horodates = pd.date_range("2024-01-01", periods=336, freq="h")
+    return pd.DataFrame(
+        {
+            "Horodate": horodates,
+            "Valeur": np.arange(336, dtype="float64") / 10,
+            "Source": ["original"] * 334 + ["adjacent-year:2023"] * 2,
+        }
+    )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def mongo_client(tmp_path_factory):
+    """
+    Client vers un serveur de test : MONGODB_TEST_URI (service mongo de la
+    CI, échec s'il est injoignable), sinon un mongod local démarré pour le
+    module, sinon mongomock s'il est installé
+    """
+    uri = os.environ.get("MONGODB_TEST_URI")
+    if uri:
+        client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+        try:
+            client.admin.command("ping")
+        except PyMongoError as e:
+            pytest.fail(f"Serveur MONGODB_TEST_URI indisponible : {e}")
+        yield client
+        client.close()
+        return
+
+    mongod = shutil.which("mongod")
+    if mongod:
+        port = _free_port()
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [
+                mongod,
+                "--dbpath",
+                str(tmp_path_factory.mktemp("mongod")),
+                "--port",
+                str(port),
+                "--bind_ip",
+                "127.0.0.1",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        client = MongoClient(f"mongodb://127.0.0.1:{port}/", tz_aware=False)
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                client.admin.command("ping")
+                break
+            except PyMongoError:
+                if time.monotonic() > deadline:
+                    process.terminate()
+                    pytest.skip("mongod local non démarré")
+                time.sleep(0.2)
+        yield client
+        client.close()
+        process.terminate()
+        process.wait()
+        return
+
+    mongomock = pytest.importorskip(
+        "mongomock", reason="ni MONGODB_TEST_URI, ni mongod, ni mongomock"
+    )
+    client = mongomock.MongoClient(tz_aware=False)
+    try:
+        client.probe.probe.bulk_write([UpdateOne({}, {"$set": {"a": 1}}, upsert=True)])
+    except TypeError as e:
+        # Écritures groupées de mongomock incompatibles avec ce pymongo
+        pytest.skip(f"mongomock incompatible : {e}")
+    yield client
+
+
+@pytest.fixture
+def store(mongo_client, request):
+    """Stockage sur une base propre au test"""
+    database = f"test_{request.node.name}"[:60].replace("[", "_").replace("]", "_")
+    mongo_store = MongoStore(
+        database=database,
+        batch_size=25,
+        # Collection time-series uniquement sur un vrai serveur
+        timeseries=isinstance(mongo_client, MongoClient),
+        client=mongo_client,
+    )
+    mongo_store.ensure_collection()
+    yield mongo_store
+    mongo_client.drop_database(database)
+
+
+def test_upsert_batches_sizes_and_keys(series):
+    """Vérifie le découpage en lots et la clé (prm, Horodate) des upserts"""
+    batches = list(MongoStore(batch_size=100).upsert_batches(series, "123"))
+
+    assert [len(batch) for batch in batches] == [100, 100, 100, 36]
+    document = batches[3][-1]._doc  # pylint: disable=protected-access
+    assert batches[3][-1]._filter == {  # pylint: disable=protected-access
+        "prm": "123",
+        "Horodate": pd.Timestamp("2024-01-14 23:00").to_pydatetime(),
+    }
+    assert document == {"$set": {"Valeur": 33.5, "Source": "adjacent-year:2023"}}
+    assert batches[0][0]._upsert  # pylint: disable=protected-access
+
+
+def test_upsert_batches_bson_values(series):
+    """Vérifie la conversion des NaN et des valeurs float32"""
+    series["Valeur"] = series["Valeur"].astype("float32")
+    series.loc[0, "Valeur"] = np.nan
+    series["Source"] = series["Source"].astype("category")
+
+    batch = next(MongoStore().upsert_batches(series, "123"))
+    updates = [op._doc["$set"] for op in batch]  # pylint: disable=protected-access
+
+    assert updates[0]["Valeur"] is None
+    assert updates[6]["Valeur"] == 0.6
+    assert isinstance(updates[6]["Source"], str)
+
+
+def test_store_is_picklable_without_client():
+    """Vérifie que le client n'est pas transmis aux processus de travail"""
+    mongo_store = MongoStore(database="db", client=object())
+
+    restored = pickle.loads(pickle.dumps(mongo_store))
+
+    assert restored._client is None  # pylint: disable=protected-access
+    assert restored.database == "db"
+
+
+def test_from_env(tmp_path, monkeypatch):
+    """Vérifie la configuration par fichier .env"""
+    for name in MongoStore.ENV_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    env_file = tmp_path / ".env"
+    env_file.write_text("MONGODB_URI=mongodb://db:27017/\nMONGODB_DB=mesures\n")
+
+    mongo_store = MongoStore.from_env(env_file, batch_size=10)
+
+    assert mongo_store.uri == "mongodb://db:27017/"
+    assert mongo_store.database == "mesures"
+    assert mongo_store.collection_name == "consumption_data"
+    assert mongo_store.batch_size == 10
+
+
+def test_write_series_is_idempotent(store, series):
+    """Vérifie que la réécriture d'une série met à jour sans dupliquer"""
+    assert store.write_series(series, "123") == {"upserted": 336, "modified": 0}
+
+    series.loc[5, "Valeur"] = 99.0
+    counts = store.write_series(series, "123")
+
+    assert counts["upserted"] == 0
+    assert store.collection.count_documents({"prm": "123"}) == 336
+    assert store.read_range("123")["Valeur"].iloc[5] == 99.0
+
+
+def test_read_range_half_open(store, series):
+    """Vérifie la lecture d'une plage [start, end) triée par horodate"""
+    store.write_series(series.iloc[::-1], "123")
+    store.write_series(series, "456")
+
+    df = store.read_range("123", "2024-01-02", "2024-01-03")
+
+    assert list(df.columns) == ["Horodate", "Valeur", "Source"]
+    assert len(df) == 24
+    assert df["Horodate"].is_monotonic_increasing
+    assert df["Horodate"].iloc[0] == pd.Timestamp("2024-01-02")
+    assert store.prms() == ["123", "456"]
+    assert store.read_year("123", "2023").empty
+
+
+def test_read_year_feeds_cleaner_and_exporter(store, series):
+    """Vérifie que la série relue alimente le nettoyage et l'export"""
+    # Lundi 8 janvier 10h-11h : complété par le profil du lundi 1er
+    store.write_series(series.drop(index=[178, 179]), "123")
+
+    cleaner = DataCleaner(store.read_year("123", "2024"))
+    assert len(cleaner.detect_missing_hours("2024")) == 2
+    cleaner.fill_missing_data("2024")
+
+    exporter = ExcelExporter(cleaner.get_data_by_year("2024"))
+    assert exporter.validate_excel_data() == []
+
+
+class _RecordingStore:
+    """Stockage minimal qui conserve les séries reçues"""
+
+    def __init__(self):
+        self.series = {}
+
+    def write_series(self, df, prm):
+        self.series[prm] = df.copy()
+        return {"upserted": len(df), "modified": 0}
+
+
+def test_process_year_writes_filled_series(tmp_path, series):
+    """Vérifie que process_year persiste la série complétée de l'année"""
+    recorder = _RecordingStore()
+    data = series.drop(index=[178, 179]).assign(**{PRM_COLUMN: "123"})
+
+    result = process_year(
+        DataCleaner(data[["Horodate", "Valeur"]]),
+        "2024",
+        tmp_path,
+        verbose=False,
+        store=recorder,
+        prm=meter_id(data),
+    )
+
+    assert result["status"] == "ok"
+    assert len(recorder.series["123"]) == 336
+    assert (recorder.series["123"]["Source"] != "original").sum() == 2
@@ -0,0 +1,77 @@
+"""
+Tests pour le module de cache des données lues
+"""  # pylint: disable=redefined-outer-name
+
+import os
+import pandas as pd
+import pytest
+from solarcalculet.parse_cache import ParseCache
+
+
+@pytest.fixture
+def sample_frame():
+    """Crée un DataFrame de test avec des colonnes de différents types"""
+    return pd.DataFrame(
+        {
+            "Horodate": pd.to_datetime(["2023-01-01 00:00:00", "2023-01-01 01:00:00"]),
+            "Valeur": [0.692, 1.284],
+            "Pas": ["PT30M", "PT30M"],
+        }
+    )
+
+
+def test_cache_round_trip(tmp_path, sample_frame):
+    """Teste l'écriture puis la relecture d'une entrée"""
+    cache = ParseCache(tmp_path)
+    assert cache.get("absent") is None
+
+    cache.put("key", sample_frame)
+    cached = cache.get("key")
+    pd.testing.assert_frame_equal(cached, sample_frame, check_dtype=False)
+    assert cached["Horodate"].dtype == "datetime64[ns]"
+
+
+def test_cache_key_depends_on_content_and_options(tmp_path):
+    """Vérifie que la clé change avec le contenu et les options"""
+    csv_file = tmp_path / "input.csv"
+    csv_file.write_text("Horodate;Valeur\n2023-01-01 00:00:00;1")
+    cache = ParseCache(tmp_path / "cache")
+
+    key = cache.make_key(csv_file, {"mode": "fast"})
+    assert key == cache.make_key(csv_file, {"mode": "fast"})
+    assert key != cache.make_key(csv_file, {"mode": "generic"})
+
+    csv_file.write_text("Horodate;Valeur\n2023-01-01 00:00:00;2")
+    assert key != cache.make_key(csv_file, {"mode": "fast"})
+
+
+def test_cache_lru_eviction(tmp_path, sample_frame):
+    """Vérifie l'éviction de l'entrée la moins récemment utilisée"""
+    cache = ParseCache(tmp_path)
+    cache.put("old", sample_frame)
+    cache.put("recent", sample_frame)
+    os.utime(tmp_path / "old.npz", (0, 0))
+
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert cache.get("old") is None
+    assert cache.get("recent") is not None
+
+    assert cache.clear() == 1
+    assert cache.size() == 0
+
+
+def test_cache_keeps_missing_values(tmp_path):
+    """Vérifie que les valeurs manquantes des colonnes texte restent NaN"""
+    frame = pd.DataFrame(
+        {
+            "Identifiant PRM": pd.Categorical(["01234567890123", None, "2"]),
+            "Pas": ["PT30M", float("nan"), "PT60M"],
+        }
+    )
+    cache = ParseCache(tmp_path)
+    cache.put("key", frame)
+    cached = cache.get("key")
+
+    pd.testing.assert_frame_equal(cached, frame)
+    assert cached["Pas"].isna().tolist() == [False, True, False]
@@ -0,0 +1,87 @@
+"""
+Tests pour le module de ré-échantillonnage horaire
+"""  # pylint: disable=redefined-outer-name
+
+import pandas as pd
+import pytest
+from solarcalculet.resampler import Resampler
+
+
+@pytest.fixture
+def half_hourly_data():
+    """
+    Crée un DataFrame de test au pas de 30 minutes (valeurs en kW), horodaté
+    en fin d'intervalle comme les courbes de charge ENEDIS
+    """
+    return pd.DataFrame(
+        {
+            "Horodate": pd.to_datetime(
+                [
+                    "2023-01-01 00:30:00",
+                    "2023-01-01 01:00:00",
+                    "2023-01-01 01:30:00",
+                    "2023-01-01 02:00:00",
+                ]
+            ),
+            "Valeur": [0.5, 1.0, 2.0, 3.0],
+            "Pas": ["PT30M"] * 4,
+        }
+    )
+
+
+def test_to_hourly_mean(half_hourly_data):
+    """Teste l'agrégation par puissance moyenne"""
+    hourly = Resampler().to_hourly(half_hourly_data)
+
+    assert list(hourly.columns) == ["Horodate", "Valeur"]
+    assert hourly["Horodate"].tolist() == list(
+        pd.to_datetime(["2023-01-01 00:00:00", "2023-01-01 01:00:00"])
+    )
+    assert hourly["Valeur"].tolist() == [0.75, 2.5]
+
+
+def test_to_hourly_max_and_energy(half_hourly_data):
+    """Teste les agrégations par maximum et par énergie"""
+    assert Resampler("max").to_hourly(half_hourly_data)["Valeur"].tolist() == [1.0, 3.0]
+    assert Resampler("energy").to_hourly(half_hourly_data)["Valeur"].tolist() == [
+        0.75,
+        2.5,
+    ]
+
+
+def test_to_hourly_timestamp_at_start(half_hourly_data):
+    """Teste la convention où l'horodate marque le début de l'intervalle"""
+    hourly = Resampler(timestamp_at="start").to_hourly(half_hourly_data)
+
+    assert hourly["Horodate"].iloc[0] == pd.Timestamp("2023-01-01 00:00:00")
+    assert hourly["Valeur"].tolist() == [0.5, 1.5, 3.0]
+
+
+def test_year_boundary_reading_belongs_to_previous_year():
+    """Vérifie que la mesure de minuit du 1er janvier clôt l'année précédente"""
+    df = pd.DataFrame(
+        {
+            "Horodate": pd.to_datetime(["2024-12-31 23:30", "2025-01-01 00:00"]),
+            "Valeur": [1.0, 2.0],
+            "Pas": ["PT30M"] * 2,
+        }
+    )
+    hourly = Resampler().to_hourly(df)
+
+    assert hourly["Horodate"].tolist() == [pd.Timestamp("2024-12-31 23:00")]
+    assert hourly["Valeur"].tolist() == [1.5]
+
+
+def test_parse_steps_without_pas_column(half_hourly_data):
+    """Vérifie l'estimation du pas en l'absence de colonne Pas"""
+    steps = Resampler.parse_steps(half_hourly_data.drop(columns=["Pas"]))
+    assert (steps == pd.Timedelta(minutes=30)).all()
+
+    hourly = half_hourly_data.iloc[[0, 2]].drop(columns=["Pas"])
+    assert Resampler().to_hourly(hourly)["Valeur"].tolist() == [0.5, 2.0]
+
+
+def test_invalid_aggregation():
+    """Vérifie le rejet d'une agrégation inconnue"""
+    with pytest.raises(ValueError):
+        Resampler("sum")
@@ -0,0 +1,57 @@
+"""
+Tests pour le module d'injection dans le classeur modèle
+"""
+
+import zipfile
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from solarcalculet.constants import DEFAULT_TEMPLATE
+from solarcalculet.excel_exporter import ExcelExporter
+from solarcalculet.template_writer import TemplateWriter
+
+TEMPLATE_FILE = Path(DEFAULT_TEMPLATE)
+
+
+def test_template_writer_load_once():
+    """Vérifie la lecture unique et le découpage du modèle"""
+    writer = TemplateWriter.load(str(TEMPLATE_FILE))
+
+    assert TemplateWriter.load(str(TEMPLATE_FILE)) is writer
+    assert writer.sheet_name == "xl/worksheets/sheet1.xml"
+    assert writer.prefix.endswith("</row>")
+    assert writer.row_pattern.startswith('<row r="{row}"')
+    assert writer.suffix.startswith("</sheetData>")
+
+
+def test_template_writer_leap_year(tmp_path):
+    """Vérifie l'ajout des lignes du 29 février et la mise à jour des dimensions"""
+    horodates = pd.date_range(
+        "2024-01-01", "2024-12-31 23:00", freq=pd.Timedelta(hours=1)
+    )
+    data = pd.DataFrame({"Horodate": horodates, "Valeur": 1.5})
+    excel_data = ExcelExporter(data).prepare_excel_data()
+    output_file = tmp_path / "2024.xlsx"
+    TemplateWriter.load(str(TEMPLATE_FILE)).write(excel_data, output_file)
+
+    with zipfile.ZipFile(output_file) as archive:
+        sheet_xml = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert '<dimension ref="A1:I8788"' in sheet_xml
+    sheet = openpyxl.load_workbook(output_file, read_only=True)["Sheet1"]
+    rows = list(sheet.iter_rows(min_row=5, max_col=2, values_only=True))
+    assert len(rows) == 8784
+    assert rows[59 * 24] == ("2/29 0:00", 1.5)
+
+
+def test_template_writer_unrecognized(tmp_path):
+    """Vérifie le rejet d'un classeur sans ligne de données"""
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["Note"])
+    template_file = tmp_path / "empty.xlsx"
+    workbook.save(template_file)
+
+    with pytest.raises(ValueError):
+        TemplateWriter(template_file)
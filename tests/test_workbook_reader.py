@@ -0,0 +1,146 @@
+"""
+Tests de la lecture des classeurs hebdomadaires ENEDIS
+"""  # pylint: disable=redefined-outer-name
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+from solarcalculet.pipeline import process_enedis_data
+from solarcalculet.workbook_reader import WorkbookReader
+
+PRM = "19125759625988"
+
+
+def _write_hourly(path, start: str, end: str, offset: float = 0.0):
+    """Classeur au format de l'espace client : accueil puis courbe de charge"""
+    workbook = Workbook()
+    workbook.active.title = "Page d'accueil"
+    for _ in range(100):
+        workbook.active.append(["Mentions légales"] + [None] * 10)
+    sheet = workbook.create_sheet("Consommation Horaire")
+    sheet.append([None, "Compte Client", None, "Export des données"])
+    sheet.append([None, "Point Référence Mesure (PRM) : ", PRM, "Données :"])
+    sheet.append([])
+    sheet.append([None, None, "Début", "Fin", "Valeur (en kW)"])
+    for timestamp in pd.date_range(start, end, freq="30min", inclusive="left"):
+        value = offset + timestamp.hour + timestamp.minute / 100
+        sheet.append(
+            [
+                None,
+                None,
+                f"{timestamp:%d/%m/%Y %H:%M:%S}",
+                f"{timestamp + pd.Timedelta(minutes=30):%d/%m/%Y %H:%M:%S}",
+                f"{value:.3f}".replace(".", ","),
+            ]
+        )
+    workbook.save(path)
+
+
+def _write_daily(path):
+    """Classeur d'export quotidien (sans courbe de charge)"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Export Consommation Quotidienne"
+    sheet.append(["Date", "Valeur (en kW)"])
+    sheet.append(["15/07/2024", "12,5"])
+    workbook.save(path)
+
+
+@pytest.fixture
+def weekly_dir(tmp_path):
+    """Répertoire de classeurs aux noms irréguliers"""
+    _write_hourly(tmp_path / "janvier.01.2024.xlsx", "2024-01-01", "2024-01-03")
+    # Chevauchement avec la semaine précédente : les valeurs du premier
+    # classeur sont conservées
+    _write_hourly(
+        tmp_path / "janvier.02.2024.xlsx", "2024-01-02", "2024-01-04", offset=100
+    )
+    _write_hourly(tmp_path / "mai\x03.04.2024.xlsx", "2024-05-20", "2024-05-21")
+    _write_daily(tmp_path / "juiellet.03.2024.xlsx")
+    (tmp_path / "notes.xlsx").write_bytes(b"")
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "name, month",
+    [
+        ("janvier", 1),
+        ("Février", 2),
+        ("fevrier", 2),
+        ("mar", 3),
+        ("mai\x03", 5),
+        ("juiellet", 7),
+        ("août", 8),
+        ("sept", 9),
+        ("décembre", 12),
+        ("notes", None),
+    ],
+)
+def test_month_number(name, month):
+    """Vérifie la reconnaissance des noms de mois"""
+    assert WorkbookReader.month_number(name) == month
+
+
+def test_week_period_is_clipped_to_month():
+    """Vérifie les semaines calendaires bornées au mois"""
+    assert WorkbookReader.week_period(2024, 2, 1) == (
+        pd.Timestamp("2024-02-01"),
+        pd.Timestamp("2024-02-05"),
+    )
+    assert WorkbookReader.week_period(2024, 2, 5) == (
+        pd.Timestamp("2024-02-26"),
+        pd.Timestamp("2024-03-01"),
+    )
+
+
+def test_discover_filters_period(weekly_dir):
+    """Vérifie le recensement d'après les noms, sans ouvrir les classeurs"""
+    reader = WorkbookReader(weekly_dir)
+
+    assert [weekly.month for weekly in reader.discover()] == [1, 1, 5, 7]
+    assert [weekly.week for weekly in reader.discover("2024-05-01")] == [4, 3]
+    assert reader.skipped[0] == (
+        str(weekly_dir / "notes.xlsx"),
+        "Nom de fichier non reconnu",
+    )
+
+
+def test_load_merges_weeks(weekly_dir):
+    """Vérifie la fusion triée et dédoublonnée au format de DataReader.load"""
+    reader = WorkbookReader(weekly_dir, workers=2)
+
+    df = reader.load()
+
+    assert list(df.columns) == WorkbookReader.COLUMNS
+    assert len(df) == (3 + 1) * 48
+    assert df["Horodate"].is_monotonic_increasing
+    assert not df["Horodate"].duplicated().any()
+    # Horodate = fin de l'intervalle, comme dans les CSV ENEDIS
+    assert df["Horodate"].iloc[0] == pd.Timestamp("2024-01-01 00:30:00")
+    assert df["Valeur"].iloc[1] == pytest.approx(0.3)
+    assert df.loc[df["Horodate"] == "2024-01-02 12:00:00", "Valeur"].item() == 11.3
+    assert df.loc[df["Horodate"] == "2024-01-03 12:30:00", "Valeur"].item() == 112
+    assert set(df["Identifiant PRM"]) == {PRM}
+    assert set(df["Pas"]) == {"PT30M"}
+    assert set(df["Source"]) == {"original"}
+    assert [path for path, _ in reader.skipped][-1].endswith("juiellet.03.2024.xlsx")
+
+
+def test_load_low_memory_and_range(weekly_dir):
+    """Vérifie la sélection d'une période et le mode basse mémoire"""
+    df = WorkbookReader(weekly_dir, workers=1, low_memory=True).load(
+        "2024-05-01", "2024-06-01"
+    )
+
+    assert len(df) == 48
+    assert df["Valeur"].dtype == "float32"
+
+
+def test_process_directory_of_workbooks(weekly_dir, tmp_path):
+    """Vérifie le traitement d'un répertoire de classeurs"""
+    output_dir = tmp_path / "output"
+
+    results = process_enedis_data(str(weekly_dir), str(output_dir))
+
+    assert [result["year"] for result in results] == ["2024"]
+    assert (output_dir / "2024.xlsx").exists()
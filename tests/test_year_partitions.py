@@ -0,0 +1,65 @@
+"""
+Tests pour le module de partitionnement par année
+"""
+
+import pandas as pd
+from solarcalculet.year_partitions import YearPartitions
+
+
+def make_chunk(horodates, valeurs):
+    """Crée un bloc de données de test"""
+    return pd.DataFrame({"Horodate": pd.to_datetime(horodates), "Valeur": valeurs})
+
+
+def test_partitions_in_memory():
+    """Teste la répartition en mémoire de blocs couvrant plusieurs années"""
+    with YearPartitions() as partitions:
+        partitions.add(
+            make_chunk(["2023-12-31 23:00:00", "2024-01-01 00:00:00"], [1.0, 2.0])
+        )
+        partitions.add(
+            make_chunk(["2023-12-31 22:00:00", "2025-01-01 00:00:00"], [3.0, 4.0])
+        )
+
+        assert partitions.years() == [2023, 2024, 2025]
+        assert partitions.spill_dir is None
+        data_2023 = partitions.get(2023)
+        assert data_2023["Valeur"].tolist() == [3.0, 1.0]
+        assert partitions.get(2022).empty
+
+
+def test_partitions_spill_to_disk(tmp_path):
+    """Teste le déversement sur disque au-delà du budget mémoire"""
+    partitions = YearPartitions(max_memory=1)
+    partitions.add(
+        make_chunk(["2023-01-01 00:00:00", "2024-01-01 00:00:00"], [1.0, 2.0])
+    )
+    partitions.add(make_chunk(["2023-01-01 01:00:00"], [3.0]))
+
+    spill_dir = partitions.spill_dir
+    assert (spill_dir / "2023.csv").exists()
+    data_2023 = partitions.get(2023)
+    assert data_2023["Valeur"].tolist() == [1.0, 3.0]
+    assert data_2023.iloc[1]["Horodate"] == pd.Timestamp("2023-01-01 01:00:00")
+
+    partitions.close()
+    assert not spill_dir.exists()
+
+    with YearPartitions(spill_dir=tmp_path / "spill") as partitions:
+        partitions.add(make_chunk(["2024-06-01 12:00:00"], [5.0]))
+        assert (tmp_path / "spill" / "2024.csv").exists()
+        assert partitions.get(2024)["Valeur"].tolist() == [5.0]
+    assert not (tmp_path / "spill" / "2024.csv").exists()
+
+
+def test_spilled_partitions_keep_dtypes():
+    """Vérifie que les partitions relues depuis le disque gardent leurs types"""
+    chunk = make_chunk(["2024-06-01 12:00:00"], [5.0]).astype({"Valeur": "float32"})
+    chunk["Identifiant PRM"] = pd.Series(["01234567890123"], dtype="category")
+    dtypes = {"Identifiant PRM": "category", "Valeur": "float32"}
+    with YearPartitions(max_memory=1, dtypes=dtypes) as partitions:
+        partitions.add(chunk)
+        data = partitions.get(2024)
+
+    assert data["Identifiant PRM"].tolist() == ["01234567890123"]
+    assert data["Valeur"].dtype == "float32"